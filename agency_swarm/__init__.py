@@ -4,3 +4,5 @@ from .tools import BaseTool
 from .util import set_openai_key
 from .util import set_openai_client
 from .util import get_openai_client
+from .util import get_async_openai_client
+from .util import set_async_openai_client
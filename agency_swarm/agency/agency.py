@@ -1,19 +1,28 @@
+import asyncio
+import contextvars
+import functools
 import inspect
 import json
 import os
 import readline
 import shutil
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
 from typing import List, TypedDict, Callable, Any, Dict, Literal, Union
 
 from pydantic import Field, field_validator
 from rich.console import Console
 
+from agency_swarm.agency.agency_graph import AgencyGraph
 from agency_swarm.agents import Agent
-from agency_swarm.threads import Thread
-from agency_swarm.tools import BaseTool
+from agency_swarm.threads import Thread, AsyncThread
+from agency_swarm.threads.worker_pool import WorkerPool
+from agency_swarm.tools import BaseTool, ToolExecutor
 from agency_swarm.user import User
+from agency_swarm.util.file_uploader import get_file_uploader
+from agency_swarm.util.settings_store import SettingsStore
+from agency_swarm.util.tracing import get_tracer, get_current_span
 
 console = Console()
 
@@ -30,6 +39,11 @@ class ThreadsCallbacks(TypedDict):
 
 class Agency:
     ThreadType = Thread
+    init_agents_max_workers = 8
+    # maximum number of conversations processed at once in async_mode='threading'
+    async_max_workers = 16
+    # maximum number of messages waiting for a busy agent in async_mode='threading'
+    async_max_queue_size = 10
     send_message_tool_description = """Use this tool to facilitate direct, synchronous communication between specialized agents within your agency. When you send a message using this tool, you receive a response exclusively from the designated recipient agent. To continue the dialogue, invoke this tool again with the desired recipient agent and your follow-up message. Remember, communication here is synchronous; the recipient agent won't perform any tasks post-response. You are responsible for relaying the recipient agent's responses back to the user, as the user does not have direct access to these replies. Keep engaging with the tool for continuous interaction until the task is fully resolved."""
     send_message_tool_description_async = """Use this tool for asynchronous communication with other agents within your agency. Initiate tasks by messaging, and check status and responses later with the 'GetResponse' tool. Relay responses to the user, who instructs on status checks. Continue until task completion."""
 
@@ -40,7 +54,8 @@ class Agency:
                  async_mode: Literal['threading'] = None,
                  settings_path: str = "./settings.json",
                  settings_callbacks: SettingsCallbacks = None,
-                 threads_callbacks: ThreadsCallbacks = None):
+                 threads_callbacks: ThreadsCallbacks = None,
+                 tool_executor: Literal['thread', 'process', 'asyncio'] = None):
         """
         Initializes the Agency object, setting up agents, threads, and core functionalities.
 
@@ -51,26 +66,34 @@ class Agency:
             async_mode (str, optional): The mode for asynchronous message processing. Defaults to None.
             settings_path (str, optional): The path to the settings file for the agency. Must be json. If file does not exist, it will be created. Defaults to None.
             settings_callbacks (SettingsCallbacks, optional): A dictionary containing functions to load and save settings for the agency. The keys must be "load" and "save". Both values must be defined. Defaults to None.
-            threads_callbacks (ThreadsCallbacks, optional): A dictionary containing functions to load and save threads for the agency. The keys must be "load" and "save". Both values must be defined. Defaults to None.
+            threads_callbacks (ThreadsCallbacks, optional): A dictionary containing functions to load and save threads for the agency. The keys must be "load" and "save". Both values must be defined. Use `ConversationStore.threads_callbacks` to also persist messages, runs and tool outputs in a conversation store. Defaults to None.
+            tool_executor (str, optional): The backend used to execute multiple tool calls of a single run in parallel. Can be 'thread', 'process' or 'asyncio'. If None, tool calls are executed one by one. Defaults to None.
 
         This constructor initializes various components of the Agency, including CEO, agents, threads, and user interactions. It parses the agency chart to set up the organizational structure and initializes the messaging tools, agents, and threads necessary for the operation of the agency. Additionally, it prepares a main thread for user interactions.
         """
         self.async_mode = async_mode
+        self.worker_pool = None
         if self.async_mode == "threading":
             from agency_swarm.threads.thread_async import ThreadAsync
             self.ThreadType = ThreadAsync
+            self.worker_pool = WorkerPool(self.async_max_workers)
 
         self.ceo = None
         self.user = User()
+        self.graph = None
         self.agents = []
         self.agents_and_threads = {}
         self.main_recipients = []
         self.main_thread = None
+        self.async_threads = {}
         self.recipient_agents = None
         self.shared_files = shared_files if shared_files else []
         self.settings_path = settings_path
         self.settings_callbacks = settings_callbacks
+        self.settings_store = SettingsStore(settings_path, settings_callbacks)
         self.threads_callbacks = threads_callbacks
+        self.conversation_store = threads_callbacks.get("store") if threads_callbacks else None
+        self.tool_executor = tool_executor
 
         if os.path.isfile(os.path.join(self._get_class_folder_path(), shared_instructions)):
             self._read_instructions(os.path.join(self._get_class_folder_path(), shared_instructions))
@@ -98,8 +121,9 @@ class Agency:
         Returns:
             Generator or final response: Depending on the 'yield_messages' flag, this method returns either a generator yielding intermediate messages or the final response from the main thread.
         """
-        gen = self.main_thread.get_completion(message=message, message_files=message_files,
-                                              yield_messages=yield_messages, recipient_agent=recipient_agent)
+        gen = self._trace_completion(self.main_thread.get_completion(message=message, message_files=message_files,
+                                                                     yield_messages=yield_messages,
+                                                                     recipient_agent=recipient_agent))
 
         if not yield_messages:
             while True:
@@ -110,6 +134,64 @@ class Agency:
 
         return gen
 
+    async def aget_completion(self, message: str, message_files=None, yield_messages=True, recipient_agent=None):
+        """
+        Asynchronously retrieves the completion for a given message from the main thread.
+
+        Parameters:
+            message (str): The message for which completion is to be retrieved.
+            message_files (list, optional): A list of file ids to be sent as attachments with the message. Defaults to None.
+            yield_messages (bool, optional): Flag to determine if intermediate messages should be yielded. If False, only the final response is yielded. Defaults to True.
+            recipient_agent (Agent, optional): The agent to which the message should be sent. Defaults to the first agent in the agency chart.
+
+        Returns:
+            AsyncGenerator: An async generator yielding MessageOutput objects. The last yielded message is the final response from the main thread.
+        """
+        thread = self._get_async_thread(self.main_thread)
+        completion = get_tracer().trace_async_generator(
+            thread.get_completion(message=message, message_files=message_files, yield_messages=yield_messages,
+                                  recipient_agent=recipient_agent), "Agency.aget_completion", "agency")
+        try:
+            async for message_output in completion:
+                yield message_output
+        finally:
+            await completion.aclose()
+        self.main_thread.id = thread.id
+
+    @staticmethod
+    def _trace_completion(gen):
+        """Yields from a completion of the main thread inside a span of the agency, current while it runs."""
+        return (yield from get_tracer().trace_generator(gen, "Agency.get_completion", "agency"))
+
+    def add_async_completion_callback(self, callback):
+        """
+        Adds a callback that is notified when an agent completes a task in async_mode='threading'.
+
+        Parameters:
+            callback: A function called with the thread, the response and the error, if any, in the worker thread.
+        """
+        if not self.async_mode:
+            raise Exception("Completion callbacks are only supported in async mode.")
+        for threads in self.agents_and_threads.values():
+            for thread in threads.values():
+                thread.add_completion_callback(callback)
+
+    def get_async_metrics(self):
+        """
+        Returns the metrics of the worker pool of async_mode='threading', see WorkerPool.get_metrics, and of the
+        message queues of the threads: `pending_messages` waiting for busy agents, total `queued_messages` and
+        `rejected_messages`, and `coalesced_tasks` that combined multiple queued messages.
+        """
+        if not self.worker_pool:
+            raise Exception("Async metrics are only available in async mode.")
+        metrics = self.worker_pool.get_metrics()
+        threads = [thread for threads in self.agents_and_threads.values() for thread in threads.values()]
+        metrics["pending_messages"] = sum(thread.queue_depth for thread in threads)
+        metrics["queued_messages"] = sum(thread.queued_messages for thread in threads)
+        metrics["rejected_messages"] = sum(thread.rejected_messages for thread in threads)
+        metrics["coalesced_tasks"] = sum(thread.coalesced_tasks for thread in threads)
+        return metrics
+
     def demo_gradio(self, height=450, dark_mode=True, share=False):
         """
         Launches a Gradio-based demo interface for the agency chatbot.
@@ -313,14 +395,13 @@ class Agency:
 
         This method iterates through each agent in the agency, assigns a unique ID, adds shared instructions, and initializes the OpenAI models for each agent.
 
+        Agents are initialized concurrently in a pool of up to `init_agents_max_workers` threads. Settings are loaded once before and saved once after all agents are initialized.
+
         There are no input parameters.
 
         There are no output parameters as this method is used for internal initialization purposes within the Agency class.
         """
-        if self.settings_callbacks:
-            loaded_settings = self.settings_callbacks["load"]()
-            with open(self.settings_path, 'w') as f:
-                json.dump(loaded_settings, f, indent=4)
+        shared_file_ids = self._upload_shared_files()
 
         for agent in self.agents:
             if "temp_id" in agent.id:
@@ -328,6 +409,7 @@ class Agency:
 
             agent.add_shared_instructions(self.shared_instructions)
             agent.settings_path = self.settings_path
+            agent.settings_store = self.settings_store
 
             if self.shared_files:
                 if isinstance(agent.files_folder, str):
@@ -335,14 +417,40 @@ class Agency:
                     agent.files_folder += self.shared_files
                 elif isinstance(agent.files_folder, list):
                     agent.files_folder += self.shared_files
+                agent.add_file_ids(shared_file_ids)
+
+        # settings are loaded once and saved once when the batch exits, even if some agents failed, so that
+        # created assistants are not lost
+        with self.settings_store.batch():
+            with ThreadPoolExecutor(max_workers=self.init_agents_max_workers,
+                                    thread_name_prefix="agency-swarm-init") as executor:
+                futures = [executor.submit(agent.init_oai) for agent in self.agents]
+                for future in futures:
+                    future.result()
+
+        # temporary ids were replaced by assistant ids
+        self.graph.reindex()
+
+    def _upload_shared_files(self):
+        """
+        Uploads the shared files of the agency once, so that they are not uploaded again for every agent.
 
-            agent.init_oai()
+        Returns:
+            List[str]: The file ids of all shared files.
+        """
+        shared_files = self.shared_files if isinstance(self.shared_files, list) else [self.shared_files]
 
-        if self.settings_callbacks:
-            with open(self.agents[0].get_settings_path(), 'r') as f:
-                settings = f.read()
-            settings = json.loads(settings)
-            self.settings_callbacks["save"](settings)
+        file_ids = []
+        for shared_folder in shared_files:
+            f_path = shared_folder
+            if not os.path.isdir(f_path):
+                f_path = os.path.normpath(os.path.join(self._get_class_folder_path(), shared_folder))
+
+            if os.path.isdir(f_path):
+                file_ids += get_file_uploader().upload_folder(f_path)
+            else:
+                print("Shared files folder path is not a directory. Skipping... ", f_path)
+        return file_ids
 
     def _init_threads(self):
         """
@@ -356,6 +464,8 @@ class Agency:
             This method does not return any value but updates the agents_and_threads attribute with initialized Thread objects.
         """
         self.main_thread = Thread(self.user, self.ceo)
+        self._init_tool_executor(self.main_thread)
+        self.main_thread.conversation_store = self.conversation_store
 
         # load thread ids
         loaded_thread_ids = {}
@@ -372,6 +482,11 @@ class Agency:
                     self._get_agent_by_name(items["agent"]),
                     self._get_agent_by_name(
                         items["recipient_agent"]))
+                self._init_tool_executor(self.agents_and_threads[agent_name][other_agent])
+                self.agents_and_threads[agent_name][other_agent].conversation_store = self.conversation_store
+                if self.worker_pool:
+                    self.agents_and_threads[agent_name][other_agent].worker_pool = self.worker_pool
+                    self.agents_and_threads[agent_name][other_agent].max_queue_size = self.async_max_queue_size
 
                 if agent_name in loaded_thread_ids and other_agent in loaded_thread_ids[agent_name]:
                     self.agents_and_threads[agent_name][other_agent].id = loaded_thread_ids[agent_name][other_agent]
@@ -390,6 +505,18 @@ class Agency:
 
             self.threads_callbacks["save"](loaded_thread_ids)
 
+    def _init_tool_executor(self, thread):
+        """
+        Sets the tool executor of a thread according to the tool_executor backend of the agency.
+
+        Each thread gets its own executor, so nested conversations started by parallel tool calls never wait for
+        workers of the pool that is executing them.
+
+        Parameters:
+            thread (Thread): The thread to set the tool executor for.
+        """
+        thread.tool_executor = ToolExecutor(self.tool_executor) if self.tool_executor else None
+
     def _parse_agency_chart(self, agency_chart):
         """
         Parses the provided agency chart to initialize and organize agents within the agency.
@@ -398,48 +525,20 @@ class Agency:
             agency_chart: A structure representing the hierarchical organization of agents within the agency.
                     It can contain Agent objects and lists of Agent objects.
 
-        This method iterates through each node in the agency chart. If a node is an Agent, it is set as the CEO if not already assigned.
-        If a node is a list, it iterates through the agents in the list, adding them to the agency and establishing communication
-        threads between them. It raises an exception if the agency chart is invalid or if multiple CEOs are defined.
+        This method builds the indexed communication graph of the agency chart. The first agent at the top level of the chart is set as the CEO.
+        For each list in the chart, the agents in the list are added to the agency, and communication threads are established between them.
+        It raises an exception if the agency chart is invalid or if agent names are not unique.
         """
-        if not isinstance(agency_chart, list):
-            raise Exception("Invalid agency chart.")
-
-        if len(agency_chart) == 0:
-            raise Exception("Agency chart cannot be empty.")
-
-        for node in agency_chart:
-            if isinstance(node, Agent):
-                if not self.ceo:
-                    self.ceo = node
-                    self._add_agent(self.ceo)
-                else:
-                    self._add_agent(node)
-                self._add_main_recipient(node)
-
-            elif isinstance(node, list):
-                for i, agent in enumerate(node):
-                    if not isinstance(agent, Agent):
-                        raise Exception("Invalid agency chart.")
+        self.graph = AgencyGraph.from_chart(agency_chart)
+        self.ceo = self.graph.ceo
+        self.agents = self.graph.agents
+        self.main_recipients = self.graph.main_recipients
 
-                    index = self._add_agent(agent)
-
-                    if i == len(node) - 1:
-                        continue
-
-                    if agent.name not in self.agents_and_threads.keys():
-                        self.agents_and_threads[agent.name] = {}
-
-                    for other_agent in node:
-                        if other_agent.name == agent.name:
-                            continue
-                        if other_agent.name not in self.agents_and_threads[agent.name].keys():
-                            self.agents_and_threads[agent.name][other_agent.name] = {
-                                "agent": agent.name,
-                                "recipient_agent": other_agent.name,
-                            }
-            else:
-                raise Exception("Invalid agency chart.")
+        for agent_name, recipient_names in self.graph.adjacency.items():
+            self.agents_and_threads[agent_name] = {
+                recipient_name: {"agent": agent_name, "recipient_agent": recipient_name}
+                for recipient_name in recipient_names
+            }
 
     def _add_agent(self, agent):
         """
@@ -453,16 +552,7 @@ class Agency:
 
         This method adds an agent to the agency's list of agents. If the agent does not have an ID, it assigns a temporary unique ID. It checks for uniqueness of the agent's name before addition. The method returns the index of the agent in the agency's agents list, which is used for referencing the agent within the agency.
         """
-        if not agent.id:
-            # assign temp id
-            agent.id = "temp_id_" + str(uuid.uuid4())
-        if agent.id not in self._get_agent_ids():
-            if agent.name in self._get_agent_names():
-                raise Exception("Agent names must be unique.")
-            self.agents.append(agent)
-            return len(self.agents) - 1
-        else:
-            return self._get_agent_ids().index(agent.id)
+        return self.graph.add_agent(agent)
 
     def _add_main_recipient(self, agent):
         """
@@ -473,10 +563,7 @@ class Agency:
 
         This method adds an agent to the agency's list of main recipients. These are agents that can be directly contacted by the user.
         """
-        main_recipient_ids = [agent.id for agent in self.main_recipients]
-
-        if agent.id not in main_recipient_ids:
-            self.main_recipients.append(agent)
+        self.graph.add_main_recipient(agent)
 
     def _read_instructions(self, path):
         """
@@ -501,10 +588,9 @@ class Agency:
 
         No output parameters; this method modifies the agents' toolset internally.
         """
-        for agent_name, threads in self.agents_and_threads.items():
-            recipient_names = list(threads.keys())
-            recipient_agents = self._get_agents_by_names(recipient_names)
-            agent = self._get_agent_by_name(agent_name)
+        for agent_name in self.agents_and_threads:
+            recipient_agents = self.graph.get_recipients(agent_name)
+            agent = self.graph.get_agent(agent_name)
             agent.add_tool(self._create_send_message_tool(agent, recipient_agents))
             if self.async_mode:
                 agent.add_tool(self._create_get_response_tool(agent, recipient_agents))
@@ -522,7 +608,8 @@ class Agency:
             SendMessage: A SendMessage tool class that is dynamically created and configured for the given agent and its recipient agents. This tool allows the agent to send messages to the specified recipients, facilitating inter-agent communication within the agency.
         """
         recipient_names = [agent.name for agent in recipient_agents]
-        recipients = Enum("recipient", {name: name for name in recipient_names})
+        recipients = self._get_recipients_enum(agent, recipient_names)
+        valid_recipients = frozenset(recipient_names)
 
         agent_descriptions = ""
         for recipient_agent in recipient_agents:
@@ -553,12 +640,16 @@ class Agency:
 
             @field_validator('recipient')
             def check_recipient(cls, value):
-                if value.value not in recipient_names:
+                if value.value not in valid_recipients:
                     raise ValueError(f"Recipient {value} is not valid. Valid recipients are: {recipient_names}")
                 return value
 
             def run(self):
                 thread = outer_self.agents_and_threads[self.caller_agent.name][self.recipient.value]
+                span = get_current_span()
+                if span is not None and span.category == "tool":
+                    # the span of this tool call is the parent of the conversation with the recipient
+                    span.set_attribute("recipient", self.recipient.value)
 
                 if not outer_self.async_mode:
                     gen = thread.get_completion(message=self.message, message_files=self.message_files)
@@ -572,6 +663,25 @@ class Agency:
 
                 return message or ""
 
+            async def arun(self):
+                if outer_self.async_mode:
+                    # starting the task may call the API, so it runs off the event loop, in the context of the caller
+                    thread = outer_self.agents_and_threads[self.caller_agent.name][self.recipient.value]
+                    start_task = functools.partial(thread.get_completion_async, message=self.message,
+                                                   message_files=self.message_files)
+                    loop = asyncio.get_running_loop()
+                    yield await loop.run_in_executor(None, contextvars.copy_context().run, start_task)
+                    return
+
+                sync_thread = outer_self.agents_and_threads[self.caller_agent.name][self.recipient.value]
+                thread = outer_self._get_async_thread(sync_thread)
+                message = None
+                async for message in thread.get_completion(message=self.message, message_files=self.message_files):
+                    yield message
+                sync_thread.id = thread.id
+
+                yield message.content if message else ""
+
         SendMessage.caller_agent = agent
         if self.async_mode:
             SendMessage.__doc__ = self.send_message_tool_description_async
@@ -585,7 +695,8 @@ class Agency:
         Creates a CheckStatus tool to enable an agent to check the status of a task with a specified recipient agent.
         """
         recipient_names = [agent.name for agent in recipient_agents]
-        recipients = Enum("recipient", {name: name for name in recipient_names})
+        recipients = self._get_recipients_enum(agent, recipient_names)
+        valid_recipients = frozenset(recipient_names)
 
         outer_self = self
 
@@ -596,7 +707,7 @@ class Agency:
 
             @field_validator('recipient')
             def check_recipient(cls, value):
-                if value.value not in recipient_names:
+                if value.value not in valid_recipients:
                     raise ValueError(f"Recipient {value} is not valid. Valid recipients are: {recipient_names}")
                 return value
 
@@ -622,10 +733,28 @@ class Agency:
         Raises:
             Exception: If no agent with the given name is found in the agency.
         """
-        for agent in self.agents:
-            if agent.name == agent_name:
-                return agent
-        raise Exception(f"Agent {agent_name} not found.")
+        return self.graph.get_agent(agent_name)
+
+    def _get_async_thread(self, thread):
+        """
+        Retrieves the AsyncThread that mirrors the given thread, creating it if necessary.
+
+        Parameters:
+            thread (Thread): The thread to retrieve the async counterpart for.
+
+        Returns:
+            AsyncThread: The async thread that shares the OpenAI thread id with the given thread.
+        """
+        async_thread = self.async_threads.get(thread)
+        if async_thread is None:
+            async_thread = AsyncThread(thread.agent, thread.recipient_agent)
+            async_thread.tool_executor = thread.tool_executor
+            async_thread.conversation_store = thread.conversation_store
+            self.async_threads[thread] = async_thread
+        if thread.id and async_thread.id != thread.id:
+            async_thread.id = thread.id
+            async_thread.thread = None
+        return async_thread
 
     def _get_agents_by_names(self, agent_names):
         """
@@ -637,7 +766,17 @@ class Agency:
         Returns:
             A list of Agent objects corresponding to the given names.
         """
-        return [self._get_agent_by_name(agent_name) for agent_name in agent_names]
+        return [self.graph.get_agent(agent_name) for agent_name in agent_names]
+
+    def _get_recipients_enum(self, agent, recipient_names):
+        """
+        Returns the enum of recipient names for the SendMessage and GetResponse tools of an agent.
+
+        The enum of the recipients of an agent in the agency graph is created once and shared by both tools.
+        """
+        if recipient_names == self.graph.get_recipient_names(agent.name):
+            return self.graph.get_recipients_enum(agent.name)
+        return Enum("recipient", {name: name for name in recipient_names})
 
     def _get_agent_ids(self):
         """
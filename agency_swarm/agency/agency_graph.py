@@ -0,0 +1,152 @@
+import uuid
+from enum import Enum
+from typing import Dict, List, Optional, Type
+
+from agency_swarm.agents import Agent
+
+
+class AgencyGraph:
+    """
+    Indexed communication graph of an agency.
+
+    Agents are indexed by name and by id, and the communication flows are stored as an adjacency map from the name
+    of each agent to the ordered set of names of the agents it can send messages to. All lookups are constant time,
+    so parsing the agency chart and setting up threads scales linearly with the number of agents and flows.
+    """
+
+    def __init__(self):
+        self.agents: List[Agent] = []
+        self.main_recipients: List[Agent] = []
+        # sender name -> recipient names, dicts are used as insertion ordered sets
+        self.adjacency: Dict[str, Dict[str, None]] = {}
+        self._agents_by_name: Dict[str, Agent] = {}
+        self._agents_by_id: Dict[str, Agent] = {}
+        self._agent_indexes: Dict[str, int] = {}
+        self._main_recipient_ids = set()
+        self._recipients_enums: Dict[str, Type[Enum]] = {}
+
+    @classmethod
+    def from_chart(cls, agency_chart: List) -> "AgencyGraph":
+        """
+        Builds the graph of an agency chart.
+
+        Parameters:
+            agency_chart: A list of Agent objects, which can talk to the user, and lists of Agent objects, in which each
+                agent except the last one can send messages to the other agents of the list.
+
+        Returns:
+            AgencyGraph: The graph of the chart.
+        """
+        if not isinstance(agency_chart, list):
+            raise Exception("Invalid agency chart.")
+
+        if len(agency_chart) == 0:
+            raise Exception("Agency chart cannot be empty.")
+
+        graph = cls()
+        for node in agency_chart:
+            if isinstance(node, Agent):
+                graph.add_agent(node)
+                graph.add_main_recipient(node)
+
+            elif isinstance(node, list):
+                for agent in node:
+                    if not isinstance(agent, Agent):
+                        raise Exception("Invalid agency chart.")
+                    graph.add_agent(agent)
+
+                for agent in node[:-1]:
+                    recipients = graph.adjacency.setdefault(agent.name, {})
+                    for other_agent in node:
+                        if other_agent.name != agent.name:
+                            recipients[other_agent.name] = None
+            else:
+                raise Exception("Invalid agency chart.")
+
+        return graph
+
+    @property
+    def ceo(self) -> Optional[Agent]:
+        """The first agent that can talk to the user."""
+        return self.main_recipients[0] if self.main_recipients else None
+
+    def add_agent(self, agent: Agent) -> int:
+        """
+        Adds an agent to the graph, assigning a temporary id if necessary.
+
+        Parameters:
+            agent (Agent): The agent to add.
+
+        Returns:
+            int: The index of the agent in the agents list.
+        """
+        if not agent.id:
+            # assign temp id
+            agent.id = "temp_id_" + str(uuid.uuid4())
+        if agent.id in self._agent_indexes:
+            return self._agent_indexes[agent.id]
+        if agent.name in self._agents_by_name:
+            raise Exception("Agent names must be unique.")
+
+        self.agents.append(agent)
+        self._agents_by_name[agent.name] = agent
+        self._agents_by_id[agent.id] = agent
+        self._agent_indexes[agent.id] = len(self.agents) - 1
+        return len(self.agents) - 1
+
+    def add_main_recipient(self, agent: Agent):
+        """Adds an agent to the agents that can be directly contacted by the user."""
+        if agent.id not in self._main_recipient_ids:
+            self._main_recipient_ids.add(agent.id)
+            self.main_recipients.append(agent)
+
+    def reindex(self):
+        """Updates the id index, after agent ids were changed, e.g. when assistants were created."""
+        self._agents_by_id = {agent.id: agent for agent in self.agents}
+        self._agent_indexes = {agent.id: i for i, agent in enumerate(self.agents)}
+        self._main_recipient_ids = {agent.id for agent in self.main_recipients}
+
+    def get_agent(self, agent_name: str) -> Agent:
+        """
+        Returns the agent with the given name.
+
+        Raises:
+            Exception: If no agent with the given name is in the graph.
+        """
+        agent = self._agents_by_name.get(agent_name)
+        if agent is None:
+            raise Exception(f"Agent {agent_name} not found.")
+        return agent
+
+    def get_agent_by_id(self, agent_id: str) -> Optional[Agent]:
+        """Returns the agent with the given id, or None."""
+        return self._agents_by_id.get(agent_id)
+
+    def has_agent(self, agent_name: str) -> bool:
+        return agent_name in self._agents_by_name
+
+    def can_send(self, sender_name: str, recipient_name: str) -> bool:
+        """Returns whether an agent can send messages to another agent."""
+        return recipient_name in self.adjacency.get(sender_name, ())
+
+    def get_recipient_names(self, agent_name: str) -> List[str]:
+        """Returns the names of the agents an agent can send messages to, in the order of the chart."""
+        return list(self.adjacency.get(agent_name, ()))
+
+    def get_recipients(self, agent_name: str) -> List[Agent]:
+        """Returns the agents an agent can send messages to, in the order of the chart."""
+        return [self._agents_by_name[name] for name in self.adjacency.get(agent_name, ())]
+
+    def get_recipients_enum(self, agent_name: str) -> Type[Enum]:
+        """Returns the enum of the names of the agents an agent can send messages to, created once per agent."""
+        enum = self._recipients_enums.get(agent_name)
+        if enum is None:
+            enum = Enum("recipient", {name: name for name in self.adjacency.get(agent_name, ())})
+            self._recipients_enums[agent_name] = enum
+        return enum
+
+    def get_edges(self):
+        """Yields (sender name, recipient name) pairs of all communication flows, in the order of the chart."""
+        for agent_name, recipients in self.adjacency.items():
+            for recipient_name in recipients:
+                yield agent_name, recipient_name
@@ -14,6 +14,8 @@ class CreateAgentTemplate(BaseTool):
     """
     This tool creates a template folder for a new agent. Always use this tool first, before creating tools or APIs for the agent.
     """
+    parallel_safe = False
+
     agent_name: str = Field(
         ..., description="Name of the agent to be created. Cannot include special characters or spaces."
     )
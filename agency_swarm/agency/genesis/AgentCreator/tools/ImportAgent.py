@@ -16,6 +16,8 @@ class ImportAgent(BaseTool):
     """
     This tool imports an existing agent from agency swarm framework. Please make sure to first use the GetAvailableAgents tool to get the list of available agents.
     """
+    parallel_safe = False
+
     agent_name: str = Field(...,
                             description="Name of the agent to be imported.")
 
@@ -7,6 +7,7 @@ class ReadManifesto(BaseTool):
     """
     This tool reads a manifesto for the agency being created from a markdown file.
     """
+    parallel_safe = False
 
     def run(self):
         os.chdir(self.shared_state.get("agency_path"))
@@ -13,6 +13,8 @@ class CreateAgencyFolder(BaseTool):
     """
     This tool creates or modifies an agency folder. You can use it again with the same agency_name to modify a previously created agency, if the user wants to change the agency chart or the manifesto.
     """
+    parallel_safe = False
+
     agency_name: str = Field(
         ..., description="Name of the agency to be created. Must not contain spaces or special characters.",
         examples=["AgencyName", "MyAgency", "ExampleAgency"]
@@ -11,6 +11,7 @@ class FinalizeAgency(BaseTool):
     """
     This tool finalizes the agency structure and it's imports. Please make sure to use at only at the very end, after all agents have been created.
     """
+    parallel_safe = False
 
     def run(self):
         os.chdir(self.shared_state.get("agency_path"))
@@ -14,6 +14,8 @@ class CreateToolsFromOpenAPISpec(BaseTool):
     """
     This tool creates a set of tools from an OpenAPI specification. Each method in the specification is converted to a separate tool.
     """
+    parallel_safe = False
+
     agent_name: str = Field(
         ..., description="Name of the agent to create the API for. Must be an existing agent."
     )
@@ -32,7 +34,8 @@ class CreateToolsFromOpenAPISpec(BaseTool):
 
         try:
             try:
-                tools = ToolFactory.from_openapi_schema(self.openapi_spec)
+                # build all models now, to report errors in the spec to the agent
+                tools = ToolFactory.from_openapi_schema(self.openapi_spec, lazy=False, cache_dir=False)
             except Exception as e:
                 raise ValueError(f"Error creating tools from OpenAPI Spec: {e}")
 
@@ -12,6 +12,8 @@ class CreateTool(BaseTool):
     """
     This tool creates tools for the agent.
     """
+    parallel_safe = False
+
     agent_name: str = Field(
         ..., description="Name of the agent to create the tool for."
     )
@@ -10,6 +10,8 @@ class TestTool(BaseTool):
     """
     This tool tests other tools defined in tools.py file with the given arguments. Make sure to define the run method before testing.
     """
+    parallel_safe = False
+
     agent_name: str = Field(
         ..., description="Name of the agent to test the tool for."
     )
@@ -1,3 +1,4 @@
+import hashlib
 import inspect
 import json
 import os
@@ -5,11 +6,20 @@ from typing import Dict, Union, Any, Type
 from typing import List
 
 from deepdiff import DeepDiff
+from openai.types.beta import Assistant
 
 from agency_swarm.tools import BaseTool, ToolFactory
 from agency_swarm.tools import Retrieval, CodeInterpreter
+from agency_swarm.util.file_uploader import get_file_uploader
 from agency_swarm.util.oai import get_openai_client
 from agency_swarm.util.openapi import validate_openapi_spec
+from agency_swarm.util.settings_store import SettingsStore
+
+# assistant metadata key of the configuration fingerprint, see Agent.get_fingerprint
+FINGERPRINT_METADATA_KEY = "agency_swarm_fingerprint"
+
+# maximum number of assistant metadata keys accepted by OpenAI
+MAX_METADATA_KEYS = 16
 
 
 class Agent():
@@ -23,9 +33,18 @@ class Agent():
     def assistant(self, value):
         self._assistant = value
 
+    @property
+    def tools(self):
+        return self._tools
+
+    @tools.setter
+    def tools(self, value):
+        self._tools = value
+        self._index_functions()
+
     @property
     def functions(self):
-        return [tool for tool in self.tools if issubclass(tool, BaseTool)]
+        return list(self._functions.values())
 
     def __init__(
             self,
@@ -80,6 +99,7 @@ class Agent():
         self.model = model
 
         self.settings_path = './settings.json'
+        self.settings_store = None
 
         # private attributes
         self._assistant: Any = None
@@ -90,10 +110,7 @@ class Agent():
         self._read_instructions()
 
         # upload files
-        prev_timeout = self.client.timeout
-        self.client.timeout = 120 if prev_timeout < 120 else prev_timeout # default timeout is too low for file large file uploads
         self._upload_files()
-        self.client.timeout = prev_timeout
 
         self._parse_schemas()
         self._parse_tools_folder()
@@ -110,9 +127,6 @@ class Agent():
             self: Returns the agent instance for chaining methods or further processing.
         """
 
-        # check if settings.json exists
-        path = self.get_settings_path()
-
         # load assistant from id
         if self.id:
             self.assistant = self.client.beta.assistants.retrieve(self.id)
@@ -120,7 +134,7 @@ class Agent():
             self.name = self.assistant.name
             self.description = self.assistant.description
             self.file_ids = self.assistant.file_ids
-            self.metadata = self.assistant.metadata
+            self.metadata = {k: v for k, v in self.assistant.metadata.items() if k != FINGERPRINT_METADATA_KEY}
             self.model = self.assistant.model
             # update assistant if parameters are different
             if not self._check_parameters(self.assistant.model_dump()):
@@ -128,20 +142,28 @@ class Agent():
             return self
 
         # load assistant from settings
-        if os.path.exists(path):
-            with open(path, 'r') as f:
-                settings = json.load(f)
-                # iterate settings and find the assistant with the same name
-                for assistant_settings in settings:
-                    if assistant_settings['name'] == self.name:
-                        self.assistant = self.client.beta.assistants.retrieve(assistant_settings['id'])
-                        self.id = assistant_settings['id']
-                        # update assistant if parameters are different
-                        if not self._check_parameters(self.assistant.model_dump()):
-                            print("Updating assistant... " + self.name)
-                            self._update_assistant()
-                        self._update_settings()
-                        return self
+        assistant_settings = self.get_settings_store().get_by_name(self.name)
+        if assistant_settings:
+            fingerprint = self.get_fingerprint()
+            # unchanged agents are loaded from the settings without any api calls
+            if self._get_fingerprint_from_settings(assistant_settings) == fingerprint:
+                self.assistant = Assistant(**assistant_settings)
+                self.id = assistant_settings['id']
+                return self
+
+            self.assistant = self.client.beta.assistants.retrieve(assistant_settings['id'])
+            self.id = assistant_settings['id']
+            if self._can_store_fingerprint():
+                # update assistant if parameters are different, or to store the fingerprint of an assistant without one
+                needs_update = self._get_fingerprint_from_settings(self.assistant.model_dump()) != fingerprint
+            else:
+                # the metadata has no room for the fingerprint, compare the parameters
+                needs_update = not self._check_parameters(self.assistant.model_dump())
+            if needs_update:
+                print("Updating assistant... " + self.name)
+                self._update_assistant()
+            self._update_settings()
+            return self
 
         # create assistant if settings.json does not exist or assistant with the same name does not exist
         self.assistant = self.client.beta.assistants.create(
@@ -150,7 +172,7 @@ class Agent():
             instructions=self.instructions,
             tools=self.get_oai_tools(),
             file_ids=self.file_ids,
-            metadata=self.metadata,
+            metadata=self._get_metadata_with_fingerprint(),
             model=self.model
         )
 
@@ -177,7 +199,7 @@ class Agent():
             "instructions": self.instructions,
             "tools": self.get_oai_tools(),
             "file_ids": self.file_ids,
-            "metadata": self.metadata,
+            "metadata": self._get_metadata_with_fingerprint(),
             "model": self.model
         }
         params = {k: v for k, v in params.items() if v}
@@ -188,25 +210,6 @@ class Agent():
         self._update_settings()
 
     def _upload_files(self):
-        def add_id_to_file(f_path, id):
-            """Add file id to file name"""
-            if os.path.isfile(f_path):
-                file_name, file_ext = os.path.splitext(f_path)
-                f_path_new = file_name + "_" + id + file_ext
-                os.rename(f_path, f_path_new)
-                return f_path_new
-
-        def get_id_from_file(f_path):
-            """Get file id from file name"""
-            if os.path.isfile(f_path):
-                file_name, file_ext = os.path.splitext(f_path)
-                file_name = os.path.basename(file_name)
-                file_name = file_name.split("_")
-                if len(file_name) > 1:
-                    return file_name[-1] if "file-" in file_name[-1] else None
-                else:
-                    return None
-
         files_folders = self.files_folder if isinstance(self.files_folder, list) else [self.files_folder]
 
         for files_folder in files_folders:
@@ -218,37 +221,43 @@ class Agent():
                     f_path = os.path.normpath(f_path)
 
                 if os.path.isdir(f_path):
-                    f_paths = os.listdir(f_path)
-
-                    f_paths = [f for f in f_paths if not f.startswith(".")]
-
-                    f_paths = [os.path.join(f_path, f) for f in f_paths]
-
-                    # uploading files
-                    for f_path in f_paths:
-                        f_path = f_path.strip()
-                        file_id = get_id_from_file(f_path)
-                        if file_id:
-                            print("File already uploaded. Skipping... " + os.path.basename(f_path))
-                            self.file_ids.append(file_id)
-                        else:
-                            print("Uploading new file... " + os.path.basename(f_path))
-                            with open(f_path, 'rb') as f:
-                                file_id = self.client.files.create(file=f, purpose="assistants").id
-                                self.file_ids.append(file_id)
-                                f.close()
-                            add_id_to_file(f_path, file_id)
+                    self.add_file_ids(get_file_uploader().upload_folder(f_path))
                 else:
                     print("Files folder path is not a directory. Skipping... ", f_path)
             else:
                 print("Files folder path must be a string or list of strings. Skipping... ", files_folder)
 
+    def add_file_ids(self, file_ids: List[str]):
+        """
+        Adds uploaded files to the agent, skipping files it already has. Adds the Retrieval tool if the agent has
+        neither Retrieval nor CodeInterpreter.
+
+        Parameters:
+            file_ids (List[str]): The ids of the uploaded files.
+        """
+        for file_id in file_ids:
+            if file_id not in self.file_ids:
+                self.file_ids.append(file_id)
+
         if Retrieval not in self.tools and CodeInterpreter not in self.tools and self.file_ids:
             print("Detected files without Retrieval. Adding Retrieval tool...")
             self.add_tool(Retrieval)
 
     # --- Tool Methods ---
 
+    def get_function(self, name: str):
+        """
+        Returns the function tool with the given name, or None if the agent does not have such a tool.
+
+        Parameters:
+            name (str): The name of the tool class.
+        """
+        return self._functions.get(name)
+
+    def _index_functions(self):
+        self._functions = {tool.__name__: tool for tool in self._tools
+                           if isinstance(tool, type) and issubclass(tool, BaseTool)}
+
     def add_tool(self, tool):
         if not isinstance(tool, type):
             raise Exception("Tool must not be initialized.")
@@ -272,6 +281,7 @@ class Agent():
             self.tools.append(tool)
         else:
             raise Exception("Invalid tool type.")
+        self._index_functions()
 
     def get_oai_tools(self):
         tools = []
@@ -381,8 +391,10 @@ class Agent():
         Returns:
             bool: True if all the agent's parameters match the assistant settings, False otherwise.
 
-        This method compares the current agent's parameters such as name, description, instructions, tools, file IDs, metadata, and model with the given assistant settings. It uses DeepDiff to compare complex structures like tools and metadata. If any parameter does not match, it returns False; otherwise, it returns True.
+        This method compares the current agent's parameters such as name, description, instructions, tools, file IDs, metadata, and model with the given assistant settings. If the settings contain the fingerprint of the current parameters, it returns True right away. Otherwise, it uses DeepDiff to compare complex structures like tools and metadata. If any parameter does not match, it returns False; otherwise, it returns True.
         """
+        if self._get_fingerprint_from_settings(assistant_settings) == self.get_fingerprint():
+            return True
 
         if self.name != assistant_settings['name']:
             return False
@@ -395,46 +407,70 @@ class Agent():
             return False
         if set(self.file_ids) != set(assistant_settings['file_ids']):
             return False
-        metadata_diff = DeepDiff(self.metadata, assistant_settings['metadata'], ignore_order=True)
+        metadata = {k: v for k, v in (assistant_settings['metadata'] or {}).items() if k != FINGERPRINT_METADATA_KEY}
+        metadata_diff = DeepDiff(self.metadata, metadata, ignore_order=True)
         if metadata_diff != {}:
             return False
         if self.model != assistant_settings['model']:
             return False
         return True
 
+    def get_fingerprint(self):
+        """
+        Returns a stable hash of the assistant configuration of the agent.
+
+        The hash covers the name, description, instructions, tools, file IDs, metadata and model. Tools and file IDs are
+        canonicalized, so their order does not change the fingerprint. The fingerprint is stored in the assistant
+        metadata, so unchanged agents can be loaded from the settings without any API calls. Agents whose metadata
+        already uses all keys allowed by OpenAI are retrieved and compared instead.
+        """
+        config = {
+            "name": self.name,
+            "description": self.description,
+            "instructions": self.instructions,
+            "tools": sorted(json.dumps(tool, sort_keys=True, default=str) for tool in self.get_oai_tools()),
+            "file_ids": sorted(self.file_ids),
+            "metadata": {k: v for k, v in self.metadata.items() if k != FINGERPRINT_METADATA_KEY},
+            "model": self.model,
+        }
+        config = json.dumps(config, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(config.encode()).hexdigest()
+
+    def _can_store_fingerprint(self):
+        return FINGERPRINT_METADATA_KEY in self.metadata or len(self.metadata) < MAX_METADATA_KEYS
+
+    def _get_metadata_with_fingerprint(self):
+        """Returns the metadata of the agent with its fingerprint, or without it if all metadata keys are used."""
+        if not self._can_store_fingerprint():
+            return dict(self.metadata)
+        return {**self.metadata, FINGERPRINT_METADATA_KEY: self.get_fingerprint()}
+
+    @staticmethod
+    def _get_fingerprint_from_settings(assistant_settings):
+        return (assistant_settings.get('metadata') or {}).get(FINGERPRINT_METADATA_KEY)
+
     def _save_settings(self):
-        path = self.get_settings_path()
-        # check if settings.json exists
-        if not os.path.isfile(path):
-            with open(path, 'w') as f:
-                json.dump([self.assistant.model_dump()], f, indent=4)
-        else:
-            settings = []
-            with open(path, 'r') as f:
-                settings = json.load(f)
-                settings.append(self.assistant.model_dump())
-            with open(path, 'w') as f:
-                json.dump(settings, f, indent=4)
+        self.get_settings_store().upsert(self.assistant.model_dump())
 
     def _update_settings(self):
-        path = self.get_settings_path()
-        # check if settings.json exists
-        if os.path.isfile(path):
-            settings = []
-            with open(path, 'r') as f:
-                settings = json.load(f)
-                for i, assistant_settings in enumerate(settings):
-                    if assistant_settings['id'] == self.id:
-                        settings[i] = self.assistant.model_dump()
-                        break
-            with open(path, 'w') as f:
-                json.dump(settings, f, indent=4)
+        store = self.get_settings_store()
+        if store.get_by_id(self.id):
+            store.upsert(self.assistant.model_dump())
 
     # --- Helper Methods ---
 
     def get_settings_path(self):
         return self.settings_path
 
+    def get_settings_store(self):
+        """
+        Returns the settings store of the agent. Agencies share one store between all their agents, standalone agents
+        create a store for their settings path.
+        """
+        if self.settings_store is None or self.settings_store.path != self.get_settings_path():
+            self.settings_store = SettingsStore(self.get_settings_path())
+        return self.settings_store
+
     def _read_instructions(self):
         class_instructions_path = os.path.normpath(os.path.join(self.get_class_folder_path(), self.instructions))
         if os.path.isfile(class_instructions_path):
@@ -484,15 +520,6 @@ class Agent():
         self._delete_settings()
 
     def _delete_settings(self):
-        path = self.get_settings_path()
-        # check if settings.json exists
-        if os.path.isfile(path):
-            settings = []
-            with open(path, 'r') as f:
-                settings = json.load(f)
-                for i, assistant_settings in enumerate(settings):
-                    if assistant_settings['id'] == self.id:
-                        settings.pop(i)
-                        break
-            with open(path, 'w') as f:
-                json.dump(settings, f, indent=4)
+        store = self.get_settings_store()
+        if store.get_by_id(self.id):
+            store.delete(self.id)
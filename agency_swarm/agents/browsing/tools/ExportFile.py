@@ -2,28 +2,31 @@ import base64
 import os
 
 from agency_swarm import BaseTool, get_openai_client
-from .util import get_web_driver
+from .util import get_web_driver, set_web_driver
 
 
 class ExportFile(BaseTool):
     """This tool converts the current full web page into a file and returns its file_id. You can then analyze this file using the myfiles_browser tool."""
+    parallel_safe = False
 
     def run(self):
-        wd = get_web_driver()
-
-        client = get_openai_client()
-
-        # Define the parameters for the PDF
-        params = {
-            'landscape': False,
-            'displayHeaderFooter': False,
-            'printBackground': True,
-            'preferCSSPageSize': True,
-        }
-
-        # Execute the command to print to PDF
-        result = wd.execute_cdp_cmd('Page.printToPDF', params)
-        pdf = result['data']
+        wd = get_web_driver(self.caller_agent)
+        try:
+            client = get_openai_client()
+
+            # Define the parameters for the PDF
+            params = {
+                'landscape': False,
+                'displayHeaderFooter': False,
+                'printBackground': True,
+                'preferCSSPageSize': True,
+            }
+
+            # Execute the command to print to PDF
+            result = wd.execute_cdp_cmd('Page.printToPDF', params)
+            pdf = result['data']
+        finally:
+            set_web_driver(wd, self.caller_agent)
 
         pdf_bytes = base64.b64decode(pdf)
 
@@ -1,22 +1,22 @@
-import time
-
 from agency_swarm.tools import BaseTool
 
 from .util.selenium import get_web_driver, set_web_driver
+from .util.wait_until_settled import wait_until_settled
 
 
 class GoBack(BaseTool):
     """
     This tool allows you to go back 1 page in the browser history. Use it in case of a mistake or if a page shows you unexpected content.
     """
+    parallel_safe = False
 
     def run(self):
-        wd = get_web_driver()
-
-        wd.back()
-
-        time.sleep(3)
+        wd = get_web_driver(self.caller_agent)
+        try:
+            wd.back()
 
-        set_web_driver(wd)
+            wait_until_settled(wd)
 
-        return "Success. Went back 1 page. Current URL is: " + wd.current_url
+            return "Success. Went back 1 page. Current URL is: " + wd.current_url
+        finally:
+            set_web_driver(wd, self.caller_agent)
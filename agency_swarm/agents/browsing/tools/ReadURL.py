@@ -1,9 +1,8 @@
-import time
-
 from pydantic import Field
 
 from agency_swarm.tools import BaseTool
 from .util.selenium import get_web_driver, set_web_driver
+from .util.wait_until_settled import wait_until_settled
 
 
 class ReadURL(BaseTool):
@@ -14,19 +13,21 @@ that you think might contain the answer to the user's question or perform a goog
 to click on the link that you think might contain the desired information on the current web page.
 Remember, this tool only supports opening 1 URL at a time. Previous URL will be closed when you open a new one.
     """
+    parallel_safe = False
+
     url: str = Field(
         ..., description="URL of the webpage.", examples=["https://google.com/search?q=search"]
     )
 
     def run(self):
-        wd = get_web_driver()
-
-        wd.get(self.url)
+        wd = get_web_driver(self.caller_agent)
+        try:
+            wd.get(self.url)
 
-        time.sleep(2)
+            wait_until_settled(wd)
 
-        # remove all popups
-        js_script = """
+            # remove all popups
+            js_script = """
         var popUpSelectors = ['modal', 'popup', 'overlay', 'dialog']; // Add more selectors that are commonly used for pop-ups
         popUpSelectors.forEach(function(selector) {
             var elements = document.querySelectorAll(selector);
@@ -37,9 +38,8 @@ Remember, this tool only supports opening 1 URL at a time. Previous URL will be
         });
         """
 
-        wd.execute_script(js_script)
-
-        set_web_driver(wd)
-
-        return "Current URL is: " + wd.current_url + "\n"
+            wd.execute_script(js_script)
 
+            return "Current URL is: " + wd.current_url + "\n"
+        finally:
+            set_web_driver(wd, self.caller_agent)
@@ -7,8 +7,8 @@ from selenium.webdriver.support.expected_conditions import presence_of_element_l
 from selenium.webdriver.support.wait import WebDriverWait
 
 from agency_swarm.tools import BaseTool
-from .util import get_b64_screenshot, remove_highlight_and_labels
-from .util.selenium import get_web_driver
+from .util import get_screenshot_data_url, remove_highlight_and_labels, wait_until_settled
+from .util.selenium import get_web_driver, set_web_driver
 from agency_swarm.util import get_openai_client
 
 
@@ -16,10 +16,16 @@ class SolveCaptcha(BaseTool):
     """
     This tool asks a human to solve captcha on the current webpage. Make sure that captcha is visible before running it.
     """
+    parallel_safe = False
 
     def run(self):
-        wd = get_web_driver()
+        wd = get_web_driver(self.caller_agent)
+        try:
+            return self.solve(wd)
+        finally:
+            set_web_driver(wd, self.caller_agent)
 
+    def solve(self, wd):
         try:
             WebDriverWait(wd, 10).until(
                 frame_to_be_available_and_switch_to_it((By.XPATH, "//iframe[@title='reCAPTCHA']"))
@@ -53,7 +59,8 @@ class SolveCaptcha(BaseTool):
                 (By.XPATH, "//iframe[@title='recaptcha challenge expires in two minutes']"))
         )
 
-        time.sleep(2)
+        # wait for the images of the challenge to load
+        wait_until_settled(wd)
 
         attempts = 0
         while attempts < 5:
@@ -67,7 +74,7 @@ class SolveCaptcha(BaseTool):
             i = 0
             for tile in tiles:
                 i += 1
-                screenshot = get_b64_screenshot(wd, tile)
+                screenshot = get_screenshot_data_url(wd, tile)
 
                 # save screenshot locally
                 # with open(f"screenshot{i}.png", "wb") as fh:
@@ -84,7 +91,7 @@ class SolveCaptcha(BaseTool):
                         "type": "image_url",
                         "image_url":
                             {
-                                "url": f"data:image/png;base64,{screenshot}",
+                                "url": screenshot,
                                 "detail": "high",
                             }
                     },
@@ -152,7 +159,7 @@ class SolveCaptcha(BaseTool):
                 # Click the button
                 verify_button.click()
 
-                time.sleep(1)
+                wait_until_settled(wd)
 
                 try:
                     if self.verify_checkbox(wd):
@@ -170,7 +177,8 @@ class SolveCaptcha(BaseTool):
                     tiles[number - 1].click()
                     time.sleep(0.5)
 
-                time.sleep(3)
+                # wait for the replaced tiles to fade in
+                wait_until_settled(wd)
 
                 if not continuous_task:
                     # Find the button by its ID
@@ -1,3 +1,5 @@
-from .get_b64_screenshot import get_b64_screenshot
-from .selenium import get_web_driver, set_web_driver
-from .highlights import remove_highlight_and_labels, highlight_elements_with_labels
+from .get_b64_screenshot import get_b64_screenshot, get_screenshot_data_url, capture_screenshot
+from .selenium import get_web_driver, set_web_driver, close_web_driver, browsing_session, WebDriverPool, \
+    get_web_driver_pool, set_web_driver_pool
+from .wait_until_settled import wait_until_settled
+from .highlights import remove_highlight_and_labels, highlight_elements_with_labels, get_highlighted_elements
@@ -1,8 +1,148 @@
+import base64
+import hashlib
+import io
+import threading
+from collections import OrderedDict
+from typing import Tuple
+
+from agency_swarm.util.metrics import get_metrics_registry
+
+SCREENSHOT_BYTE_BUCKETS = (10000, 25000, 50000, 100000, 250000, 500000, 1000000, 2500000, 5000000)
+
+MIME_TYPES = {"jpeg": "image/jpeg", "webp": "image/webp", "png": "image/png"}
+
+# sha1 of a captured image and the encoding settings -> (mime type, base64) of the image encoded with Pillow
+_encoded_screenshots = OrderedDict()
+_encoded_screenshots_lock = threading.Lock()
+ENCODED_SCREENSHOTS_CACHE_SIZE = 16
+
+_pillow_warning_shown = False
+
 
 def get_b64_screenshot(wd, element=None):
-    if element:
-        screenshot_b64 = element.screenshot_as_base64
+    """Returns a screenshot of the browser viewport, or of an element, as base64. See `capture_screenshot`."""
+    return capture_screenshot(wd, element)[1]
+
+
+def get_screenshot_data_url(wd, element=None):
+    """Returns a screenshot of the browser viewport, or of an element, as a data URL for vision models."""
+    mime_type, screenshot_b64 = capture_screenshot(wd, element)
+    return f"data:{mime_type};base64,{screenshot_b64}"
+
+
+def capture_screenshot(wd, element=None) -> Tuple[str, str]:
+    """
+    Captures a screenshot of the browser viewport, or of an element, downscaled to fit in `screenshot_max_width` x
+    `screenshot_max_height` and encoded as `screenshot_format` ("jpeg", "webp" or "png") with `screenshot_quality`,
+    optionally in grayscale (`screenshot_grayscale`), as set in the selenium config.
+
+    Viewport screenshots are scaled and encoded by Chrome. Element screenshots, grayscale and drivers without the
+    DevTools protocol are processed with Pillow, if it is installed; the images it encodes are cached by the hash of
+    the captured image, so repeated screenshots of an unchanged page skip the decoding and encoding. The size of each
+    screenshot is recorded in the `agency_swarm_screenshot_bytes` histogram.
+
+    Parameters:
+        wd: The web driver.
+        element (WebElement, optional): The element to capture. Defaults to the viewport.
+
+    Returns:
+        Tuple[str, str]: The mime type and the base64 encoded image.
+    """
+    from .selenium import selenium_config
+
+    settings = {
+        "max_width": selenium_config.get("screenshot_max_width", 1024),
+        "max_height": selenium_config.get("screenshot_max_height", 1024),
+        "format": selenium_config.get("screenshot_format", "jpeg"),
+        "quality": selenium_config.get("screenshot_quality", 80),
+        "grayscale": selenium_config.get("screenshot_grayscale", False),
+    }
+    if settings["format"] not in MIME_TYPES:
+        raise Exception(f"Unsupported screenshot format {settings['format']}. Use one of {list(MIME_TYPES)}.")
+
+    screenshot_b64 = None
+    if element is None:
+        screenshot_b64 = _capture_viewport(wd, settings)
+
+    if screenshot_b64 is not None and not settings["grayscale"]:
+        # already scaled and encoded by chrome
+        result, deduplicated = (MIME_TYPES[settings["format"]], screenshot_b64), False
     else:
-        screenshot_b64 = wd.get_screenshot_as_base64()
+        if screenshot_b64 is not None:
+            image = base64.b64decode(screenshot_b64)
+        elif element is not None:
+            image = element.screenshot_as_png
+        else:
+            image = wd.get_screenshot_as_png()
+        result, deduplicated = _deduplicate(image, settings, lambda: _encode(image, settings))
+
+    registry = get_metrics_registry()
+    if registry.enabled:
+        registry.histogram("agency_swarm_screenshot_bytes", "Size of the screenshots sent to vision models.",
+                           ("format",), SCREENSHOT_BYTE_BUCKETS).observe(len(result[1]), format=result[0])
+        if deduplicated:
+            registry.counter("agency_swarm_screenshot_cache_hits_total",
+                             "Screenshots of unchanged pages whose encoding was served from the cache.").inc()
+    return result
+
+
+def _capture_viewport(wd, settings):
+    """Captures the viewport with the DevTools protocol, scaled and encoded by Chrome. Returns None if unavailable."""
+    try:
+        metrics = wd.execute_cdp_cmd("Page.getLayoutMetrics", {})
+        viewport = metrics.get("cssVisualViewport") or metrics["visualViewport"]
+        # the deprecated visualViewport is in device pixels
+        device_pixel_ratio = metrics["visualViewport"]["clientWidth"] / viewport["clientWidth"] \
+            if "cssVisualViewport" in metrics and "visualViewport" in metrics else 1
+        width, height = viewport["clientWidth"], viewport["clientHeight"]
+        scale = min(1, settings["max_width"] / (width * device_pixel_ratio),
+                    settings["max_height"] / (height * device_pixel_ratio))
+
+        params = {
+            "format": settings["format"],
+            "clip": {"x": viewport["pageX"], "y": viewport["pageY"], "width": width, "height": height,
+                     "scale": scale},
+            "captureBeyondViewport": False,
+        }
+        if settings["format"] != "png":
+            params["quality"] = settings["quality"]
+        return wd.execute_cdp_cmd("Page.captureScreenshot", params)["data"]
+    except Exception:
+        return None
 
-    return screenshot_b64
\ No newline at end of file
+
+def _deduplicate(image: bytes, settings, encode) -> Tuple[Tuple[str, str], bool]:
+    """Returns the encoded screenshot of a captured image from the cache, or encodes it, and whether it was cached."""
+    key = hashlib.sha1(image + repr(sorted(settings.items())).encode()).hexdigest()
+    with _encoded_screenshots_lock:
+        if key in _encoded_screenshots:
+            _encoded_screenshots.move_to_end(key)
+            return _encoded_screenshots[key], True
+
+    result = encode()
+    with _encoded_screenshots_lock:
+        _encoded_screenshots[key] = result
+        while len(_encoded_screenshots) > ENCODED_SCREENSHOTS_CACHE_SIZE:
+            _encoded_screenshots.popitem(last=False)
+    return result, False
+
+
+def _encode(image: bytes, settings) -> Tuple[str, str]:
+    try:
+        from PIL import Image
+    except ImportError:
+        global _pillow_warning_shown
+        if not _pillow_warning_shown:
+            _pillow_warning_shown = True
+            print("Pillow not installed, screenshots are sent as captured. Please install it with pip install pillow")
+        return "image/png", base64.b64encode(image).decode()
+
+    with Image.open(io.BytesIO(image)) as captured:
+        captured.thumbnail((settings["max_width"], settings["max_height"]))
+        processed = captured.convert("L" if settings["grayscale"] else "RGB")
+    output = io.BytesIO()
+    if settings["format"] == "png":
+        processed.save(output, "PNG", optimize=True)
+    else:
+        processed.save(output, settings["format"].upper(), quality=settings["quality"])
+    return MIME_TYPES[settings["format"]], base64.b64encode(output.getvalue()).decode()
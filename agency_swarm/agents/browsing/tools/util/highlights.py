@@ -1,139 +1,165 @@
+OVERLAY_ID = "agency-swarm-highlights"
+
+# Finds the visible elements matching the selector (arguments[0]) and draws their borders and labels in a single overlay
+# layer on top of the page, without restyling the elements. The list of visible elements is cached on the page until a
+# mutation observer flags the DOM dirty, or the selector, scroll position or viewport changes. Their positions are read
+# on every draw, as transitions, font loads and images move elements without mutating the DOM.
+HIGHLIGHT_SCRIPT = """
+    var selector = arguments[0];
+    var overlayId = '%(overlay_id)s';
+
+    function isOverlayMutation(mutation) {
+        var target = mutation.target.nodeType === Node.ELEMENT_NODE ? mutation.target : mutation.target.parentElement;
+        if (target && target.closest('#' + overlayId)) {
+            return true;
+        }
+        var nodes = Array.from(mutation.addedNodes).concat(Array.from(mutation.removedNodes));
+        return nodes.length > 0 && nodes.every(function(node) { return node.id === overlayId; });
+    }
+
+    var state = window.__agencySwarmHighlights;
+    if (!state) {
+        state = window.__agencySwarmHighlights = {key: null, dirty: true, elements: []};
+        new MutationObserver(function(mutations) {
+            if (!state.dirty && !mutations.every(isOverlayMutation)) {
+                state.dirty = true;
+            }
+        }).observe(document.documentElement, {childList: true, subtree: true, attributes: true, characterData: true});
+    }
+
+    var viewportWidth = window.innerWidth || document.documentElement.clientWidth;
+    var viewportHeight = window.innerHeight || document.documentElement.clientHeight;
+    var key = [selector, window.scrollX, window.scrollY, viewportWidth, viewportHeight].join('|');
+
+    // read the layout of all elements before writing to the DOM
+    var rects;
+    if (state.dirty || state.key !== key) {
+        var elements = [];
+        rects = [];
+        document.querySelectorAll(selector).forEach(function(element) {
+            var rect = element.getBoundingClientRect();
+            if (rect.width <= 0 || rect.height <= 0 || rect.top >= viewportHeight || rect.bottom <= 0 ||
+                rect.left >= viewportWidth || rect.right <= 0) {
+                return;
+            }
+            if (element.checkVisibility) {
+                if (!element.checkVisibility({visibilityProperty: true, checkVisibilityCSS: true})) {
+                    return;
+                }
+            } else if (window.getComputedStyle(element).visibility === 'hidden') {
+                // visibility is inherited and display: none has no box, so no ancestors need to be checked
+                return;
+            }
+            elements.push(element);
+            rects.push([rect.top + window.scrollY, rect.left + window.scrollX, rect.width, rect.height]);
+        });
+        state.elements = elements;
+        state.key = key;
+        state.dirty = false;
+    } else {
+        rects = state.elements.map(function(element) {
+            var rect = element.getBoundingClientRect();
+            return [rect.top + window.scrollY, rect.left + window.scrollX, rect.width, rect.height];
+        });
+    }
+
+    var overlay = document.getElementById(overlayId);
+    if (overlay) {
+        overlay.remove();
+    }
+    overlay = document.createElement('div');
+    overlay.id = overlayId;
+    overlay.style.cssText = 'position: absolute; top: 0; left: 0; width: 0; height: 0; ' +
+        'z-index: 2147483647; pointer-events: none;';
+    var fragment = document.createDocumentFragment();
+    rects.forEach(function(rect, index) {
+        var box = document.createElement('div');
+        box.style.cssText = 'position: absolute; box-sizing: border-box; border: 2px solid red; ' +
+            'top: ' + rect[0] + 'px; left: ' + rect[1] + 'px; width: ' + rect[2] + 'px; height: ' + rect[3] + 'px;';
+        fragment.appendChild(box);
+
+        var label = document.createElement('div');
+        label.textContent = (index + 1).toString();
+        // above the element, but not above the top of the viewport
+        label.style.cssText = 'position: absolute; background: yellow; color: black; font-size: 25px; ' +
+            'line-height: 1; padding: 3px 5px; border: 1px solid black; border-radius: 3px; ' +
+            'white-space: nowrap; box-shadow: 0px 0px 2px #000; ' +
+            'top: ' + Math.max(rect[0] - 25, window.scrollY) + 'px; left: ' + rect[1] + 'px;';
+        fragment.appendChild(label);
+    });
+    overlay.appendChild(fragment);
+    document.documentElement.appendChild(overlay);
+
+    return state.elements.length;
+""" % {"overlay_id": OVERLAY_ID}
+
+
 def highlight_elements_with_labels(driver, selector):
     """
-    This function highlights clickable elements like buttons, links, and certain divs and spans
-    that match the given CSS selector on the webpage with a red border and ensures that labels are visible and positioned
-    correctly within the viewport.
+    This function highlights the visible elements that match the given CSS selector on the webpage, like buttons,
+    links, and certain divs and spans, with a red border and a numbered label. Borders and labels are drawn in a
+    single overlay on top of the page, redrawn at the current position of the elements on every call. The list of
+    visible elements is cached until the DOM, the scroll position or the viewport changes.
 
     :param driver: Instance of Selenium WebDriver.
     :param selector: CSS selector for the elements to be highlighted.
     """
-    script = f"""
-        // Helper function to check if an element is visible
-        function isElementVisible(element) {{
-            var rect = element.getBoundingClientRect();
-            if (rect.width <= 0 || rect.height <= 0 || 
-                rect.top >= (window.innerHeight || document.documentElement.clientHeight) || 
-                rect.bottom <= 0 || 
-                rect.left >= (window.innerWidth || document.documentElement.clientWidth) || 
-                rect.right <= 0) {{
-                return false;
-            }}
-            // Check if any parent element is hidden, which would hide this element as well
-            var parent = element;
-            while (parent) {{
-                var style = window.getComputedStyle(parent);
-                if (style.display === 'none' || style.visibility === 'hidden') {{
-                    return false;
-                }}
-                parent = parent.parentElement;
-            }}
-            return true;
-        }}
-
-        // Remove previous labels and styles if they exist
-        document.querySelectorAll('.highlight-label').forEach(function(label) {{
-            label.remove();
-        }});
-        document.querySelectorAll('.highlighted-element').forEach(function(element) {{
-            element.classList.remove('highlighted-element');
-            element.removeAttribute('data-highlighted');
-        }});
-
-        // Inject custom style for highlighting elements
-        var styleElement = document.getElementById('highlight-style');
-        if (!styleElement) {{
-            styleElement = document.createElement('style');
-            styleElement.id = 'highlight-style';
-            document.head.appendChild(styleElement);
-        }}
-        styleElement.textContent = `
-            .highlighted-element {{ 
-                border: 2px solid red !important; 
-                position: relative; 
-                box-sizing: border-box; 
-            }}
-            .highlight-label {{ 
-                position: absolute; 
-                z-index: 2147483647; 
-                background: yellow; 
-                color: black; 
-                font-size: 25px; 
-                padding: 3px 5px; 
-                border: 1px solid black; 
-                border-radius: 3px; 
-                white-space: nowrap; 
-                box-shadow: 0px 0px 2px #000; 
-                top: -25px; 
-                left: 0; 
-                display: none;
-            }}
-        `;
-
-        // Function to create and append a label to the body
-        function createAndAdjustLabel(element, index) {{
-            if (!isElementVisible(element)) return;
-
-            element.classList.add('highlighted-element');
-            var label = document.createElement('div');
-            label.className = 'highlight-label';
-            label.textContent = index.toString();
-            label.style.display = 'block'; // Make the label visible
-
-            // Calculate label position
-            var rect = element.getBoundingClientRect();
-            var top = rect.top + window.scrollY - 25; // Position label above the element
-            var left = rect.left + window.scrollX;
+    driver.execute_script(HIGHLIGHT_SCRIPT, selector)
 
-            label.style.top = top + 'px';
-            label.style.left = left + 'px';
+    return driver
 
-            document.body.appendChild(label); // Append the label to the body
-        }}
 
-        // Select all clickable elements and apply the styles
-        var allElements = document.querySelectorAll('{selector}');
-        var index = 1;
-        allElements.forEach(function(element) {{
-            // Check if the element is not already highlighted and is visible
-            if (!element.dataset.highlighted && isElementVisible(element)) {{
-                element.dataset.highlighted = 'true';
-                createAndAdjustLabel(element, index++);
-            }}
-        }});
-        """
+# returns [label, text, tag, role, x, y, width, height, element, options] of each highlighted element
+HIGHLIGHTED_ELEMENTS_SCRIPT = """
+    var maxTextLength = arguments[0];
+    var maxOptions = arguments[1];
+    var state = window.__agencySwarmHighlights;
+    var elements = state ? state.elements : [];
+    return elements.map(function(element, index) {
+        var rect = element.getBoundingClientRect();
+        var text = (element.innerText || '').trim().slice(0, maxTextLength);
+        var options = null;
+        if (element.tagName === 'SELECT') {
+            options = Array.from(element.options).slice(0, maxOptions).map(function(option) {
+                return option.text;
+            });
+        }
+        return [index + 1, text, element.tagName.toLowerCase(), element.getAttribute('role'), Math.round(rect.left),
+                Math.round(rect.top), Math.round(rect.width), Math.round(rect.height), element, options];
+    });
+"""
+
+
+def get_highlighted_elements(driver, max_text_length=200, max_options=12):
+    """
+    This function returns the elements highlighted by `highlight_elements_with_labels` in a single WebDriver call,
+    ordered by their label.
 
-    driver.execute_script(script)
+    :param driver: Instance of Selenium WebDriver.
+    :param max_text_length: Maximum number of characters of the text of each element.
+    :param max_options: Maximum number of options returned for each dropdown.
+    :return: List of dicts with the `label`, `text`, `tag`, `role` and bounding box (`x`, `y`, `width`, `height`, in
+        viewport pixels) of each element, its WebElement handle (`element`), and the texts of its `options` if it is a
+        dropdown.
+    """
+    rows = driver.execute_script(HIGHLIGHTED_ELEMENTS_SCRIPT, max_text_length, max_options)
 
-    return driver
+    keys = ("label", "text", "tag", "role", "x", "y", "width", "height", "element", "options")
+    return [dict(zip(keys, row)) for row in rows]
 
 
 def remove_highlight_and_labels(driver):
     """
-    This function removes all red borders and labels from the webpage elements,
-    reversing the changes made by the highlight functions using Selenium WebDriver.
+    This function removes the borders and labels drawn by `highlight_elements_with_labels` by dropping their overlay.
+    The highlighted elements stay cached for the next highlight of the same page.
 
     :param driver: Instance of Selenium WebDriver.
     """
-    selector = ('a, button, input, textarea, div[onclick], div[role="button"], div[tabindex], span[onclick], '
-                'span[role="button"], span[tabindex]')
-    script = f"""
-        // Remove all labels
-        document.querySelectorAll('.highlight-label').forEach(function(label) {{
-            label.remove();
-        }});
-
-        // Remove the added style for red borders
-        var highlightStyle = document.getElementById('highlight-style');
-        if (highlightStyle) {{
-            highlightStyle.remove();
+    driver.execute_script(f"""
+        var overlay = document.getElementById('{OVERLAY_ID}');
+        if (overlay) {{
+            overlay.remove();
         }}
+        """)
 
-        // Remove inline styles added by highlighting function
-        document.querySelectorAll('{selector}').forEach(function(element) {{
-            element.style.border = '';
-        }});
-        """
-
-    driver.execute_script(script)
-
-    return driver
\ No newline at end of file
+    return driver
@@ -1,20 +1,32 @@
-import json
+import contextvars
 import os
+import threading
 import time
-from urllib.parse import urlparse
+from contextlib import contextmanager
+from typing import Any, Dict, Hashable, List
 
 from .highlights import remove_highlight_and_labels
 
-wd = None
-
 selenium_config = {
     "chrome_profile_path": None,
     "headless": False,
     "full_page_screenshot": False,
+    # upper bound and quiet time of the waits for pages to settle, see wait_until_settled
+    "page_settle_timeout": 10,
+    "page_settle_idle_time": 0.5,
+    # size and encoding of the screenshots sent to vision models, see capture_screenshot
+    "screenshot_max_width": 1024,
+    "screenshot_max_height": 1024,
+    "screenshot_format": "jpeg",
+    "screenshot_quality": 80,
+    "screenshot_grayscale": False,
 }
 
+_browsing_session = contextvars.ContextVar("agency_swarm_browsing_session", default=None)
+
 
-def get_web_driver():
+def create_web_driver():
+    """Starts a new Chrome web driver configured with `selenium_config`."""
     try:
         from selenium import webdriver
         from selenium.webdriver.chrome.service import Service as ChromeService
@@ -34,12 +46,6 @@ def get_web_driver():
         print("selenium_stealth not installed. Please install it with pip install selenium-stealth")
         raise ImportError
 
-    global wd
-
-    if wd:
-        return wd
-
-    global selenium_config
     chrome_profile_path = selenium_config.get("chrome_profile_path", None)
     profile_directory = None
     user_data_dir = None
@@ -70,22 +76,25 @@ def get_web_driver():
     chrome_options.add_argument("--disable-gpu")
     chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
     chrome_options.add_experimental_option('useAutomationExtension', False)
+    # network events for wait_until_settled
+    chrome_options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    chrome_options.add_experimental_option("perfLoggingPrefs", {"enableNetwork": True, "enablePage": False})
     if user_data_dir and profile_directory:
         chrome_options.add_argument(f"user-data-dir={user_data_dir}")
         chrome_options.add_argument(f"profile-directory={profile_directory}")
 
     try:
-        wd = webdriver.Chrome(service=ChromeService(chrome_driver_path), options=chrome_options)
+        driver = webdriver.Chrome(service=ChromeService(chrome_driver_path), options=chrome_options)
         print("WebDriver initialized successfully.")
         # Print the actual profile path being used
-        if wd.capabilities['chrome']['userDataDir']:
-            print(f"Profile path in use: {wd.capabilities['chrome']['userDataDir']}")
+        if driver.capabilities['chrome']['userDataDir']:
+            print(f"Profile path in use: {driver.capabilities['chrome']['userDataDir']}")
     except Exception as e:
         print(f"Error initializing WebDriver: {e}")
         raise
 
     stealth(
-        wd,
+        driver,
         languages=["en-US", "en"],
         vendor="Google Inc.",
         platform="Win32",
@@ -94,16 +103,276 @@ def get_web_driver():
         fix_hairline=True,
     )
 
-    # wd.set_window_size(960, 1080)
-    wd.implicitly_wait(3)
+    # driver.set_window_size(960, 1080)
+    driver.implicitly_wait(3)
+
+    return driver
+
+
+class _PooledWebDriver:
+    __slots__ = ("driver", "leased", "last_used")
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.leased = True
+        self.last_used = time.monotonic()
+
+
+class WebDriverPool:
+    """
+    Pool of web drivers leased to browsing sessions.
+
+    Each session, by default one per browsing agent, gets its own browser, which keeps its page between the tool calls
+    of the session. Browsers are started on first use up to `max_size`; beyond that, the least recently used browser
+    that is not leased is closed for the new session. Browsers idle for longer than `idle_timeout` are closed, and a
+    browser that stopped responding is replaced by a new one on its next lease.
+
+    A Chrome profile can only be opened by one browser at a time, so use `max_size=1` with `chrome_profile_path`.
+    """
+
+    def __init__(self, max_size: int = 4, idle_timeout: float = 600, acquire_timeout: float = 300, factory=None):
+        """
+        Parameters:
+            max_size (int, optional): Maximum number of browsers open at once. Defaults to 4.
+            idle_timeout (float, optional): Seconds after which a browser that has not been used is closed.
+                Defaults to 600.
+            acquire_timeout (float, optional): Seconds to wait for a browser when all browsers of the pool are
+                leased. Defaults to 300.
+            factory (Callable, optional): Function that starts a new web driver. Defaults to `create_web_driver`.
+        """
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.acquire_timeout = acquire_timeout
+        self.factory = factory or create_web_driver
+
+        self._drivers: Dict[Hashable, _PooledWebDriver] = {}
+        # sessions whose browser is starting
+        self._starting = set()
+        self._condition = threading.Condition()
+        self._created = 0
+        self._recovered = 0
+        self._evicted = 0
+
+    def acquire(self, key: Hashable = None):
+        """
+        Leases the browser of a session, starting one if the session has none or its browser crashed.
+
+        Parameters:
+            key (Hashable, optional): The session.
+
+        Returns:
+            The web driver of the session.
+        """
+        self._quit(self._evict_idle())
+        with self._condition:
+            entry = self._drivers.get(key)
+            if entry is not None:
+                entry.leased = True
+                entry.last_used = time.monotonic()
+
+        if entry is not None:
+            if self.is_healthy(entry.driver):
+                return entry.driver
+            print(f"WebDriver of session {key} is not responding. Starting a new one.")
+            with self._condition:
+                if self._drivers.get(key) is entry:
+                    del self._drivers[key]
+                self._recovered += 1
+                self._condition.notify_all()
+            self._quit([entry.driver])
+
+        return self._start(key)
+
+    def release(self, key: Hashable = None, driver=None):
+        """
+        Ends the lease of the browser of a session. The browser stays open with its page for the next lease of the
+        session, until it is evicted.
+
+        Parameters:
+            key (Hashable, optional): The session.
+            driver (optional): The web driver the session continues with, if it replaced its browser.
+        """
+        replaced = None
+        with self._condition:
+            entry = self._drivers.get(key)
+            if entry is None:
+                if driver is None:
+                    return
+                entry = self._drivers[key] = _PooledWebDriver(driver)
+            elif driver is not None and driver is not entry.driver:
+                replaced = entry.driver
+                entry.driver = driver
+            entry.leased = False
+            entry.last_used = time.monotonic()
+            self._condition.notify_all()
+        if replaced is not None:
+            self._quit([replaced])
+
+    def discard(self, key: Hashable = None):
+        """Closes the browser of a session."""
+        with self._condition:
+            entry = self._drivers.pop(key, None)
+            self._condition.notify_all()
+        if entry is not None:
+            self._quit([entry.driver])
+
+    def close(self):
+        """Closes all browsers of the pool."""
+        with self._condition:
+            drivers = [entry.driver for entry in self._drivers.values()]
+            self._drivers.clear()
+            self._condition.notify_all()
+        self._quit(drivers)
+
+    @staticmethod
+    def is_healthy(driver) -> bool:
+        """Checks that a browser still responds."""
+        try:
+            driver.window_handles
+            return True
+        except Exception:
+            return False
 
-    return wd
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Returns a snapshot of the metrics of the pool.
+
+        Returns:
+            Dict[str, Any]: Number of `open` and `leased` browsers, and total number of browsers `created`,
+                `recovered` after they stopped responding and `evicted` because they were idle or to make room.
+        """
+        with self._condition:
+            return {
+                "max_size": self.max_size,
+                "open": len(self._drivers),
+                "leased": sum(entry.leased for entry in self._drivers.values()),
+                "created": self._created,
+                "recovered": self._recovered,
+                "evicted": self._evicted,
+            }
+
+    def _start(self, key):
+        deadline = time.monotonic() + self.acquire_timeout
+        evicted = None
+        with self._condition:
+            while True:
+                entry = self._drivers.get(key)
+                if entry is not None:
+                    # started by another caller of the same session
+                    entry.leased = True
+                    entry.last_used = time.monotonic()
+                    return entry.driver
+                if key not in self._starting:
+                    if len(self._drivers) + len(self._starting) < self.max_size:
+                        break
+                    idle = [(entry.last_used, idle_key) for idle_key, entry in self._drivers.items()
+                            if not entry.leased]
+                    if idle:
+                        evicted = self._drivers.pop(min(idle, key=lambda item: item[0])[1]).driver
+                        self._evicted += 1
+                        break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise Exception(f"All {self.max_size} browsers of the web driver pool are in use. "
+                                    f"Increase max_size of the pool or release the browsers of finished sessions.")
+                self._condition.wait(remaining)
+            self._starting.add(key)
+
+        if evicted is not None:
+            self._quit([evicted])
+        try:
+            driver = self.factory()
+        except BaseException:
+            with self._condition:
+                self._starting.discard(key)
+                self._condition.notify_all()
+            raise
+
+        with self._condition:
+            self._starting.discard(key)
+            self._drivers[key] = _PooledWebDriver(driver)
+            self._created += 1
+            self._condition.notify_all()
+        return driver
+
+    def _evict_idle(self) -> List:
+        if self.idle_timeout is None:
+            return []
+        now = time.monotonic()
+        with self._condition:
+            # leased browsers may be in use by a long running tool, they are only closed once released
+            keys = [key for key, entry in self._drivers.items()
+                    if not entry.leased and now - entry.last_used > self.idle_timeout]
+            drivers = [self._drivers.pop(key).driver for key in keys]
+            self._evicted += len(drivers)
+            if drivers:
+                self._condition.notify_all()
+        return drivers
+
+    @staticmethod
+    def _quit(drivers):
+        for driver in drivers:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+
+
+_web_driver_pool = WebDriverPool()
+
+
+def get_web_driver_pool() -> WebDriverPool:
+    """Returns the web driver pool shared by all browsing agents."""
+    return _web_driver_pool
+
+
+def set_web_driver_pool(pool: WebDriverPool):
+    """Sets the web driver pool shared by all browsing agents. The browsers of the previous pool are not closed."""
+    global _web_driver_pool
+    _web_driver_pool = pool
+
+
+@contextmanager
+def browsing_session(session_id: Hashable):
+    """
+    Runs the block in a browsing session, so that the browsing agents of different conversations, like concurrent
+    users of the same agency, browse in separate browsers. Async mode workers inherit the session of their caller.
+    """
+    token = _browsing_session.set(session_id)
+    try:
+        yield
+    finally:
+        _browsing_session.reset(token)
+
+
+def _get_session_key(caller_agent=None):
+    return _browsing_session.get(), getattr(caller_agent, "name", None)
+
+
+def get_web_driver(caller_agent=None):
+    """
+    Leases the browser of the current browsing session and agent. Release it with `set_web_driver` once done.
+
+    Parameters:
+        caller_agent (Agent, optional): The agent calling the tool. Each agent gets its own browser.
+
+    Returns:
+        The web driver.
+    """
+    return _web_driver_pool.acquire(_get_session_key(caller_agent))
+
+
+def set_web_driver(new_wd, caller_agent=None):
+    """Releases the browser leased with `get_web_driver`, removing the highlights of the page."""
+    try:
+        new_wd = remove_highlight_and_labels(new_wd)
+    finally:
+        _web_driver_pool.release(_get_session_key(caller_agent), new_wd)
 
 
-def set_web_driver(new_wd):
-    global wd
-    wd = remove_highlight_and_labels(wd)
-    wd = new_wd
+def close_web_driver(caller_agent=None):
+    """Closes the browser of the current browsing session and agent."""
+    _web_driver_pool.discard(_get_session_key(caller_agent))
 
 
 def set_selenium_config(config):
@@ -0,0 +1,122 @@
+import json
+import time
+
+from agency_swarm.util.metrics import get_metrics_registry
+
+# installs a mutation observer on the page, once per document, and returns the ready state and the milliseconds since
+# the last change of the DOM
+PAGE_STATE_SCRIPT = """
+if (!window.__agencySwarmObserver) {
+    window.__agencySwarmLastMutation = performance.now();
+    window.__agencySwarmObserver = new MutationObserver(function () {
+        window.__agencySwarmLastMutation = performance.now();
+    });
+    window.__agencySwarmObserver.observe(document, {
+        childList: true, subtree: true, attributes: true, characterData: true
+    });
+}
+return [document.readyState, performance.now() - window.__agencySwarmLastMutation];
+"""
+
+NETWORK_REQUEST_STARTED = "Network.requestWillBeSent"
+NETWORK_REQUEST_ENDED = ("Network.loadingFinished", "Network.loadingFailed")
+
+
+def wait_until_settled(wd, timeout: float = None, idle_time: float = None, max_inflight_requests: int = None,
+                       poll_interval: float = 0.1) -> dict:
+    """
+    Waits until the current page has settled after a navigation or an interaction: the document is loaded, no more
+    than `max_inflight_requests` network requests are pending and the DOM has not changed for `idle_time` seconds.
+
+    Network requests are tracked with the Chrome DevTools `Network` events of the performance log of the driver, at
+    the time of each event. If the driver has no performance log, only the document and the DOM are waited for.
+
+    Parameters:
+        wd: The web driver.
+        timeout (float, optional): Maximum time to wait in seconds. Defaults to `page_settle_timeout` of the selenium
+            config, or 10.
+        idle_time (float, optional): Time in seconds the network and the DOM must be quiet. Defaults to
+            `page_settle_idle_time` of the selenium config, or 0.5.
+        max_inflight_requests (int, optional): Number of pending requests that still count as an idle network, for
+            long-polling and streaming connections. Defaults to `page_settle_max_inflight_requests` of the selenium
+            config, or 2.
+        poll_interval (float, optional): Time in seconds between checks. Defaults to 0.1.
+
+    Returns:
+        dict: Seconds the wait took (`seconds`), seconds until the document was loaded (`ready_state`), the network was
+            idle (`network_idle`, None if not tracked) and the DOM was quiet (`dom_quiet`), each None if not reached,
+            and whether the wait `timed_out`.
+    """
+    from .selenium import selenium_config
+
+    if timeout is None:
+        timeout = selenium_config.get("page_settle_timeout", 10)
+    if idle_time is None:
+        idle_time = selenium_config.get("page_settle_idle_time", 0.5)
+    if max_inflight_requests is None:
+        max_inflight_requests = selenium_config.get("page_settle_max_inflight_requests", 2)
+
+    start = time.perf_counter()
+    deadline = start + timeout
+    result = {"seconds": None, "ready_state": None, "network_idle": None, "dom_quiet": None, "timed_out": False}
+    inflight = set()
+    last_network_activity = start
+    track_network = True
+
+    while True:
+        now = time.perf_counter()
+
+        if track_network:
+            try:
+                entries = wd.get_log("performance")
+            except Exception:
+                # the driver was started without a performance log
+                track_network = False
+                entries = []
+            wall_time = time.time()
+            for entry in entries:
+                message = json.loads(entry["message"])["message"]
+                if message["method"] == NETWORK_REQUEST_STARTED:
+                    inflight.add(message["params"]["requestId"])
+                elif message["method"] in NETWORK_REQUEST_ENDED:
+                    inflight.discard(message["params"]["requestId"])
+                else:
+                    continue
+                # entries are buffered between polls, their timestamp is in milliseconds since the epoch
+                activity = now - max(0.0, wall_time - entry["timestamp"] / 1000) if "timestamp" in entry else now
+                last_network_activity = max(last_network_activity, activity)
+
+        try:
+            ready_state, since_mutation = wd.execute_script(PAGE_STATE_SCRIPT)
+        except Exception:
+            # the page is navigating
+            ready_state, since_mutation = "loading", 0
+
+        # the observer of the previous page does not see the changes before the wait started
+        dom_quiet = min(since_mutation / 1000, now - start) >= idle_time
+        network_idle = not track_network or (len(inflight) <= max_inflight_requests
+                                              and now - last_network_activity >= idle_time)
+
+        elapsed = now - start
+        if ready_state == "complete" and result["ready_state"] is None:
+            result["ready_state"] = elapsed
+        if network_idle and track_network and result["network_idle"] is None:
+            result["network_idle"] = elapsed
+        if dom_quiet and result["dom_quiet"] is None:
+            result["dom_quiet"] = elapsed
+
+        if ready_state == "complete" and network_idle and dom_quiet:
+            break
+        if now >= deadline:
+            result["timed_out"] = True
+            break
+        time.sleep(poll_interval)
+
+    result["seconds"] = time.perf_counter() - start
+
+    registry = get_metrics_registry()
+    if registry.enabled:
+        registry.histogram("agency_swarm_page_settle_seconds", "Time browsing tools waited for pages to settle.",
+                           ("outcome",)).observe(result["seconds"],
+                                                 outcome="timed_out" if result["timed_out"] else "settled")
+    return result
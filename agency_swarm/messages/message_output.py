@@ -1,37 +1,79 @@
+from functools import lru_cache
 from typing import Literal
 import hashlib
 from rich.markdown import Markdown
 from rich.console import Console
 
-from agency_swarm.util.oai import get_openai_client
-
 console = Console()
 
-class MessageOutput:
-    def __init__(self, msg_type: Literal["function", "function_output", "text", "system"], sender_name: str, receiver_name: str, content):
-        self.msg_type = msg_type
-        self.sender_name = str(sender_name)
-        self.receiver_name = str(receiver_name)
-        self.content = str(content)
+COLORS = [
+    'green', 'yellow', 'blue', 'magenta', 'cyan', 'bright_white',
+]
+
+EMOJIS = [
+    '🐶', '🐱', '🐭', '🐹', '🐰', '🦊',
+    '🐻', '🐼', '🐨', '🐯', '🦁', '🐮',
+    '🐷', '🐸', '🐵', '🐔', '🐧', '🐦',
+    '🐤']
 
-        self.client = get_openai_client()
+
+class MessageOutput:
+    """
+    Immutable record of a message, function call or function output yielded by threads.
+
+    Creating a message only stores its fields. The content is converted to a string, and the header, emoji and
+    color are computed when they are first used, and cached.
+    """
+    # cached values are only assigned when computed, reading an unassigned slot raises AttributeError
+    __slots__ = ("_msg_type", "_sender_name", "_receiver_name", "_content", "_header", "_emoji", "_color")
+
+    def __init__(self, msg_type: Literal["function", "function_output", "text", "system"], sender_name: str,
+                 receiver_name: str, content):
+        self._msg_type = msg_type
+        self._sender_name = str(sender_name)
+        self._receiver_name = str(receiver_name)
+        self._content = content
+
+    def __reduce__(self):
+        # pickled with the content as a string, e.g. to return messages from the process tool executor
+        return type(self), (self._msg_type, self._sender_name, self._receiver_name, self.content)
+
+    def __repr__(self):
+        return f"MessageOutput(msg_type={self._msg_type!r}, sender_name={self._sender_name!r}, " \
+               f"receiver_name={self._receiver_name!r})"
+
+    @property
+    def msg_type(self) -> str:
+        return self._msg_type
+
+    @property
+    def sender_name(self) -> str:
+        return self._sender_name
+
+    @property
+    def receiver_name(self) -> str:
+        return self._receiver_name
+
+    @property
+    def content(self) -> str:
+        content = self._content
+        if type(content) is not str:
+            content = self._content = str(content)
+        return content
 
     def hash_names_to_color(self):
-        if self.msg_type == "function" or self.msg_type == "function_output":
-            return "dim"
-
-        if self.msg_type == "system":
-            return "red"
-
-        combined_str = self.sender_name + self.receiver_name
-        encoded_str = combined_str.encode()
-        hash_obj = hashlib.md5(encoded_str)
-        hash_int = int(hash_obj.hexdigest(), 16)
-        colors = [
-            'green', 'yellow', 'blue', 'magenta', 'cyan', 'bright_white',
-        ]
-        color_index = hash_int % len(colors)
-        return colors[color_index]
+        try:
+            return self._color
+        except AttributeError:
+            pass
+        if self._msg_type == "function" or self._msg_type == "function_output":
+            color = "dim"
+        elif self._msg_type == "system":
+            color = "red"
+        else:
+            color = _get_color(self._sender_name + self._receiver_name)
+        self._color = color
+        return color
 
     def cprint(self):
         console.rule()
@@ -49,16 +91,17 @@ class MessageOutput:
         console.print(md)
 
     def get_formatted_header(self):
-        if self.msg_type == "function":
-            text = f"{self.sender_name} 🛠️ Executing Function"
-            return text
-
-        if self.msg_type == "function_output":
-            text = f"{self.sender_name} ⚙️ Function Output"
-            return text
-
-        text = f"{self.sender_name} 🗣️ @{self.receiver_name}"
-
+        try:
+            return self._header
+        except AttributeError:
+            pass
+        if self._msg_type == "function":
+            text = f"{self._sender_name} 🛠️ Executing Function"
+        elif self._msg_type == "function_output":
+            text = f"{self._sender_name} ⚙️ Function Output"
+        else:
+            text = f"{self._sender_name} 🗣️ @{self._receiver_name}"
+        self._header = text
         return text
 
     def get_formatted_content(self):
@@ -67,30 +110,36 @@ class MessageOutput:
         return header + content
 
     def get_sender_emoji(self):
-        if self.msg_type == "system":
-            return "🤖"
+        try:
+            return self._emoji
+        except AttributeError:
+            pass
+        if self._msg_type == "system":
+            emoji = "🤖"
+        else:
+            sender_name = self._receiver_name if self._msg_type == "function_output" else self._sender_name
+            emoji = _get_emoji(sender_name.lower())
+        self._emoji = emoji
+        return emoji
+
 
-        sender_name = self.sender_name.lower()
-        if self.msg_type == "function_output":
-            sender_name = self.receiver_name.lower()
+def _hash_to_index(text, length):
+    hash_int = int(hashlib.md5(text.encode()).hexdigest(), 16)
+    return hash_int % length
 
-        if sender_name == "user":
-            return "👤"
 
-        if sender_name == "ceo":
-            return "🤵"
+@lru_cache(maxsize=1024)
+def _get_color(names):
+    return COLORS[_hash_to_index(names, len(COLORS))]
 
-        # output emoji based on hash of sender name
-        encoded_str = sender_name.encode()
-        hash_obj = hashlib.md5(encoded_str)
-        hash_int = int(hash_obj.hexdigest(), 16)
-        emojis = [
-            '🐶', '🐱', '🐭', '🐹', '🐰', '🦊',
-            '🐻', '🐼', '🐨', '🐯', '🦁', '🐮',
-            '🐷', '🐸', '🐵', '🐔', '🐧', '🐦',
-            '🐤']
 
-        emoji_index = hash_int % len(emojis)
+@lru_cache(maxsize=1024)
+def _get_emoji(sender_name):
+    if sender_name == "user":
+        return "👤"
 
-        return emojis[emoji_index]
+    if sender_name == "ceo":
+        return "🤵"
 
+    # output emoji based on hash of sender name
+    return EMOJIS[_hash_to_index(sender_name, len(EMOJIS))]
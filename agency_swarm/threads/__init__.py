@@ -1 +1,2 @@
 from .thread import Thread
+from .async_thread import AsyncThread
@@ -0,0 +1,324 @@
+import asyncio
+import contextvars
+import inspect
+import time
+from typing import Literal
+
+from openai import BadRequestError
+
+from agency_swarm.agents import Agent
+from agency_swarm.messages import MessageOutput
+from agency_swarm.threads import Thread
+from agency_swarm.threads.run_engine import AsyncRunEngine
+from agency_swarm.tools.ToolExecutor import run_tool, arun_tool, ToolRun
+from agency_swarm.user import User
+from agency_swarm.util.metrics import get_metrics_registry
+from agency_swarm.util.oai import get_async_openai_client
+from agency_swarm.util.tracing import aresume_in_span
+
+
+class AsyncThread(Thread):
+    """
+    Asyncio version of Thread built on the AsyncOpenAI client.
+
+    `get_completion` is an async generator that yields MessageOutput objects. The last yielded message is always the
+    final response of the recipient agent. Tools can provide an `arun` coroutine or async generator; tools with only a
+    synchronous `run` method are executed in the default executor, so they never block the event loop.
+    """
+
+    def __init__(self, agent: Literal[Agent, User], recipient_agent: Agent):
+        super().__init__(agent, recipient_agent)
+
+        self.async_client = get_async_openai_client()
+        self.run_engine = AsyncRunEngine(self.async_client)
+        self.async_lock = None
+        # task running the current completion, a second completion from the same task fails instead of waiting for
+        # itself
+        self._completion_task = None
+
+    async def init_thread(self):
+        if self.id:
+            self._count_api_call("threads.retrieve")
+            self.thread = await self.async_client.beta.threads.retrieve(self.id)
+            if self._prepare_messages_cache() and not self.last_message_id:
+                # start the cache of a resumed thread at its last message instead of paging through its history
+                self._count_api_call("messages.list")
+                self._seed_messages_cache(await self.async_client.beta.threads.messages.list(
+                    thread_id=self.id, order="desc", limit=1))
+        else:
+            self._count_api_call("threads.create")
+            self.thread = await self.async_client.beta.threads.create()
+            self.id = self.thread.id
+
+    async def get_completion(self, message: str, message_files=None, yield_messages=True, recipient_agent=None):
+        """
+        Sends a message to the recipient agent and yields the resulting messages.
+
+        Parameters:
+            message (str): The message to send.
+            message_files (list, optional): A list of file ids to be sent as attachments with the message. Defaults to None.
+            yield_messages (bool, optional): Yield intermediate messages. If False, only the final response is yielded. Defaults to True.
+            recipient_agent (Agent, optional): Overrides the recipient agent of this thread. Defaults to None.
+        """
+        if self.async_lock is None:
+            # created lazily, so that the lock is bound to the running event loop
+            self.async_lock = asyncio.Lock()
+
+        if self._completion_task is not None and self._completion_task is asyncio.current_task():
+            raise Exception(f"A completion is already in progress on the thread {self.id}. Consume or close the "
+                            f"generator of the previous get_completion call before starting a new one.")
+
+        async with self.async_lock:
+            self._completion_task = asyncio.current_task()
+            start = time.perf_counter()
+            api_calls = self.api_calls + self.run_engine.api_calls
+            completion = self._trace_completion(
+                self._get_completion(message, message_files, yield_messages, recipient_agent), recipient_agent)
+            try:
+                async for message_output in completion:
+                    yield message_output
+            finally:
+                await completion.aclose()
+                self._completion_task = None
+                self._observe_completion(recipient_agent, start, api_calls)
+
+    async def _get_completion(self, message: str, message_files=None, yield_messages=True, recipient_agent=None):
+        if not self.thread:
+            await self.init_thread()
+
+        if not recipient_agent:
+            recipient_agent = self.recipient_agent
+
+        sender_name = "user" if isinstance(self.agent, User) else self.agent.name
+        playground_url = f'https://platform.openai.com/playground?assistant={recipient_agent.assistant.id}&mode=assistant&thread={self.thread.id}'
+        print(f'THREAD:[ {sender_name} -> {recipient_agent.name} ]: URL {playground_url}')
+
+        # send message
+        self._count_api_call("messages.create")
+        await self.async_client.beta.threads.messages.create(
+            thread_id=self.thread.id,
+            role="user",
+            content=message,
+            file_ids=message_files if message_files else [],
+        )
+
+        if yield_messages:
+            yield MessageOutput("text", self.agent.name, recipient_agent.name, message)
+
+        # create run
+        self.run = await self.run_engine.create_run(
+            thread_id=self.thread.id,
+            assistant_id=recipient_agent.id,
+        )
+
+        run_failed = False
+        while True:
+            await self.await_run_completion()
+
+            # function execution
+            if self.run.status == "requires_action":
+                tool_calls = self.run.required_action.submit_tool_outputs.tool_calls
+                tool_outputs = []
+                for batch in self._get_tool_call_batches(tool_calls, recipient_agent):
+                    if len(batch) > 1 and self.tool_executor:
+                        if yield_messages:
+                            for tool_call in batch:
+                                yield MessageOutput("function", recipient_agent.name, self.agent.name,
+                                                    tool_call.function)
+
+                        outputs = [None] * len(batch)
+                        async for index, output, messages in self._execute_tool_calls_in_parallel(batch,
+                                                                                                  recipient_agent):
+                            if messages is not None:
+                                if yield_messages:
+                                    for item in messages:
+                                        yield item
+                            elif yield_messages:
+                                yield MessageOutput("function_output", batch[index].function.name,
+                                                    recipient_agent.name, output)
+                            outputs[index] = output
+                        for tool_call, output in zip(batch, outputs):
+                            tool_outputs.append({"tool_call_id": tool_call.id, "output": str(output)})
+                        continue
+
+                    for tool_call in batch:
+                        if yield_messages:
+                            yield MessageOutput("function", recipient_agent.name, self.agent.name,
+                                                tool_call.function)
+
+                        output = await self.execute_tool(tool_call, recipient_agent)
+                        if inspect.isasyncgen(output):
+                            outputs = output
+                            output = None
+                            async for item in outputs:
+                                if isinstance(item, MessageOutput):
+                                    if yield_messages:
+                                        yield item
+                                else:
+                                    output = item
+                        else:
+                            if yield_messages:
+                                yield MessageOutput("function_output", tool_call.function.name,
+                                                    recipient_agent.name, output)
+
+                        tool_outputs.append({"tool_call_id": tool_call.id, "output": str(output)})
+
+                self._store_tool_outputs(tool_calls, tool_outputs)
+
+                # submit tool outputs
+                try:
+                    self.run = await self.run_engine.submit_tool_outputs(
+                        thread_id=self.thread.id,
+                        run_id=self.run.id,
+                        tool_outputs=tool_outputs
+                    )
+                except BadRequestError as e:
+                    if 'Runs in status "expired"' in e.message:
+                        get_metrics_registry().inc("agency_swarm_run_retries_total", reason="expired")
+                        self._count_api_call("messages.create")
+                        await self.async_client.beta.threads.messages.create(
+                            thread_id=self.thread.id,
+                            role="user",
+                            content="Please repeat the exact same function calls again in the same order."
+                        )
+
+                        self.run = await self.run_engine.create_run(
+                            thread_id=self.thread.id,
+                            assistant_id=recipient_agent.id,
+                        )
+
+                        await self.await_run_completion()
+
+                        if self.run.status != "requires_action":
+                            raise Exception("Run Failed. Error: ", self.run.last_error)
+
+                        # change tool call ids
+                        tool_calls = self.run.required_action.submit_tool_outputs.tool_calls
+                        for i, tool_call in enumerate(tool_calls):
+                            tool_outputs[i]["tool_call_id"] = tool_call.id
+
+                        self.run = await self.run_engine.submit_tool_outputs(
+                            thread_id=self.thread.id,
+                            run_id=self.run.id,
+                            tool_outputs=tool_outputs
+                        )
+                    else:
+                        raise e
+            # error
+            elif self.run.status == "failed":
+                # retry run 1 time
+                if not run_failed and "something went wrong" in self.run.last_error:
+                    get_metrics_registry().inc("agency_swarm_run_retries_total", reason="failed")
+                    self.run = await self.run_engine.create_run(
+                        thread_id=self.thread.id,
+                        assistant_id=recipient_agent.id,
+                    )
+                    run_failed = True
+                else:
+                    raise Exception("Run Failed. Error: ", self.run.last_error)
+            # return assistant message
+            else:
+                await self.sync_messages()
+                message = self.messages[-1].content[0].text.value
+
+                yield MessageOutput("text", recipient_agent.name, self.agent.name, message)
+
+                return
+
+    async def await_run_completion(self):
+        self.run = await self.run_engine.wait(self.run)
+        self._store_run()
+
+    async def get_messages(self):
+        """
+        Returns the messages of this thread in chronological order.
+
+        Only messages created after the last known message are fetched from the API, the rest come from the local cache.
+        The cache of a resumed thread starts with the messages of the conversation store, or with the last message of
+        the thread when it was resumed.
+        """
+        await self.sync_messages()
+        return list(self.messages)
+
+    async def sync_messages(self):
+        """Fetches the messages created after the last known message, appends them to the cache and returns them."""
+        if not self._prepare_messages_cache():
+            return []
+
+        new_messages = []
+        while True:
+            self._count_api_call("messages.list")
+            page = await self.async_client.beta.threads.messages.list(
+                thread_id=self.id,
+                order="asc",
+                limit=self.messages_page_size,
+                **({"after": self.last_message_id} if self.last_message_id else {}),
+            )
+            if not self._append_messages(page, new_messages):
+                break
+
+        return new_messages
+
+    async def execute_tool(self, tool_call, recipient_agent=None):
+        """
+        Executes a tool call. Returns the tool output, or an async generator for tools whose `arun` is an async
+        generator. Such generators yield MessageOutput objects followed by the tool output.
+        """
+        tool = self._init_tool(tool_call, recipient_agent)
+        if isinstance(tool, str):
+            return tool
+
+        try:
+            # get outputs from the tool
+            if hasattr(tool, "arun"):
+                # the span of an async generator tool is only current while the generator runs
+                tool_run = ToolRun(tool, activate=not inspect.isasyncgenfunction(type(tool).arun))
+                try:
+                    output = tool.arun()
+                    if inspect.isawaitable(output):
+                        output = await output
+                except Exception:
+                    tool_run.end(failed=True)
+                    raise
+                if inspect.isasyncgen(output):
+                    return self._record_tool_async_generator(tool_run, output)
+                tool_run.end()
+                return output
+
+            # executor threads don't inherit the context, which holds the current span
+            output, _ = await asyncio.get_running_loop().run_in_executor(None, contextvars.copy_context().run,
+                                                                         run_tool, tool)
+            return output
+        except Exception as e:
+            return self._format_tool_error(e)
+
+    @staticmethod
+    async def _record_tool_async_generator(tool_run, output):
+        """Yields from the async generator of a tool and ends the record of the tool once it is exhausted."""
+        failed = True
+        items = aresume_in_span(output, tool_run.span, profile=True) if tool_run.span else output
+        try:
+            async for item in items:
+                yield item
+            failed = False
+        finally:
+            await items.aclose()
+            tool_run.end(failed)
+
+    async def _execute_tool_calls_in_parallel(self, tool_calls, recipient_agent):
+        """
+        Executes a batch of tool calls concurrently. Yields (index, output, messages) tuples of each call as soon as
+        it finishes, where index is the position of the call in the batch.
+        """
+        tools = [self._init_tool(tool_call, recipient_agent) for tool_call in tool_calls]
+
+        async def execute(index, tool):
+            if isinstance(tool, str):
+                return index, tool, None
+            try:
+                return (index, *await arun_tool(tool))
+            except Exception as e:
+                return index, self._format_tool_error(e), None
+
+        for result in asyncio.as_completed([execute(index, tool) for index, tool in enumerate(tools)]):
+            yield await result
@@ -0,0 +1,329 @@
+import asyncio
+import json
+import time
+
+import httpx
+from openai import APIError, BadRequestError
+from openai.types.beta.threads import Run
+
+from agency_swarm.util.metrics import get_metrics_registry
+
+PENDING_RUN_STATUSES = ("queued", "in_progress", "cancelling")
+
+LATENCY_METRICS = {
+    "runs.create": "agency_swarm_run_create_seconds",
+    "runs.submit_tool_outputs": "agency_swarm_submit_tool_outputs_seconds",
+}
+
+
+class RunStatusTimer:
+    """Records the time a run spends in each pending status to the metrics registry."""
+
+    def __init__(self):
+        self.status = None
+        self.since = None
+
+    def update(self, run: Run):
+        if run.status == self.status:
+            return
+        now = time.perf_counter()
+        if self.status in PENDING_RUN_STATUSES:
+            get_metrics_registry().observe("agency_swarm_run_status_seconds", now - self.since, status=self.status)
+        self.status = run.status
+        self.since = now
+
+
+class RunEngine:
+    """
+    Drives assistant runs to their next actionable state.
+
+    Runs are created and resumed with ``stream=True``, so the engine reacts to ``requires_action`` and terminal
+    statuses as soon as the server emits them. If streaming is unavailable or the stream breaks, the engine falls back
+    to polling ``runs.retrieve`` with an adaptive backoff.
+    """
+
+    def __init__(self, client, stream: bool = True, poll_interval: float = 0.05, max_poll_interval: float = 1.0,
+                 backoff_factor: float = 1.5, stream_timeout: float = 600):
+        """
+        Parameters:
+            client: The OpenAI client used for all run requests.
+            stream (bool, optional): Consume the run's server-sent event stream. Defaults to True.
+            poll_interval (float, optional): Initial polling interval in seconds for the fallback. Defaults to 0.05.
+            max_poll_interval (float, optional): Upper bound of the polling interval in seconds. Defaults to 1.0.
+            backoff_factor (float, optional): Factor applied to the polling interval while the run status is unchanged. Defaults to 1.5.
+            stream_timeout (float, optional): Read timeout in seconds between two stream events. Defaults to 600.
+        """
+        self.client = client
+        self.stream = stream
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max_poll_interval
+        self.backoff_factor = backoff_factor
+        self.stream_timeout = stream_timeout
+        # number of API requests made by this engine
+        self.api_calls = 0
+
+    def create_run(self, thread_id: str, assistant_id: str, **kwargs) -> Run:
+        """Creates a run and returns it once it leaves the queued/in_progress statuses."""
+        runs = self.client.beta.threads.runs
+        timer = RunStatusTimer()
+        if self.stream:
+            run = self._stream_run(runs.with_streaming_response.create, "runs.create", timer, thread_id=thread_id,
+                                   assistant_id=assistant_id, **kwargs)
+            if run is not None:
+                return run
+
+        start = self._count_api_call("runs.create")
+        run = runs.create(thread_id=thread_id, assistant_id=assistant_id, **kwargs)
+        self._observe_latency("runs.create", start)
+        return self.wait(run, timer)
+
+    def submit_tool_outputs(self, thread_id: str, run_id: str, tool_outputs: list) -> Run:
+        """Submits tool outputs and returns the run once it leaves the queued/in_progress statuses."""
+        runs = self.client.beta.threads.runs
+        timer = RunStatusTimer()
+        if self.stream:
+            run = self._stream_run(runs.with_streaming_response.submit_tool_outputs, "runs.submit_tool_outputs",
+                                   timer, thread_id=thread_id, run_id=run_id, tool_outputs=tool_outputs)
+            if run is not None:
+                return run
+
+        start = self._count_api_call("runs.submit_tool_outputs")
+        run = runs.submit_tool_outputs(thread_id=thread_id, run_id=run_id, tool_outputs=tool_outputs)
+        self._observe_latency("runs.submit_tool_outputs", start)
+        return self.wait(run, timer)
+
+    def wait(self, run: Run, timer: RunStatusTimer = None) -> Run:
+        """Polls a run with adaptive backoff until it leaves the queued/in_progress/cancelling statuses."""
+        timer = timer or RunStatusTimer()
+        timer.update(run)
+        interval = self.poll_interval
+        status = run.status
+        while run.status in PENDING_RUN_STATUSES:
+            time.sleep(interval)
+            self._count_api_call("runs.retrieve")
+            run = self.client.beta.threads.runs.retrieve(thread_id=run.thread_id, run_id=run.id)
+            timer.update(run)
+            if run.status != status:
+                # status changes usually come in bursts, so check again soon
+                status = run.status
+                interval = self.poll_interval
+            else:
+                interval = min(interval * self.backoff_factor, self.max_poll_interval)
+        return run
+
+    def _count_api_call(self, endpoint: str) -> float:
+        """Counts an API request of this engine. Returns the start time of the request."""
+        self.api_calls += 1
+        get_metrics_registry().inc("agency_swarm_api_calls_total", endpoint=endpoint)
+        return time.perf_counter()
+
+    @staticmethod
+    def _observe_latency(endpoint: str, start: float):
+        """Records the time until the API returned the created run or accepted the submitted tool outputs."""
+        get_metrics_registry().observe(LATENCY_METRICS[endpoint], time.perf_counter() - start)
+
+    def _stream_run(self, method, endpoint, timer, **kwargs):
+        """
+        Calls a run endpoint in streaming mode and consumes events until the run settles.
+
+        Returns None if the endpoint rejected streaming, so the caller can retry without streaming. If the stream
+        breaks after the run was sent, or ends without sending it, the run is awaited by polling instead.
+        """
+        run = None
+        start = self._count_api_call(endpoint)
+        try:
+            with method(**kwargs, extra_body={"stream": True}, timeout=self.stream_timeout) as response:
+                for event, data in iter_sse_events(response.iter_lines()):
+                    if event == "done":
+                        break
+                    if event == "error":
+                        raise APIError("An error occurred during run streaming", response.http_request,
+                                       body=json.loads(data) if data else None)
+                    if not event.startswith("thread.run.") or event.startswith("thread.run.step."):
+                        continue
+                    if run is None:
+                        self._observe_latency(endpoint, start)
+                    run = Run.construct(**json.loads(data))
+                    timer.update(run)
+                    if run.status not in PENDING_RUN_STATUSES:
+                        return run
+        except BadRequestError as e:
+            if "stream" not in str(e.message).lower():
+                raise e
+            # the endpoint does not support streaming, e.g. on Azure OpenAI
+            self.stream = False
+            return None
+        except (APIError, httpx.HTTPError) as e:
+            if run is None:
+                raise e
+
+        if run is None:
+            # the server accepted the request, so the run exists and must not be created again
+            run = self._retrieve_unstreamed_run(endpoint, **kwargs)
+        return self.wait(run, timer)
+
+    def _retrieve_unstreamed_run(self, endpoint, thread_id, run_id=None, assistant_id=None, **kwargs) -> Run:
+        """Retrieves the run of a streamed request whose stream ended before it sent the run."""
+        runs = self.client.beta.threads.runs
+        if run_id is not None:
+            self._count_api_call("runs.retrieve")
+            return runs.retrieve(thread_id=thread_id, run_id=run_id)
+        self._count_api_call("runs.list")
+        return _created_run(runs.list(thread_id=thread_id, order="desc", limit=1).data, endpoint, thread_id,
+                            assistant_id)
+
+
+def _created_run(latest_runs, endpoint, thread_id, assistant_id) -> Run:
+    """Returns the run created by a streamed runs.create request from the latest run of the thread."""
+    if not latest_runs or latest_runs[0].assistant_id != assistant_id:
+        raise Exception(f"The stream of {endpoint} ended before the run was created on the thread {thread_id}.")
+    return latest_runs[0]
+
+
+class SSEDecoder:
+    """Incremental decoder that turns server-sent event lines into (event, data) tuples."""
+
+    def __init__(self):
+        self.event = None
+        self.data = []
+
+    def feed(self, line: str):
+        """Feeds one line and returns the dispatched (event, data) tuple, or None if the event is not complete."""
+        if not line:
+            return self.flush()
+        if line.startswith(":"):
+            return None
+        field, _, value = line.partition(":")
+        value = value[1:] if value.startswith(" ") else value
+        if field == "event":
+            self.event = value
+        elif field == "data":
+            self.data.append(value)
+        return None
+
+    def flush(self):
+        if not self.event and not self.data:
+            return None
+        item = (self.event or "message", "\n".join(self.data))
+        self.event = None
+        self.data = []
+        return item
+
+
+def iter_sse_events(lines):
+    """Parses server-sent event lines into (event, data) tuples."""
+    decoder = SSEDecoder()
+    for line in lines:
+        item = decoder.feed(line)
+        if item:
+            yield item
+    item = decoder.flush()
+    if item:
+        yield item
+
+
+async def aiter_sse_events(lines):
+    """Parses an async iterator of server-sent event lines into (event, data) tuples."""
+    decoder = SSEDecoder()
+    async for line in lines:
+        item = decoder.feed(line)
+        if item:
+            yield item
+    item = decoder.flush()
+    if item:
+        yield item
+
+
+class AsyncRunEngine(RunEngine):
+    """Asyncio counterpart of RunEngine, built on the AsyncOpenAI client."""
+
+    async def create_run(self, thread_id: str, assistant_id: str, **kwargs) -> Run:
+        """Creates a run and returns it once it leaves the queued/in_progress statuses."""
+        runs = self.client.beta.threads.runs
+        timer = RunStatusTimer()
+        if self.stream:
+            run = await self._stream_run(runs.with_streaming_response.create, "runs.create", timer,
+                                         thread_id=thread_id, assistant_id=assistant_id, **kwargs)
+            if run is not None:
+                return run
+
+        start = self._count_api_call("runs.create")
+        run = await runs.create(thread_id=thread_id, assistant_id=assistant_id, **kwargs)
+        self._observe_latency("runs.create", start)
+        return await self.wait(run, timer)
+
+    async def submit_tool_outputs(self, thread_id: str, run_id: str, tool_outputs: list) -> Run:
+        """Submits tool outputs and returns the run once it leaves the queued/in_progress statuses."""
+        runs = self.client.beta.threads.runs
+        timer = RunStatusTimer()
+        if self.stream:
+            run = await self._stream_run(runs.with_streaming_response.submit_tool_outputs,
+                                         "runs.submit_tool_outputs", timer, thread_id=thread_id, run_id=run_id,
+                                         tool_outputs=tool_outputs)
+            if run is not None:
+                return run
+
+        start = self._count_api_call("runs.submit_tool_outputs")
+        run = await runs.submit_tool_outputs(thread_id=thread_id, run_id=run_id, tool_outputs=tool_outputs)
+        self._observe_latency("runs.submit_tool_outputs", start)
+        return await self.wait(run, timer)
+
+    async def wait(self, run: Run, timer: RunStatusTimer = None) -> Run:
+        """Polls a run with adaptive backoff until it leaves the queued/in_progress/cancelling statuses."""
+        timer = timer or RunStatusTimer()
+        timer.update(run)
+        interval = self.poll_interval
+        status = run.status
+        while run.status in PENDING_RUN_STATUSES:
+            await asyncio.sleep(interval)
+            self._count_api_call("runs.retrieve")
+            run = await self.client.beta.threads.runs.retrieve(thread_id=run.thread_id, run_id=run.id)
+            timer.update(run)
+            if run.status != status:
+                status = run.status
+                interval = self.poll_interval
+            else:
+                interval = min(interval * self.backoff_factor, self.max_poll_interval)
+        return run
+
+    async def _stream_run(self, method, endpoint, timer, **kwargs):
+        run = None
+        start = self._count_api_call(endpoint)
+        try:
+            async with method(**kwargs, extra_body={"stream": True}, timeout=self.stream_timeout) as response:
+                async for event, data in aiter_sse_events(response.iter_lines()):
+                    if event == "done":
+                        break
+                    if event == "error":
+                        raise APIError("An error occurred during run streaming", response.http_request,
+                                       body=json.loads(data) if data else None)
+                    if not event.startswith("thread.run.") or event.startswith("thread.run.step."):
+                        continue
+                    if run is None:
+                        self._observe_latency(endpoint, start)
+                    run = Run.construct(**json.loads(data))
+                    timer.update(run)
+                    if run.status not in PENDING_RUN_STATUSES:
+                        return run
+        except BadRequestError as e:
+            if "stream" not in str(e.message).lower():
+                raise e
+            self.stream = False
+            return None
+        except (APIError, httpx.HTTPError) as e:
+            if run is None:
+                raise e
+
+        if run is None:
+            # the server accepted the request, so the run exists and must not be created again
+            run = await self._retrieve_unstreamed_run(endpoint, **kwargs)
+        return await self.wait(run, timer)
+
+    async def _retrieve_unstreamed_run(self, endpoint, thread_id, run_id=None, assistant_id=None, **kwargs) -> Run:
+        runs = self.client.beta.threads.runs
+        if run_id is not None:
+            self._count_api_call("runs.retrieve")
+            return await runs.retrieve(thread_id=thread_id, run_id=run_id)
+        self._count_api_call("runs.list")
+        return _created_run((await runs.list(thread_id=thread_id, order="desc", limit=1)).data, endpoint, thread_id,
+                            assistant_id)
@@ -1,4 +1,5 @@
 import inspect
+import threading
 import time
 from typing import Literal
 
@@ -6,8 +7,12 @@ from openai import BadRequestError
 
 from agency_swarm.agents import Agent
 from agency_swarm.messages import MessageOutput
+from agency_swarm.threads.run_engine import RunEngine
+from agency_swarm.tools.ToolExecutor import ToolRun
 from agency_swarm.user import User
+from agency_swarm.util.metrics import get_metrics_registry
 from agency_swarm.util.oai import get_openai_client
+from agency_swarm.util.tracing import get_tracer, resume_in_span
 
 
 class Thread:
@@ -20,15 +25,60 @@ class Thread:
         self.recipient_agent = recipient_agent
 
         self.client = get_openai_client()
+        self.run_engine = RunEngine(self.client)
+        # executes independent tool calls of a run in parallel if set, see Agency.tool_executor
+        self.tool_executor = None
+        # serializes completions on this thread, e.g. parallel SendMessage calls to the same agent. It is held while
+        # the completion generator is suspended, reentrant so that a second completion from the same thread fails
+        # instead of waiting for itself.
+        self.lock = threading.RLock()
+        self._completion_in_progress = False
+        # number of API requests made by this thread, without the requests of the run engine
+        self.api_calls = 0
+
+        # local append-only cache of the thread messages in chronological order
+        self.messages = []
+        self.last_message_id = None
+        self.messages_page_size = 100
+        # optional ConversationStore that persists messages, runs and tool outputs
+        self.conversation_store = None
+        self._messages_thread_id = None
+        self._messages_lock = threading.Lock()
 
     def init_thread(self):
         if self.id:
+            self._count_api_call("threads.retrieve")
             self.thread = self.client.beta.threads.retrieve(self.id)
+            with self._messages_lock:
+                if self._prepare_messages_cache() and not self.last_message_id:
+                    # start the cache of a resumed thread at its last message instead of paging through its history
+                    self._count_api_call("messages.list")
+                    self._seed_messages_cache(self.client.beta.threads.messages.list(thread_id=self.id, order="desc",
+                                                                                     limit=1))
         else:
+            self._count_api_call("threads.create")
             self.thread = self.client.beta.threads.create()
             self.id = self.thread.id
 
     def get_completion(self, message: str, message_files=None, yield_messages=True, recipient_agent=None):
+        with self.lock:
+            self._start_completion()
+            start = time.perf_counter()
+            api_calls = self.api_calls + self.run_engine.api_calls
+            try:
+                return (yield from self._trace_completion(
+                    self._get_completion(message, message_files, yield_messages, recipient_agent), recipient_agent))
+            finally:
+                self._completion_in_progress = False
+                self._observe_completion(recipient_agent, start, api_calls)
+
+    def _start_completion(self):
+        if self._completion_in_progress:
+            raise Exception(f"A completion is already in progress on the thread {self.id}. Consume or close the "
+                            f"generator of the previous get_completion call before starting a new one.")
+        self._completion_in_progress = True
+
+    def _get_completion(self, message: str, message_files=None, yield_messages=True, recipient_agent=None):
         if not self.thread:
             self.init_thread()
 
@@ -41,6 +91,7 @@ class Thread:
         print(f'THREAD:[ {sender_name} -> {recipient_agent.name} ]: URL {playground_url}')
 
         # send message
+        self._count_api_call("messages.create")
         self.client.beta.threads.messages.create(
             thread_id=self.thread.id,
             role="user",
@@ -52,7 +103,7 @@ class Thread:
             yield MessageOutput("text", self.agent.name, recipient_agent.name, message)
 
         # create run
-        self.run = self.client.beta.threads.runs.create(
+        self.run = self.run_engine.create_run(
             thread_id=self.thread.id,
             assistant_id=recipient_agent.id,
         )
@@ -65,43 +116,55 @@ class Thread:
             if self.run.status == "requires_action":
                 tool_calls = self.run.required_action.submit_tool_outputs.tool_calls
                 tool_outputs = []
-                for tool_call in tool_calls:
-                    if yield_messages:
-                        yield MessageOutput("function", recipient_agent.name, self.agent.name,
-                                            str(tool_call.function))
-
-                    output = self.execute_tool(tool_call, recipient_agent)
-                    if inspect.isgenerator(output):
-                        try:
-                            while True:
-                                item = next(output)
-                                if isinstance(item, MessageOutput) and yield_messages:
-                                    yield item
-                        except StopIteration as e:
-                            output = e.value
-                    else:
+                for batch in self._get_tool_call_batches(tool_calls, recipient_agent):
+                    if len(batch) > 1 and self.tool_executor:
+                        outputs = yield from self._execute_tool_calls_in_parallel(batch, recipient_agent,
+                                                                                  yield_messages)
+                        for tool_call, output in zip(batch, outputs):
+                            tool_outputs.append({"tool_call_id": tool_call.id, "output": str(output)})
+                        continue
+
+                    for tool_call in batch:
                         if yield_messages:
-                            yield MessageOutput("function_output", tool_call.function.name, recipient_agent.name,
-                                                output)
+                            yield MessageOutput("function", recipient_agent.name, self.agent.name,
+                                                tool_call.function)
+
+                        output = self.execute_tool(tool_call, recipient_agent)
+                        if inspect.isgenerator(output):
+                            try:
+                                while True:
+                                    item = next(output)
+                                    if isinstance(item, MessageOutput) and yield_messages:
+                                        yield item
+                            except StopIteration as e:
+                                output = e.value
+                        else:
+                            if yield_messages:
+                                yield MessageOutput("function_output", tool_call.function.name,
+                                                    recipient_agent.name, output)
 
-                    tool_outputs.append({"tool_call_id": tool_call.id, "output": str(output)})
+                        tool_outputs.append({"tool_call_id": tool_call.id, "output": str(output)})
+
+                self._store_tool_outputs(tool_calls, tool_outputs)
 
                 # submit tool outputs
                 try:
-                    self.run = self.client.beta.threads.runs.submit_tool_outputs(
+                    self.run = self.run_engine.submit_tool_outputs(
                         thread_id=self.thread.id,
                         run_id=self.run.id,
                         tool_outputs=tool_outputs
                     )
                 except BadRequestError as e:
                     if 'Runs in status "expired"' in e.message:
+                        get_metrics_registry().inc("agency_swarm_run_retries_total", reason="expired")
+                        self._count_api_call("messages.create")
                         self.client.beta.threads.messages.create(
                             thread_id=self.thread.id,
                             role="user",
                             content="Please repeat the exact same function calls again in the same order."
                         )
 
-                        self.run = self.client.beta.threads.runs.create(
+                        self.run = self.run_engine.create_run(
                             thread_id=self.thread.id,
                             assistant_id=recipient_agent.id,
                         )
@@ -116,7 +179,7 @@ class Thread:
                         for i, tool_call in enumerate(tool_calls):
                             tool_outputs[i]["tool_call_id"] = tool_call.id
 
-                        self.run = self.client.beta.threads.runs.submit_tool_outputs(
+                        self.run = self.run_engine.submit_tool_outputs(
                             thread_id=self.thread.id,
                             run_id=self.run.id,
                             tool_outputs=tool_outputs
@@ -127,7 +190,8 @@ class Thread:
             elif self.run.status == "failed":
                 # retry run 1 time
                 if not run_failed and "something went wrong" in self.run.last_error:
-                    self.run = self.client.beta.threads.runs.create(
+                    get_metrics_registry().inc("agency_swarm_run_retries_total", reason="failed")
+                    self.run = self.run_engine.create_run(
                         thread_id=self.thread.id,
                         assistant_id=recipient_agent.id,
                     )
@@ -136,10 +200,8 @@ class Thread:
                     raise Exception("Run Failed. Error: ", self.run.last_error)
             # return assistant message
             else:
-                messages = self.client.beta.threads.messages.list(
-                    thread_id=self.id
-                )
-                message = messages.data[0].content[0].text.value
+                self.sync_messages()
+                message = self.messages[-1].content[0].text.value
 
                 if yield_messages:
                     yield MessageOutput("text", recipient_agent.name, self.agent.name, message)
@@ -147,33 +209,212 @@ class Thread:
                 return message
 
     def await_run_completion(self):
-        while self.run.status in ['queued', 'in_progress', "cancelling"]:
-            time.sleep(0.5)
-            self.run = self.client.beta.threads.runs.retrieve(
-                thread_id=self.thread.id,
-                run_id=self.run.id
-            )
+        self.run = self.run_engine.wait(self.run)
+        self._store_run()
+
+    def get_messages(self):
+        """
+        Returns the messages of this thread in chronological order.
+
+        Only messages created after the last known message are fetched from the API, the rest come from the local cache.
+        The cache of a resumed thread starts with the messages of the conversation store, or with the last message of
+        the thread when it was resumed.
+        """
+        self.sync_messages()
+        return list(self.messages)
+
+    def sync_messages(self):
+        """Fetches the messages created after the last known message, appends them to the cache and returns them."""
+        with self._messages_lock:
+            if not self._prepare_messages_cache():
+                return []
+
+            new_messages = []
+            while True:
+                self._count_api_call("messages.list")
+                page = self.client.beta.threads.messages.list(
+                    thread_id=self.id,
+                    order="asc",
+                    limit=self.messages_page_size,
+                    **({"after": self.last_message_id} if self.last_message_id else {}),
+                )
+                if not self._append_messages(page, new_messages):
+                    break
+
+            return new_messages
+
+    def _prepare_messages_cache(self):
+        """Resets the message cache if the thread id changed. Returns False if the thread is not initialized."""
+        if not self.id:
+            return False
+        if self._messages_thread_id != self.id:
+            # resumed conversations are served from the conversation store, only newer messages are fetched
+            self.messages = self.conversation_store.get_messages(self.id) if self.conversation_store else []
+            self.last_message_id = self.messages[-1].id if self.messages else None
+            self._messages_thread_id = self.id
+        return True
+
+    def _seed_messages_cache(self, page):
+        """Starts the cache with the last message of the thread, from a page listed in descending order."""
+        self.messages = list(page.data[:1])
+        self.last_message_id = page.data[0].id if page.data else None
+
+    def _append_messages(self, page, new_messages):
+        """Appends a page of messages to the cache. Returns True if more pages are available."""
+        if not page.data:
+            return False
+        # concurrent syncs can fetch the same page, the cache must stay append-only without duplicates
+        known_ids = {message.id for message in self.messages[-len(page.data):]}
+        page_messages = [message for message in page.data if message.id not in known_ids]
+        self.messages.extend(page_messages)
+        new_messages.extend(page_messages)
+        if self.conversation_store and page_messages:
+            self.conversation_store.add_messages(self.id, page_messages)
+        self.last_message_id = page.data[-1].id
+        return getattr(page, "has_more", len(page.data) == self.messages_page_size)
+
+    def _count_api_call(self, endpoint):
+        self.api_calls += 1
+        get_metrics_registry().inc("agency_swarm_api_calls_total", endpoint=endpoint)
+
+    def _observe_completion(self, recipient_agent, start, api_calls):
+        """Records the duration and the number of API calls of a completion that started at `start`."""
+        registry = get_metrics_registry()
+        agent = (recipient_agent or self.recipient_agent).name
+        registry.observe("agency_swarm_completion_seconds", time.perf_counter() - start, agent=agent)
+        registry.observe("agency_swarm_completion_api_calls",
+                         self.api_calls + self.run_engine.api_calls - api_calls, agent=agent)
+
+    def _trace_completion(self, gen, recipient_agent):
+        """Returns the (async) generator of a completion of this thread, traced in a span while it runs."""
+        sender = "user" if isinstance(self.agent, User) else self.agent.name
+        recipient = (recipient_agent or self.recipient_agent).name
+        if inspect.isasyncgen(gen):
+            return get_tracer().trace_async_generator(gen, f"{sender} -> {recipient}", "thread", thread_id=self.id)
+        return get_tracer().trace_generator(gen, f"{sender} -> {recipient}", "thread", thread_id=self.id)
+
+    def _store_run(self):
+        if self.conversation_store and self.run:
+            self.conversation_store.save_run(self.run)
+
+    def _store_tool_outputs(self, tool_calls, tool_outputs):
+        if self.conversation_store:
+            self.conversation_store.save_tool_outputs(self.run.id, tool_calls, tool_outputs)
 
     def execute_tool(self, tool_call, recipient_agent=None):
+        tool = self._init_tool(tool_call, recipient_agent)
+        if isinstance(tool, str):
+            return tool
+
+        # the span of a generator tool is only current while the generator runs
+        tool_run = ToolRun(tool, activate=not inspect.isgeneratorfunction(type(tool).run))
+        try:
+            # get outputs from the tool
+            output = tool.run()
+        except Exception as e:
+            tool_run.end(failed=True)
+            return self._format_tool_error(e)
+
+        if inspect.isgenerator(output):
+            return self._record_tool_generator(tool_run, output)
+        tool_run.end()
+        return output
+
+    @staticmethod
+    def _record_tool_generator(tool_run, output):
+        """Yields from the generator of a tool and ends the record of the tool once the generator is exhausted."""
+        failed = True
+        try:
+            result = yield from (resume_in_span(output, tool_run.span, profile=True) if tool_run.span else output)
+            failed = False
+            return result
+        finally:
+            tool_run.end(failed)
+
+    def _init_tool(self, tool_call, recipient_agent=None):
+        """Initializes the tool of a tool call. Returns an error message if the tool cannot be initialized."""
         if not recipient_agent:
             recipient_agent = self.recipient_agent
 
-        funcs = recipient_agent.functions
-        func = next((func for func in funcs if func.__name__ == tool_call.function.name), None)
+        func = recipient_agent.get_function(tool_call.function.name)
 
         if not func:
-            return f"Error: Function {tool_call.function.name} not found. Available functions: {[func.__name__ for func in funcs]}"
+            return f"Error: Function {tool_call.function.name} not found. Available functions: {[func.__name__ for func in recipient_agent.functions]}"
 
         try:
-            # init tool
-            func = func(**eval(tool_call.function.arguments))
+            # init tool, parsing and validating the json arguments in one pass
+            func = func.model_validate_json(tool_call.function.arguments or "{}")
             func.caller_agent = recipient_agent
-            # get outputs from the tool
-            output = func.run()
-
-            return output
+            return func
         except Exception as e:
-            error_message = f"Error: {e}"
-            if "For further information visit" in error_message:
-                error_message = error_message.split("For further information visit")[0]
-            return error_message
+            return self._format_tool_error(e)
+
+    @staticmethod
+    def _format_tool_error(e):
+        error_message = f"Error: {e}"
+        if "For further information visit" in error_message:
+            error_message = error_message.split("For further information visit")[0]
+        return error_message
+
+    def _get_tool_call_batches(self, tool_calls, recipient_agent):
+        """
+        Splits tool calls into consecutive batches that can be executed in parallel.
+
+        Calls to tools with `parallel_safe = False` always form a batch of their own, so they never overlap with
+        other tool calls.
+        """
+        batches = []
+        batch = []
+        for tool_call in tool_calls:
+            func = recipient_agent.get_function(tool_call.function.name)
+            if func is not None and not func.parallel_safe:
+                if batch:
+                    batches.append(batch)
+                    batch = []
+                batches.append([tool_call])
+            else:
+                batch.append(tool_call)
+        if batch:
+            batches.append(batch)
+        return batches
+
+    def _execute_tool_calls_in_parallel(self, tool_calls, recipient_agent, yield_messages=True):
+        """
+        Executes a batch of tool calls with the tool executor.
+
+        Yields the messages of each call as soon as it finishes, and returns the outputs in the original call order.
+        An error in one call does not affect the other calls.
+        """
+        if yield_messages:
+            for tool_call in tool_calls:
+                yield MessageOutput("function", recipient_agent.name, self.agent.name, tool_call.function)
+
+        tools = [self._init_tool(tool_call, recipient_agent) for tool_call in tool_calls]
+        executed = [index for index, tool in enumerate(tools) if not isinstance(tool, str)]
+
+        def completed():
+            # tools that failed to initialize have their error message as output
+            for index, tool in enumerate(tools):
+                if isinstance(tool, str):
+                    yield index, (tool, None)
+            for i, result in self.tool_executor.execute_as_completed([tools[index] for index in executed]):
+                yield executed[i], result
+
+        outputs = [None] * len(tool_calls)
+        for index, result in completed():
+            if isinstance(result, Exception):
+                output, messages = self._format_tool_error(result), None
+            else:
+                output, messages = result
+
+            if messages is not None:
+                if yield_messages:
+                    for item in messages:
+                        if isinstance(item, MessageOutput):
+                            yield item
+            elif yield_messages:
+                yield MessageOutput("function_output", tool_calls[index].function.name, recipient_agent.name, output)
+
+            outputs[index] = output
+
+        return outputs
@@ -1,16 +1,65 @@
+import contextvars
 import threading
-from typing import Literal
+from collections import deque
+from concurrent.futures import Future
+from typing import Callable, Deque, List, Literal, Optional, Tuple
 
 from agency_swarm.agents import Agent
 from agency_swarm.threads import Thread
+from agency_swarm.threads.worker_pool import WorkerPool, get_default_worker_pool
 from agency_swarm.user import User
 
+# callback(thread, response, error), called in the worker thread when a task completes
+CompletionCallback = Callable[["ThreadAsync", Optional[str], Optional[BaseException]], None]
+
 
 class ThreadAsync(Thread):
-    def __init__(self, agent: Literal[Agent, User], recipient_agent: Agent):
+    """
+    Thread for `async_mode='threading'`. Messages are processed in the background on a bounded worker pool.
+
+    The status and the response of the last task are tracked locally with a future, so checking the status does not
+    send any requests to the OpenAI API. Completion callbacks are notified when a task completes.
+
+    Messages sent while the agent is busy wait in a FIFO queue of up to `max_queue_size` messages. When the current
+    task completes, all queued messages are combined into a single message for the next task. When the queue is full,
+    new messages are rejected until the agent catches up.
+    """
+    message_separator = "\n\n"
+
+    def __init__(self, agent: Literal[Agent, User], recipient_agent: Agent, worker_pool: WorkerPool = None,
+                 max_queue_size: int = 10):
+        """
+        Parameters:
+            agent (Agent | User): The agent or user that sends messages.
+            recipient_agent (Agent): The agent that processes the messages.
+            worker_pool (WorkerPool, optional): The pool to run tasks on. Defaults to a pool shared by all threads.
+            max_queue_size (int, optional): Maximum number of messages waiting while the agent is busy. If 0, messages
+                sent while the agent is busy are rejected. Defaults to 10.
+        """
         super().__init__(agent, recipient_agent)
-        self.pythread = None
+        self.worker_pool = worker_pool
+        self.max_queue_size = max_queue_size
+        self.future: Optional[Future] = None
         self.response = None
+        self.completion_callbacks: List[CompletionCallback] = []
+        # (message, message_files, callback, context of the sender)
+        self.pending: Deque[Tuple[str, Optional[List[str]], Optional[CompletionCallback], contextvars.Context]] = deque()
+        self.queued_messages = 0
+        self.rejected_messages = 0
+        self.coalesced_tasks = 0
+        self._future_lock = threading.Lock()
+        self._idle = threading.Condition(self._future_lock)
+        self._running = False
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of messages waiting for the current task to complete."""
+        return len(self.pending)
+
+    @property
+    def queue_full(self) -> bool:
+        """Whether new messages are rejected until the agent catches up."""
+        return len(self.pending) >= self.max_queue_size
 
     def worker(self, message: str, message_files=None):
         gen = super().get_completion(message=message, message_files=message_files,
@@ -22,29 +71,79 @@ class ThreadAsync(Thread):
                 self.response = f"""{self.recipient_agent.name}'s Response: '{e.value}'"""
                 break
 
-        return
+        return self.response
+
+    def get_completion_async(self, message: str, message_files=None, callback: CompletionCallback = None):
+        """
+        Starts processing a message in the background, or queues it if the agent is busy.
 
-    def get_completion_async(self, message: str, message_files=None):
-        if self.pythread and self.pythread.is_alive():
-            return "System Notification: 'Agent is busy, so your message was not received. Please always use 'GetResponse' tool to check for status first, before using 'SendMessage' tool again for the same agent.'"
-        elif self.pythread and not self.pythread.is_alive():
-            self.pythread.join()
-            self.pythread = None
-            self.response = None
+        Parameters:
+            message (str): The message to send.
+            message_files (List[str], optional): File ids to attach to the message.
+            callback (CompletionCallback, optional): Called with the thread, the response and the error, if any, when
+                the task processing this message completes, in addition to the completion callbacks of the thread.
 
-        run = self.get_last_run()
+        Returns:
+            str: A system notification whether the task has started, the message was queued or the queue is full.
+        """
+        with self._future_lock:
+            if self._running:
+                if self.queue_full:
+                    self.rejected_messages += 1
+                    if not self.max_queue_size:
+                        return "System Notification: 'Agent is busy, so your message was not received. Please always use 'GetResponse' tool to check for status first, before using 'SendMessage' tool again for the same agent.'"
+                    return f"System Notification: 'Agent is busy and already has {len(self.pending)} messages waiting, so your message was not received. Please use 'GetResponse' tool to wait for the current task to complete, before using 'SendMessage' tool again for the same agent.'"
 
-        if run and run.status in ['queued', 'in_progress', 'requires_action']:
-            return "System Notification: 'Agent is busy, so your message was not received. Please always use 'GetResponse' tool to check for status first, before using 'SendMessage' tool again for the same agent.'"
+                self.pending.append((message, message_files, callback, contextvars.copy_context()))
+                self.queued_messages += 1
+                return f"System Notification: 'Agent is busy, so your message was queued at position {len(self.pending)} and will be processed after the current task. Please notify the user that they can tell you to check the status later. You can do this with the 'GetResponse' tool, after you have been instructed to do so. Don't mention the tool itself to the user. '"
 
-        self.pythread = threading.Thread(target=self.worker,
-                                         args=(message, message_files))
+            if self.future is None and self.id:
+                # no task was started in this process, the thread may have a run started elsewhere
+                run = self.get_last_run()
+                if run and run.status in ['queued', 'in_progress', 'requires_action']:
+                    return "System Notification: 'Agent is busy, so your message was not received. Please always use 'GetResponse' tool to check for status first, before using 'SendMessage' tool again for the same agent.'"
 
-        self.pythread.start()
+            future = self._submit(message, message_files)
+
+        future.add_done_callback(lambda f: self._on_done(f, [callback] if callback else []))
 
         return "System Notification: 'Task has started. Please notify the user that they can tell you to check the status later. You can do this with the 'GetResponse' tool, after you have been instructed to do so. Don't mention the tool itself to the user. "
 
+    def add_completion_callback(self, callback: CompletionCallback):
+        """Adds a callback that is notified when any task of this thread completes."""
+        self.completion_callbacks.append(callback)
+
+    def wait(self, timeout: float = None):
+        """
+        Waits for the current task and all queued messages to complete.
+
+        Parameters:
+            timeout (float, optional): Maximum time to wait in seconds.
+
+        Returns:
+            str: The status of the task, like `check_status`.
+        """
+        with self._idle:
+            self._idle.wait_for(lambda: not self._running, timeout)
+        return self.check_status()
+
     def check_status(self, run=None):
+        with self._future_lock:
+            future = self.future
+            pending = bool(self.pending)
+
+        if run is None and future is not None:
+            if pending or not future.done():
+                return "System Notification: 'Task is not completed yet. Please tell the user to wait and try again later.'"
+
+            error = future.exception()
+            if error is not None:
+                return f"System Notification: 'Agent run failed with error: {error}. You may send another message with the 'SendMessage' tool.'"
+
+            return future.result()
+
+        # no task was started in this process, check the last run of the thread
         if not run:
             run = self.get_last_run()
 
@@ -58,17 +157,15 @@ class ThreadAsync(Thread):
         if run.status == "failed":
             return f"System Notification: 'Agent run failed with error: {run.last_error.message}. You may send another message with the 'SendMessage' tool.'"
 
-        messages = self.client.beta.threads.messages.list(
-            thread_id=self.id,
-            order="desc",
-        )
+        self.sync_messages()
 
-        return f"""{self.recipient_agent.name}'s Response: '{messages.data[0].content[0].text.value}'"""
+        return f"""{self.recipient_agent.name}'s Response: '{self.messages[-1].content[0].text.value}'"""
 
     def get_last_run(self):
         if not self.thread:
             self.init_thread()
 
+        self._count_api_call("runs.list")
         runs = self.client.beta.threads.runs.list(
             thread_id=self.thread.id,
             order="desc",
@@ -79,4 +176,43 @@ class ThreadAsync(Thread):
 
         run = runs.data[0]
 
-        return run
\ No newline at end of file
+        return run
+
+    def _submit(self, message, message_files):
+        """Submits a task to the worker pool. Must be called with the future lock held."""
+        self._running = True
+        self.response = None
+        pool = self.worker_pool or get_default_worker_pool()
+        self.future = pool.submit(self.worker, message, message_files)
+        return self.future
+
+    def _on_done(self, future, callbacks):
+        error = future.exception()
+        response = None if error else future.result()
+        for completion_callback in self.completion_callbacks + callbacks:
+            try:
+                completion_callback(self, response, error)
+            except Exception as e:
+                print(f"Error in completion callback of {self.recipient_agent.name}: {e}")
+
+        with self._future_lock:
+            if not self.pending:
+                self._running = False
+                self._idle.notify_all()
+                return
+
+            # combine all queued messages into the next task
+            messages, files, next_callbacks = [], [], []
+            context = self.pending[0][3]
+            while self.pending:
+                message, message_files, callback, _ = self.pending.popleft()
+                messages.append(message)
+                files.extend(message_files or [])
+                if callback:
+                    next_callbacks.append(callback)
+            if len(messages) > 1:
+                self.coalesced_tasks += 1
+            # the task continues the trace of the first queued message
+            next_future = context.run(self._submit, self.message_separator.join(messages), files or None)
+
+        next_future.add_done_callback(lambda f: self._on_done(f, next_callbacks))
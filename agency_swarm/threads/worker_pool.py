@@ -0,0 +1,134 @@
+import contextvars
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+
+class WorkerPool:
+    """
+    Bounded pool of worker threads for conversations started in `async_mode='threading'`.
+
+    Tasks beyond `max_workers` wait in the queue of the pool instead of starting a new thread each. The pool keeps
+    metrics of its saturation and of the time tasks spend waiting in the queue, see `get_metrics`.
+    """
+
+    def __init__(self, max_workers: int = 16, thread_name_prefix: str = "agency-swarm-async"):
+        """
+        Parameters:
+            max_workers (int, optional): Maximum number of tasks running at once. Defaults to 16.
+            thread_name_prefix (str, optional): Prefix of the names of the worker threads.
+        """
+        self.max_workers = max_workers
+        self.thread_name_prefix = thread_name_prefix
+
+        self._lock = threading.Lock()
+        self._executor = None
+        self._active = 0
+        self._queued = 0
+        self._submitted = 0
+        self._completed = 0
+        self._failed = 0
+        self._saturated = 0
+        self._peak_active = 0
+        self._peak_queued = 0
+        self._queue_wait_total = 0.0
+        self._queue_wait_max = 0.0
+        self._run_time_total = 0.0
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        """
+        Schedules a task on the pool.
+
+        Parameters:
+            fn (Callable): The function to run.
+            *args: Positional arguments of the function.
+            **kwargs: Keyword arguments of the function.
+
+        Returns:
+            Future: The future of the result of the function.
+        """
+        submitted_at = time.perf_counter()
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                    thread_name_prefix=self.thread_name_prefix)
+            self._submitted += 1
+            if self._active + self._queued >= self.max_workers:
+                # all workers are busy, the task waits in the queue
+                self._saturated += 1
+            self._queued += 1
+            self._peak_queued = max(self._peak_queued, self._queued)
+            executor = self._executor
+        # tasks run in a copy of the context of the caller, so they continue its trace
+        return executor.submit(contextvars.copy_context().run, self._run, submitted_at, fn, args, kwargs)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Returns a snapshot of the metrics of the pool.
+
+        Returns:
+            Dict[str, Any]: Current number of `active` and `queued` tasks, `utilization` of the workers (0 to 1), total
+                number of `submitted`, `completed` and `failed` tasks, number of `saturated` submissions that found all
+                workers busy, `peak_active` and `peak_queued` tasks, and average and maximum time in seconds that
+                tasks waited in the queue (`queue_wait_avg`, `queue_wait_max`) and average run time (`run_time_avg`).
+        """
+        with self._lock:
+            started = self._completed + self._active
+            return {
+                "max_workers": self.max_workers,
+                "active": self._active,
+                "queued": self._queued,
+                "utilization": self._active / self.max_workers,
+                "submitted": self._submitted,
+                "completed": self._completed,
+                "failed": self._failed,
+                "saturated": self._saturated,
+                "peak_active": self._peak_active,
+                "peak_queued": self._peak_queued,
+                "queue_wait_avg": self._queue_wait_total / started if started else 0.0,
+                "queue_wait_max": self._queue_wait_max,
+                "run_time_avg": self._run_time_total / self._completed if self._completed else 0.0,
+            }
+
+    def shutdown(self, wait: bool = True):
+        with self._lock:
+            executor = self._executor
+            self._executor = None
+        if executor:
+            executor.shutdown(wait=wait)
+
+    def _run(self, submitted_at, fn, args, kwargs):
+        started_at = time.perf_counter()
+        queue_wait = started_at - submitted_at
+        with self._lock:
+            self._queued -= 1
+            self._active += 1
+            self._peak_active = max(self._peak_active, self._active)
+            self._queue_wait_total += queue_wait
+            self._queue_wait_max = max(self._queue_wait_max, queue_wait)
+        failed = False
+        try:
+            return fn(*args, **kwargs)
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            with self._lock:
+                self._active -= 1
+                self._completed += 1
+                self._failed += failed
+                self._run_time_total += time.perf_counter() - started_at
+
+
+_default_pool_lock = threading.Lock()
+_default_pool = None
+
+
+def get_default_worker_pool() -> WorkerPool:
+    """Returns the worker pool shared by async threads that were not given a pool by their agency."""
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = WorkerPool()
+        return _default_pool
@@ -1,3 +1,4 @@
+import weakref
 from abc import ABC, abstractmethod
 from typing import Optional, Any, ClassVar
 
@@ -20,8 +21,23 @@ class SharedState:
         return self.data.get(key, default)
 
 
+# tool class -> (cache token, openai schema)
+_openai_schema_cache = weakref.WeakKeyDictionary()
+
+
+def copy_json(obj):
+    """Deep copies a JSON-like structure of dicts and lists, much faster than copy.deepcopy."""
+    if isinstance(obj, dict):
+        return {k: copy_json(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [copy_json(v) for v in obj]
+    return obj
+
+
 class BaseTool(OpenAISchema, ABC):
     shared_state: ClassVar[SharedState] = SharedState()
+    # set to False for tools that must not run concurrently with other tool calls, e.g. tools that change process state
+    parallel_safe: ClassVar[bool] = True
     caller_agent: Any = None
 
     def __init__(self, **kwargs):
@@ -32,6 +48,16 @@ class BaseTool(OpenAISchema, ABC):
     @classmethod
     @property
     def openai_schema(cls):
+        # schemas are cached per class, callers get a copy, so they can't modify the cache
+        token = (cls.__name__, cls.__doc__, id(cls.__dict__.get("__pydantic_core_schema__")))
+        cached = _openai_schema_cache.get(cls)
+        if cached is None or cached[0] != token:
+            cached = (token, cls._build_openai_schema())
+            _openai_schema_cache[cls] = cached
+        return copy_json(cached[1])
+
+    @classmethod
+    def _build_openai_schema(cls):
         # Exclude 'caller_agent' from the properties
         schema = super(BaseTool, cls).openai_schema
 
@@ -0,0 +1,84 @@
+import threading
+from typing import Any, Callable, ClassVar, Dict, Optional, Type
+
+from pydantic import ConfigDict
+
+from .BaseTool import BaseTool, copy_json
+
+_materialize_lock = threading.RLock()
+
+
+class LazyTool(BaseTool):
+    """
+    Tool whose pydantic model is built from its function schema on first use.
+
+    The function schema is precomputed, so agents can send the tool to OpenAI without building the model. Creating
+    an instance or validating arguments builds the model once and returns an instance of the built tool class.
+    Used by `ToolFactory.from_openapi_schema` for specs with many operations, where most tools are never called.
+    """
+    model_config = ConfigDict(defer_build=True)
+
+    function_schema: ClassVar[Dict[str, Any]] = None
+    callback: ClassVar[Optional[Callable]] = None
+    async_callback: ClassVar[Optional[Callable]] = None
+    tool_class: ClassVar[Optional[Type[BaseTool]]] = None
+
+    @classmethod
+    def create(cls, function_schema: Dict[str, Any], callback: Callable,
+               async_callback: Callable = None) -> Type["LazyTool"]:
+        """
+        Creates a lazy tool class.
+
+        Parameters:
+            function_schema: The OpenAI function schema of the tool.
+            callback: The function to run when the tool is called.
+            async_callback: The coroutine function to run when the tool is called from async code, optional.
+
+        Returns:
+            A LazyTool subclass named after the function.
+        """
+        # the core schema of the class is deferred (defer_build) and never built, as it is never validated itself
+        return type(cls)(function_schema["name"], (cls,), {
+            "__doc__": function_schema.get("description", ""),
+            "__module__": cls.__module__,
+            "__qualname__": function_schema["name"],
+            "function_schema": function_schema,
+            "callback": callback,
+            "async_callback": async_callback,
+            "tool_class": None,
+        })
+
+    @classmethod
+    @property
+    def openai_schema(cls):
+        return copy_json(cls.function_schema)
+
+    @classmethod
+    def materialize(cls) -> Type[BaseTool]:
+        """Builds the tool class from the function schema, once."""
+        if cls.tool_class is None:
+            with _materialize_lock:
+                if cls.tool_class is None:
+                    from .ToolFactory import ToolFactory
+
+                    tool_class = ToolFactory.from_openai_schema(copy_json(cls.function_schema), cls.callback)
+                    tool_class.parallel_safe = cls.parallel_safe
+                    if cls.async_callback is not None:
+                        tool_class.arun = cls.async_callback
+                    cls.tool_class = tool_class
+        return cls.tool_class
+
+    def __new__(cls, *args, **kwargs):
+        return cls.materialize()(*args, **kwargs)
+
+    @classmethod
+    def model_validate(cls, obj, *args, **kwargs):
+        return cls.materialize().model_validate(obj, *args, **kwargs)
+
+    @classmethod
+    def model_validate_json(cls, json_data, *args, **kwargs):
+        return cls.materialize().model_validate_json(json_data, *args, **kwargs)
+
+    def run(self):
+        # instances are created from the built tool class, so this only runs for instances that bypass __new__
+        return type(self).materialize().model_construct(**self.__dict__).run()
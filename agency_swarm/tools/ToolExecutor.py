@@ -0,0 +1,208 @@
+import asyncio
+import contextvars
+import inspect
+import pickle
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from typing import Any, Iterator, List, Literal, Optional, Tuple
+
+from agency_swarm.messages import MessageOutput
+from agency_swarm.util.metrics import get_metrics_registry
+from agency_swarm.util.tracing import get_tracer, get_current_span, set_current_span
+
+
+class ToolExecutor:
+    """
+    Executes independent tool calls of a run in parallel.
+
+    Supported backends:
+        - "thread": runs every tool in a thread pool. Best for I/O-bound tools like API requests or SendMessage.
+        - "process": runs picklable, non-generator tools in a process pool and the rest in a thread pool. Best for CPU-bound tools.
+        - "asyncio": runs tools on a private event loop, awaiting `arun` if the tool defines it and using a thread pool otherwise.
+
+    Results are returned in the order of the given tools, or as they finish with `execute_as_completed`. Each result is either an `(output, messages)` tuple, where
+    `messages` holds the messages yielded by generator tools (or None), or the exception raised by that tool.
+    """
+
+    def __init__(self, backend: Literal["thread", "process", "asyncio"] = "thread", max_workers: Optional[int] = None):
+        if backend not in ("thread", "process", "asyncio"):
+            raise ValueError(f"Invalid tool executor backend: {backend}")
+        self.backend = backend
+        self.max_workers = max_workers
+
+        self._lock = threading.Lock()
+        self._thread_pool = None
+        self._process_pool = None
+        self._loop = None
+
+    def execute(self, tools: List) -> List:
+        """Runs the given tool instances concurrently and returns their results in order."""
+        results = [None] * len(tools)
+        for index, result in self.execute_as_completed(tools):
+            results[index] = result
+        return results
+
+    def execute_as_completed(self, tools: List) -> Iterator[Tuple[int, Any]]:
+        """Runs the given tool instances concurrently and yields the index and the result of each one as it finishes."""
+        futures = {}
+        for index, tool in enumerate(tools):
+            if self.backend == "asyncio":
+                future = asyncio.run_coroutine_threadsafe(_arun_tool_in_span(tool, get_current_span()),
+                                                          self._get_loop())
+            elif self.backend == "process" and is_process_safe(tool):
+                future = self._get_process_pool().submit(run_tool_in_process,
+                                                         tool.model_copy(update={"caller_agent": None}))
+                # the tool runs in another process, so it is recorded from here
+                tool_run = ToolRun(tool, activate=False)
+                future.add_done_callback(lambda f, tool_run=tool_run: tool_run.end(f.exception() is not None))
+            else:
+                # workers continue the trace of the calling thread
+                future = self._get_thread_pool().submit(contextvars.copy_context().run, run_tool, tool)
+            futures[future] = index
+
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as e:
+                result = e
+            yield futures[future], result
+
+    def shutdown(self):
+        """Releases the pools and the event loop owned by this executor."""
+        with self._lock:
+            if self._thread_pool:
+                self._thread_pool.shutdown(wait=False)
+                self._thread_pool = None
+            if self._process_pool:
+                self._process_pool.shutdown(wait=False)
+                self._process_pool = None
+            if self._loop:
+                self._loop.call_soon_threadsafe(self._loop.stop)
+                self._loop = None
+
+    def _get_thread_pool(self):
+        with self._lock:
+            if self._thread_pool is None:
+                self._thread_pool = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                       thread_name_prefix="agency-swarm-tool")
+            return self._thread_pool
+
+    def _get_process_pool(self):
+        with self._lock:
+            if self._process_pool is None:
+                self._process_pool = ProcessPoolExecutor(max_workers=self.max_workers)
+            return self._process_pool
+
+    def _get_loop(self):
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, daemon=True,
+                                 name="agency-swarm-tool-loop").start()
+            return self._loop
+
+
+class ToolRun:
+    """
+    Records a tool execution: its duration and errors in the metrics registry, and a span of the tracer, which is
+    profiled with cProfile if the tracer profiles tools.
+    """
+    __slots__ = ("tool", "start", "span", "profiling")
+
+    def __init__(self, tool, activate: bool = True):
+        """
+        Parameters:
+            tool (BaseTool): The tool that starts executing.
+            activate (bool, optional): Make the span of the tool the current span, so that conversations started by
+                the tool are its children. Must be False if the execution ends in another thread. Defaults to True.
+        """
+        self.tool = tool
+        tracer = get_tracer()
+        self.span = tracer.start_span(type(tool).__name__, "tool", activate=activate)
+        self.profiling = activate and tracer.start_profile(self.span)
+        self.start = time.perf_counter()
+
+    def end(self, failed: bool = False):
+        duration = time.perf_counter() - self.start
+        name = type(self.tool).__name__
+        registry = get_metrics_registry()
+        registry.observe("agency_swarm_tool_seconds", duration, tool=name)
+        if failed:
+            registry.inc("agency_swarm_tool_errors_total", tool=name)
+
+        if self.span is not None:
+            tracer = get_tracer()
+            if self.profiling:
+                tracer.stop_profile(self.span)
+            tracer.end_span(self.span, **({"error": True} if failed else {}))
+
+
+def run_tool(tool):
+    """Runs a tool. Returns its output and the messages it yielded, if it is a generator."""
+    tool_run = ToolRun(tool)
+    failed = True
+    try:
+        output = tool.run()
+        if not inspect.isgenerator(output):
+            failed = False
+            return output, None
+
+        messages = []
+        try:
+            while True:
+                messages.append(next(output))
+        except StopIteration as e:
+            failed = False
+            return e.value, messages
+    finally:
+        tool_run.end(failed)
+
+
+async def _arun_tool_in_span(tool, span=None):
+    set_current_span(span)
+    return await arun_tool(tool)
+
+
+async def arun_tool(tool):
+    """Runs a tool on the event loop if it defines `arun`, otherwise in the default executor."""
+    if not hasattr(tool, "arun"):
+        # executor threads don't inherit the context, which holds the current span
+        return await asyncio.get_running_loop().run_in_executor(None, contextvars.copy_context().run, run_tool, tool)
+
+    tool_run = ToolRun(tool)
+    failed = True
+    try:
+        output = tool.arun()
+        if inspect.isawaitable(output):
+            output = await output
+        if not inspect.isasyncgen(output):
+            failed = False
+            return output, None
+
+        messages = []
+        result = None
+        async for item in output:
+            if isinstance(item, MessageOutput):
+                messages.append(item)
+            else:
+                result = item
+        failed = False
+        return result, messages
+    finally:
+        tool_run.end(failed)
+
+
+def run_tool_in_process(tool):
+    return tool.run(), None
+
+
+def is_process_safe(tool):
+    """Checks if a tool can be sent to a worker process."""
+    if inspect.isgeneratorfunction(type(tool).run):
+        return False
+    try:
+        pickle.dumps(type(tool))
+    except Exception:
+        return False
+    return True
@@ -3,13 +3,14 @@ import inspect
 import json
 import os
 import sys
-from typing import Any, Dict, List, Type, Union
+from typing import Any, Dict, List, Optional, Type, Union
 
-import jsonref
-from jsonref import requests
 from pydantic import create_model, Field
 
 from .BaseTool import BaseTool
+from .LazyTool import LazyTool
+from ..util.http_client import HttpClient, get_http_client
+from ..util.openapi import get_openapi_operations
 from ..util.schema import reference_schema
 
 
@@ -179,109 +180,74 @@ class ToolFactory:
         return tool
 
     @staticmethod
-    def from_openapi_schema(schema: Union[str, dict], headers: Dict[str, str] = None, params: Dict[str, Any] = None) \
-            -> List[Type[BaseTool]]:
+    def from_openapi_schema(schema: Union[str, dict], headers: Dict[str, str] = None, params: Dict[str, Any] = None,
+                            http_client: HttpClient = None, lazy: bool = True,
+                            cache_dir: Optional[Union[str, bool]] = None) -> List[Type[BaseTool]]:
         """
         Converts an OpenAPI schema into a list of BaseTools.
 
+        Tools send requests through a pooled HTTP client with keep-alive connections, timeouts and retries, and
+        provide an async `arun` method, used by async threads and the asyncio tool executor.
+
+        Parsed operations can be cached on disk by the hash of the schema. By default, tools are lazy: their function
+        schemas are precomputed, and their pydantic models are built when they are first called.
+
         Parameters:
             schema: The OpenAPI schema to convert.
             headers: The headers to use for requests.
             params: The parameters to use for requests.
+            http_client: The HTTP client to use for requests. Defaults to the client shared by all tools.
+            lazy: Whether to build the pydantic models of the tools on first use. Defaults to True.
+            cache_dir: Folder of the parsed operations cache, True for the default folder, False to disable the
+                cache. Defaults to None, which caches only if the `AGENCY_SWARM_CACHE_DIR` environment variable is
+                set.
 
         Returns:
             A list of BaseTools.
         """
-        if isinstance(schema, dict):
-            openapi_spec = schema
-            openapi_spec = jsonref.JsonRef.replace_refs(openapi_spec)
-        else:
-            openapi_spec = jsonref.loads(schema)
         tools = []
         headers = headers or {}
-        for path, methods in openapi_spec["paths"].items():
-            for method, spec_with_ref in methods.items():
-                def callback(self):
-                    url = openapi_spec["servers"][0]["url"] + path
-                    parameters = self.model_dump().get('parameters', {})
-                    # replace all parameters in url
-                    for param, value in parameters.items():
-                        if "{" + str(param) + "}" in url:
-                            url = url.replace(f"{{{param}}}", str(value))
-                            parameters[param] = None
-                    url = url.rstrip("/")
-                    parameters = {k: v for k, v in parameters.items() if v is not None}
-                    parameters = {**parameters, **params} if params else parameters
-                    if method == "get":
-                        return requests.get(url, params=parameters, headers=headers,
-                                            json=self.model_dump().get('requestBody', None)
-                                            ).json()
-                    elif method == "post":
-                        return requests.post(url,
-                                             params=parameters,
-                                             json=self.model_dump().get('requestBody', None),
-                                             headers=headers
-                                             ).json()
-                    elif method == "put":
-                        return requests.put(url,
-                                            params=parameters,
-                                            json=self.model_dump().get('requestBody', None),
-                                            headers=headers
-                                            ).json()
-                    elif method == "delete":
-                        return requests.delete(url,
-                                               params=parameters,
-                                               json=self.model_dump().get('requestBody', None),
-                                               headers=headers
-                                               ).json()
-
-                # 1. Resolve JSON references.
-                spec = jsonref.replace_refs(spec_with_ref)
-
-                # 2. Extract a name for the functions.
-                function_name = spec.get("operationId")
-
-                # 3. Extract a description and parameters.
-                desc = spec.get("description") or spec.get("summary", "")
-
-                schema = {"type": "object", "properties": {}}
-
-                req_body = (
-                    spec.get("requestBody", {})
-                    .get("content", {})
-                    .get("application/json", {})
-                    .get("schema")
-                )
-                if req_body:
-                    schema["properties"]["requestBody"] = req_body
-
-                spec_params = spec.get("parameters", [])
-                if spec_params:
-                    param_properties = {}
-                    for param in spec_params:
-                        if "schema" not in param and "type" in param:
-                            param["schema"] = {"type": param["type"]}
-                        param_properties[param["name"]] = param["schema"]
-                        if "description" in param:
-                            param_properties[param["name"]]["description"] = param["description"]
-                        if "required" in param:
-                            param_properties[param["name"]]["required"] = param["required"]
-                        if "example" in param:
-                            param_properties[param["name"]]["example"] = param["example"]
-                    schema["properties"]["parameters"] = {
-                        "type": "object",
-                        "properties": param_properties,
-                    }
+        for operation in get_openapi_operations(schema, cache_dir=cache_dir):
+            callback, async_callback = ToolFactory._get_openapi_callbacks(
+                operation["url"], operation["method"], headers, params, http_client)
+            tool = LazyTool.create(operation["function"], callback, async_callback)
+            tools.append(tool if lazy else tool.materialize())
 
-                function = {
-                    "name": function_name,
-                    "description": desc,
-                    "parameters": schema,
-                }
+        return tools
 
-                tools.append(ToolFactory.from_openai_schema(function, callback))
+    @staticmethod
+    def _get_openapi_callbacks(url: str, method: str, headers: Dict[str, str], params: Optional[Dict[str, Any]],
+                               http_client: Optional[HttpClient]):
+        """Returns the sync and async callbacks of an OpenAPI operation."""
+        def build_request(tool):
+            request_url = url
+            parameters = tool.model_dump().get('parameters', {}) or {}
+            # replace all parameters in url
+            for param, value in parameters.items():
+                if "{" + str(param) + "}" in request_url:
+                    request_url = request_url.replace(f"{{{param}}}", str(value))
+                    parameters[param] = None
+            request_url = request_url.rstrip("/")
+            parameters = {k: v for k, v in parameters.items() if v is not None}
+            parameters = {**parameters, **params} if params else parameters
+            # httpx rejects None header values, like a missing API key
+            request = {"params": parameters, "headers": {k: v for k, v in headers.items() if v is not None}}
+            request_body = tool.model_dump().get('requestBody', None)
+            if request_body is not None:
+                request["json"] = request_body
+            return request_url, request
 
-        return tools
+        def callback(self):
+            request_url, request = build_request(self)
+            client = http_client or get_http_client()
+            return client.request(method.upper(), request_url, **request).json()
+
+        async def async_callback(self):
+            request_url, request = build_request(self)
+            client = http_client or get_http_client()
+            return (await client.arequest(method.upper(), request_url, **request)).json()
+
+        return callback, async_callback
 
     @staticmethod
     def from_file(file_path: str) -> Type[BaseTool]:
@@ -356,10 +322,8 @@ class ToolFactory:
                 continue
 
             openai_schema = tool.openai_schema
-            defs = {}
-            if '$defs' in openai_schema['parameters']:
-                defs = openai_schema['parameters']['$defs']
-                del openai_schema['parameters']['$defs']
+            defs = openai_schema['parameters'].get('$defs', {})
+            parameters = {k: v for k, v in openai_schema['parameters'].items() if k != '$defs'}
 
             schema['paths']["/" + openai_schema['name']] = {
                 "post": {
@@ -369,7 +333,7 @@ class ToolFactory:
                     "requestBody": {
                         "content": {
                             "application/json": {
-                                "schema": openai_schema['parameters']
+                                "schema": parameters
                             }
                         }
                     }
@@ -1,4 +1,6 @@
 from .BaseTool import BaseTool
+from .LazyTool import LazyTool
 from .oai.Retrieval import Retrieval
 from .oai.CodeInterpreter import CodeInterpreter
 from .ToolFactory import ToolFactory
+from .ToolExecutor import ToolExecutor
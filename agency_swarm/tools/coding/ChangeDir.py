@@ -9,6 +9,8 @@ class ChangeDir(BaseTool):
     """
     This tool changes the current working directory to the specified path.
     """
+    parallel_safe = False
+
     path: str = Field(
         ..., description="Path to the directory to change to.",
         examples=["./some_folder", "../../some_folder"]
@@ -1,2 +1,8 @@
 from .create_agent_template import create_agent_template
-from .oai import set_openai_key, get_openai_client, set_openai_client
+from .oai import set_openai_key, get_openai_client, set_openai_client, get_async_openai_client, \
+    set_async_openai_client
+from .settings_store import SettingsStore
+from .conversation_store import ConversationStore, SQLiteConversationStore
+from .http_client import HttpClient, get_http_client, set_http_client
+from .metrics import MetricsRegistry, get_metrics_registry, set_metrics_registry
+from .tracing import Tracer, get_tracer, set_tracer
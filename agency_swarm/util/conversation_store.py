@@ -0,0 +1,301 @@
+import os
+import queue
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import Counter
+from typing import Dict, List, Tuple
+
+from openai.types.beta.threads import ThreadMessage
+
+
+class ConversationStore(ABC):
+    """
+    Durable store of the conversations of agencies: thread ids of each session, messages, runs and tool outputs.
+
+    Threads write to the store as they receive messages and complete runs, and serve resumed conversations from it,
+    so only the messages created after the last stored message are fetched from the API. Pass the callbacks of a
+    session as `threads_callbacks` of an agency to use a store:
+
+    ```python
+    store = SQLiteConversationStore("conversations.db")
+    agency = Agency([ceo], threads_callbacks=store.threads_callbacks("user-42"))
+    ```
+    """
+
+    @abstractmethod
+    def load_thread_ids(self, session_id: str) -> Dict:
+        """Returns the thread ids of a session in the format of `threads_callbacks`, or an empty dict."""
+
+    @abstractmethod
+    def save_thread_ids(self, session_id: str, thread_ids: Dict):
+        """Saves the thread ids of a session in the format of `threads_callbacks`."""
+
+    @abstractmethod
+    def add_messages(self, thread_id: str, messages: List[ThreadMessage]):
+        """Appends messages to a thread. Messages that are already stored are ignored."""
+
+    @abstractmethod
+    def get_messages(self, thread_id: str) -> List[ThreadMessage]:
+        """Returns the stored messages of a thread in chronological order."""
+
+    @abstractmethod
+    def save_run(self, run):
+        """Saves the current state of a run."""
+
+    @abstractmethod
+    def get_runs(self, thread_id: str) -> List[Dict]:
+        """Returns the stored runs of a thread in the order they were created."""
+
+    @abstractmethod
+    def save_tool_outputs(self, run_id: str, tool_calls: List, tool_outputs: List[Dict]):
+        """Saves the tool calls of a run with their outputs."""
+
+    @abstractmethod
+    def get_tool_outputs(self, run_id: str) -> List[Dict]:
+        """Returns the stored tool calls of a run with their outputs."""
+
+    def flush(self):
+        """Waits until all pending writes are stored."""
+
+    def close(self):
+        """Stores pending writes and releases the resources of the store."""
+
+    def threads_callbacks(self, session_id: str = "default") -> Dict:
+        """
+        Returns `threads_callbacks` that load and save the thread ids of a session in this store.
+
+        Parameters:
+            session_id (str, optional): The id of the session, for example the id of the user. Defaults to "default".
+
+        Returns:
+            ThreadsCallbacks: A dictionary with "load" and "save" functions, and this store under the "store" key.
+        """
+        return {
+            "load": lambda: self.load_thread_ids(session_id),
+            "save": lambda thread_ids: self.save_thread_ids(session_id, thread_ids),
+            "store": self,
+        }
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class SQLiteConversationStore(ConversationStore):
+    """
+    Conversation store in a SQLite database in WAL mode.
+
+    Writes are queued and stored by a background writer thread, which commits up to `batch_size` writes in one
+    transaction, so threads never wait for the disk. Reads first wait for the pending writes of the same session,
+    thread or run, not for the writes of other conversations. WAL mode lets readers
+    in other threads and processes read while the writer commits, so many sessions can share one database.
+    """
+
+    schema = """
+        CREATE TABLE IF NOT EXISTS thread_ids (
+            session_id TEXT NOT NULL,
+            agent TEXT NOT NULL,
+            recipient_agent TEXT NOT NULL,
+            thread_id TEXT,
+            PRIMARY KEY (session_id, agent, recipient_agent)
+        );
+        CREATE TABLE IF NOT EXISTS messages (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            id TEXT NOT NULL UNIQUE,
+            thread_id TEXT NOT NULL,
+            role TEXT,
+            run_id TEXT,
+            assistant_id TEXT,
+            created_at INTEGER,
+            data TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS messages_thread_id ON messages (thread_id, seq);
+        CREATE TABLE IF NOT EXISTS runs (
+            id TEXT PRIMARY KEY,
+            thread_id TEXT NOT NULL,
+            assistant_id TEXT,
+            status TEXT,
+            created_at INTEGER,
+            completed_at INTEGER,
+            last_error TEXT,
+            updated_at REAL
+        );
+        CREATE INDEX IF NOT EXISTS runs_thread_id ON runs (thread_id, created_at);
+        CREATE TABLE IF NOT EXISTS tool_outputs (
+            tool_call_id TEXT NOT NULL,
+            run_id TEXT NOT NULL,
+            name TEXT,
+            arguments TEXT,
+            output TEXT,
+            PRIMARY KEY (run_id, tool_call_id)
+        );
+    """
+
+    # session thread ids of the main thread are stored with this agent name
+    main_thread_key = "main_thread"
+
+    def __init__(self, path: str = "./conversations.db", batch_size: int = 500):
+        """
+        Parameters:
+            path (str, optional): The path to the database file. Defaults to "./conversations.db".
+            batch_size (int, optional): Maximum number of writes committed in one transaction. Defaults to 500.
+        """
+        self.path = path
+        self.batch_size = batch_size
+
+        self._local = threading.local()
+        self._queue = queue.Queue()
+        # number of queued writes of each session, thread and run, which reads of that key wait for
+        self._pending: Counter = Counter()
+        self._pending_changed = threading.Condition()
+        self._closed = False
+        self._error = None
+
+        folder = os.path.dirname(os.path.abspath(path))
+        os.makedirs(folder, exist_ok=True)
+        connection = self._connect()
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.executescript(self.schema)
+        connection.close()
+
+        self._writer = threading.Thread(target=self._write_loop, name="agency-swarm-conversation-store", daemon=True)
+        self._writer.start()
+
+    def load_thread_ids(self, session_id: str) -> Dict:
+        thread_ids = {}
+        for agent, recipient_agent, thread_id in self._read(
+                "SELECT agent, recipient_agent, thread_id FROM thread_ids WHERE session_id = ?", (session_id,),
+                ("session", session_id)):
+            if agent == self.main_thread_key:
+                thread_ids[agent] = thread_id
+            else:
+                thread_ids.setdefault(agent, {})[recipient_agent] = thread_id
+        return thread_ids
+
+    def save_thread_ids(self, session_id: str, thread_ids: Dict):
+        rows = []
+        for agent, threads in thread_ids.items():
+            if isinstance(threads, dict):
+                rows += [(session_id, agent, recipient_agent, thread_id) for recipient_agent, thread_id in threads.items()]
+            else:
+                rows.append((session_id, agent, "", threads))
+        self._write("INSERT OR REPLACE INTO thread_ids VALUES (?, ?, ?, ?)", rows, ("session", session_id))
+
+    def add_messages(self, thread_id: str, messages: List[ThreadMessage]):
+        rows = [(message.id, thread_id, message.role, message.run_id, message.assistant_id, message.created_at,
+                 message.model_dump_json()) for message in messages]
+        self._write("INSERT OR IGNORE INTO messages (id, thread_id, role, run_id, assistant_id, created_at, data) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)", rows, ("thread", thread_id))
+
+    def get_messages(self, thread_id: str) -> List[ThreadMessage]:
+        rows = self._read("SELECT data FROM messages WHERE thread_id = ? ORDER BY seq", (thread_id,),
+                          ("thread", thread_id))
+        return [ThreadMessage.model_validate_json(data) for data, in rows]
+
+    def save_run(self, run):
+        last_error = run.last_error.message if run.last_error else None
+        self._write("INSERT OR REPLACE INTO runs VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    [(run.id, run.thread_id, run.assistant_id, run.status, run.created_at, run.completed_at,
+                      last_error, time.time())], ("thread", run.thread_id))
+
+    def get_runs(self, thread_id: str) -> List[Dict]:
+        rows = self._read("SELECT id, thread_id, assistant_id, status, created_at, completed_at, last_error, "
+                          "updated_at FROM runs WHERE thread_id = ? ORDER BY created_at, rowid", (thread_id,),
+                          ("thread", thread_id))
+        keys = ("id", "thread_id", "assistant_id", "status", "created_at", "completed_at", "last_error", "updated_at")
+        return [dict(zip(keys, row)) for row in rows]
+
+    def save_tool_outputs(self, run_id: str, tool_calls: List, tool_outputs: List[Dict]):
+        rows = [(tool_output["tool_call_id"], run_id, tool_call.function.name, tool_call.function.arguments,
+                 tool_output["output"]) for tool_call, tool_output in zip(tool_calls, tool_outputs)]
+        self._write("INSERT OR REPLACE INTO tool_outputs VALUES (?, ?, ?, ?, ?)", rows, ("run", run_id))
+
+    def get_tool_outputs(self, run_id: str) -> List[Dict]:
+        rows = self._read("SELECT tool_call_id, name, arguments, output FROM tool_outputs WHERE run_id = ? "
+                          "ORDER BY rowid", (run_id,), ("run", run_id))
+        return [{"tool_call_id": tool_call_id, "name": name, "arguments": arguments, "output": output}
+                for tool_call_id, name, arguments, output in rows]
+
+    def flush(self):
+        if self._writer.is_alive():
+            self._queue.join()
+        self._raise_write_error()
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._writer.join()
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+    # --- helpers ---
+
+    def _connect(self):
+        connection = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    def _write(self, sql, rows, key: Tuple[str, str]):
+        if self._closed:
+            raise Exception("The conversation store is closed.")
+        if rows:
+            with self._pending_changed:
+                self._pending[key] += 1
+            self._queue.put((sql, rows, key))
+
+    def _read(self, sql, params, key: Tuple[str, str]):
+        # read your own writes of the same session, thread or run
+        with self._pending_changed:
+            self._pending_changed.wait_for(lambda: not self._pending[key] or not self._writer.is_alive())
+        self._raise_write_error()
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = self._local.connection = self._connect()
+        return connection.execute(sql, params).fetchall()
+
+    def _write_loop(self):
+        connection = self._connect()
+        stopped = False
+        while not stopped:
+            batch = [self._queue.get()]
+            # collect the writes queued in the meantime into the same transaction
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            try:
+                with connection:
+                    for item in batch:
+                        if item is None:
+                            stopped = True
+                            continue
+                        connection.executemany(*item[:2])
+            except Exception as e:
+                self._error = e
+                print(f"Error writing to the conversation store {self.path}: {e}")
+            finally:
+                with self._pending_changed:
+                    for item in batch:
+                        if item is not None:
+                            self._pending[item[2]] -= 1
+                            if not self._pending[item[2]]:
+                                del self._pending[item[2]]
+                    self._pending_changed.notify_all()
+                for _ in batch:
+                    self._queue.task_done()
+        connection.close()
+
+    def _raise_write_error(self):
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise Exception(f"Failed to write to the conversation store {self.path}: {error}")
@@ -0,0 +1,207 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Dict, List
+
+import openai
+
+from agency_swarm.util.oai import get_openai_client
+
+MANIFEST_FILE_NAME = ".uploaded_files.json"
+
+RETRYABLE_ERRORS = (openai.APIConnectionError, openai.APITimeoutError, openai.RateLimitError,
+                    openai.InternalServerError)
+
+
+class FileUploader:
+    """
+    Content-addressed uploader of agent files.
+
+    Files are identified by the SHA-256 hash of their content. Each folder keeps a manifest of uploaded files,
+    mapping content hashes to file ids, in a hidden `.uploaded_files.json` file, so file names are never changed.
+    Identical files are uploaded once per uploader, even if they are shared by multiple agents or folders. Uploads
+    run in a bounded thread pool and are retried with exponential backoff on connection, timeout, rate limit and
+    server errors.
+    """
+
+    def __init__(self, client=None, max_workers: int = 4, max_retries: int = 3, backoff: float = 1.0,
+                 timeout: float = 120):
+        """
+        Parameters:
+            client (OpenAI, optional): The OpenAI client used for uploads. Defaults to the global client.
+            max_workers (int, optional): Maximum number of concurrent uploads. Defaults to 4.
+            max_retries (int, optional): Maximum number of retries of a failed upload. Defaults to 3.
+            backoff (float, optional): Delay in seconds before the first retry, doubled on every retry. Defaults to 1.0.
+            timeout (float, optional): Timeout of each upload request in seconds. Defaults to 120.
+        """
+        self.client = client if client else get_openai_client()
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+
+        self._lock = threading.Lock()
+        self._uploads: Dict[str, Future] = {}
+        self._manifest_locks: Dict[str, threading.Lock] = {}
+        self._executor = None
+
+    def upload_folder(self, folder: str) -> List[str]:
+        """
+        Uploads all files of a folder that were not uploaded before.
+
+        Parameters:
+            folder (str): Path to the folder.
+
+        Returns:
+            List[str]: The file ids of all files in the folder, in the order of the file names.
+        """
+        f_paths = sorted(os.path.join(folder, f) for f in os.listdir(folder) if not f.startswith("."))
+        f_paths = [f_path for f_path in f_paths if os.path.isfile(f_path)]
+
+        manifest_lock = self._get_manifest_lock(folder)
+        with manifest_lock:
+            manifest = self._read_manifest(folder)
+
+        futures = []
+        for f_path in f_paths:
+            file_hash = hash_file(f_path)
+            entry = manifest.get(file_hash)
+            if entry:
+                print("File already uploaded. Skipping... " + os.path.basename(f_path))
+                futures.append((f_path, file_hash, self._resolved(entry["file_id"])))
+                continue
+
+            legacy_file_id = get_id_from_file_name(f_path)
+            if legacy_file_id:
+                # file was uploaded and renamed by an earlier version
+                print("File already uploaded. Skipping... " + os.path.basename(f_path))
+                futures.append((f_path, file_hash, self._resolved(legacy_file_id)))
+                continue
+
+            futures.append((f_path, file_hash, self._upload(f_path, file_hash)))
+
+        file_ids = []
+        errors = []
+        changed = False
+        for f_path, file_hash, future in futures:
+            try:
+                file_id = future.result()
+            except Exception as e:
+                errors.append(e)
+                continue
+            file_ids.append(file_id)
+            if manifest.get(file_hash, {}).get("file_id") != file_id:
+                manifest[file_hash] = {"file_id": file_id, "file_name": os.path.basename(f_path)}
+                changed = True
+
+        # save the files uploaded so far, even if some uploads failed
+        if changed:
+            with manifest_lock:
+                latest = self._read_manifest(folder)
+                latest.update(manifest)
+                self._write_manifest(folder, latest)
+
+        if errors:
+            raise errors[0]
+
+        return file_ids
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+
+    def _upload(self, f_path, file_hash):
+        with self._lock:
+            # identical content is uploaded only once, even if the upload is still in progress
+            future = self._uploads.get(file_hash)
+            if future is None or (future.done() and future.exception()):
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                        thread_name_prefix="agency-swarm-upload")
+                future = self._executor.submit(self._upload_with_retry, f_path)
+                self._uploads[file_hash] = future
+        return future
+
+    def _upload_with_retry(self, f_path):
+        print("Uploading new file... " + os.path.basename(f_path))
+        delay = self.backoff
+        for attempt in range(self.max_retries + 1):
+            try:
+                with open(f_path, 'rb') as f:
+                    return self.client.files.create(file=f, purpose="assistants", timeout=self.timeout).id
+            except RETRYABLE_ERRORS as e:
+                if attempt == self.max_retries:
+                    raise e
+                print(f"Upload failed, retrying in {delay}s... " + os.path.basename(f_path))
+                time.sleep(delay)
+                delay *= 2
+
+    def _resolved(self, file_id):
+        future = Future()
+        future.set_result(file_id)
+        return future
+
+    def _get_manifest_lock(self, folder):
+        with self._lock:
+            return self._manifest_locks.setdefault(os.path.abspath(folder), threading.Lock())
+
+    @staticmethod
+    def _read_manifest(folder):
+        path = os.path.join(folder, MANIFEST_FILE_NAME)
+        if not os.path.isfile(path):
+            return {}
+        try:
+            with open(path, 'r') as f:
+                return json.load(f)
+        except ValueError:
+            print("Invalid uploaded files manifest. Ignoring... " + path)
+            return {}
+
+    @staticmethod
+    def _write_manifest(folder, manifest):
+        fd, temp_path = tempfile.mkstemp(dir=folder, prefix=".uploaded_files-", suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(manifest, f, indent=4)
+            os.replace(temp_path, os.path.join(folder, MANIFEST_FILE_NAME))
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+
+def hash_file(f_path, chunk_size=1024 * 1024):
+    """Returns the SHA-256 hex digest of the file content."""
+    sha256 = hashlib.sha256()
+    with open(f_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+def get_id_from_file_name(f_path):
+    """Returns the file id that earlier versions appended to uploaded file names, e.g. `name_file-XXXX.ext`."""
+    file_name = os.path.splitext(os.path.basename(f_path))[0].split("_")
+    if len(file_name) > 1 and "file-" in file_name[-1]:
+        return file_name[-1]
+    return None
+
+
+_uploader_lock = threading.Lock()
+_uploader = None
+
+
+def get_file_uploader():
+    """Returns the file uploader shared by all agents, bound to the current OpenAI client."""
+    global _uploader
+    client = get_openai_client()
+    with _uploader_lock:
+        if _uploader is None or _uploader.client is not client:
+            _uploader = FileUploader(client)
+        return _uploader
@@ -0,0 +1,212 @@
+import asyncio
+import random
+import threading
+import time
+import weakref
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+RETRYABLE_ERRORS = (httpx.TransportError,)
+
+# methods that can be sent again after the server may have processed them
+IDEMPOTENT_METHODS = ("GET", "HEAD", "PUT", "DELETE", "OPTIONS", "TRACE")
+
+# requests with other methods, like POST and PATCH, are only retried if the server did not process them
+NON_IDEMPOTENT_RETRY_STATUS_CODES = (429,)
+
+NON_IDEMPOTENT_RETRYABLE_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout)
+
+
+class HttpClient:
+    """
+    Pooled HTTP client shared by tools that call external APIs, like the tools created with
+    `ToolFactory.from_openapi_schema`.
+
+    Connections are kept alive and reused between requests, with a limit on the total number of connections and on
+    the number of concurrent requests per host. Requests are retried with exponential backoff on connection errors,
+    timeouts and 429/5xx responses, honoring the `Retry-After` header. Requests with non-idempotent methods, like
+    POST and PATCH, are only retried on 429 responses and on errors while connecting. The async methods use a separate
+    `httpx.AsyncClient` for each event loop.
+    """
+
+    def __init__(self, timeout: float = 30, connect_timeout: float = 5, max_connections: int = 100,
+                 max_connections_per_host: int = 10, keepalive_expiry: float = 30, max_retries: int = 3,
+                 backoff: float = 0.5, max_backoff: float = 10):
+        """
+        Parameters:
+            timeout (float, optional): Timeout of reading a response, writing a request and waiting for a pooled
+                connection in seconds. Defaults to 30.
+            connect_timeout (float, optional): Timeout of establishing a connection in seconds. Defaults to 5.
+            max_connections (int, optional): Maximum number of open connections. Defaults to 100.
+            max_connections_per_host (int, optional): Maximum number of concurrent requests per host. Defaults to 10.
+            keepalive_expiry (float, optional): Time in seconds after which idle connections are closed.
+                Defaults to 30.
+            max_retries (int, optional): Maximum number of retries of a failed request. Defaults to 3.
+            backoff (float, optional): Delay in seconds before the first retry, doubled on every retry.
+                Defaults to 0.5.
+            max_backoff (float, optional): Maximum delay between retries in seconds. Defaults to 10.
+        """
+        self.timeout = httpx.Timeout(timeout, connect=connect_timeout)
+        self.limits = httpx.Limits(max_connections=max_connections,
+                                   max_keepalive_connections=max_connections,
+                                   keepalive_expiry=keepalive_expiry)
+        self.max_connections_per_host = max_connections_per_host
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+
+        self._lock = threading.Lock()
+        self._client = None
+        self._host_semaphores: Dict[str, threading.BoundedSemaphore] = {}
+        # event loop -> (httpx.AsyncClient, {host: asyncio.Semaphore})
+        self._async_clients = weakref.WeakKeyDictionary()
+
+    @property
+    def client(self) -> httpx.Client:
+        with self._lock:
+            if self._client is None:
+                self._client = httpx.Client(timeout=self.timeout, limits=self.limits)
+            return self._client
+
+    def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """
+        Sends a request, retrying it on connection errors, timeouts and retryable status codes. Requests with
+        non-idempotent methods are only retried if the server did not process them.
+
+        Parameters:
+            method (str): The HTTP method.
+            url (str): The URL.
+            **kwargs: Arguments of `httpx.Client.request`, like `params`, `json` or `headers`.
+
+        Returns:
+            httpx.Response: The response. If all retries failed with a retryable status code, the last response.
+        """
+        semaphore = self._get_host_semaphore(url)
+        retryable_errors, retry_status_codes = self._get_retry_policy(method)
+        for attempt in range(self.max_retries + 1):
+            try:
+                with semaphore:
+                    response = self.client.request(method, url, **kwargs)
+            except retryable_errors as e:
+                if attempt == self.max_retries:
+                    raise e
+                time.sleep(self._get_delay(attempt))
+                continue
+
+            if response.status_code not in retry_status_codes or attempt == self.max_retries:
+                return response
+            response.close()
+            time.sleep(self._get_delay(attempt, response))
+
+    async def arequest(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """
+        Sends a request on the running event loop, retrying it like `request`.
+
+        Parameters:
+            method (str): The HTTP method.
+            url (str): The URL.
+            **kwargs: Arguments of `httpx.AsyncClient.request`, like `params`, `json` or `headers`.
+
+        Returns:
+            httpx.Response: The response. If all retries failed with a retryable status code, the last response.
+        """
+        client, semaphores = self._get_async_client()
+        host = self._get_host(url)
+        if host not in semaphores:
+            semaphores[host] = asyncio.Semaphore(self.max_connections_per_host)
+        semaphore = semaphores[host]
+
+        retryable_errors, retry_status_codes = self._get_retry_policy(method)
+        for attempt in range(self.max_retries + 1):
+            try:
+                async with semaphore:
+                    response = await client.request(method, url, **kwargs)
+            except retryable_errors as e:
+                if attempt == self.max_retries:
+                    raise e
+                await asyncio.sleep(self._get_delay(attempt))
+                continue
+
+            if response.status_code not in retry_status_codes or attempt == self.max_retries:
+                return response
+            await response.aclose()
+            await asyncio.sleep(self._get_delay(attempt, response))
+
+    def close(self):
+        """Closes the sync client. Async clients are closed with `aclose` on their event loop."""
+        with self._lock:
+            if self._client is not None:
+                self._client.close()
+                self._client = None
+
+    async def aclose(self):
+        """Closes the async client of the running event loop."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            entry = self._async_clients.pop(loop, None)
+        if entry is not None:
+            await entry[0].aclose()
+
+    def _get_async_client(self):
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            entry = self._async_clients.get(loop)
+            if entry is None:
+                entry = (httpx.AsyncClient(timeout=self.timeout, limits=self.limits), {})
+                self._async_clients[loop] = entry
+            return entry
+
+    def _get_host_semaphore(self, url):
+        host = self._get_host(url)
+        with self._lock:
+            if host not in self._host_semaphores:
+                self._host_semaphores[host] = threading.BoundedSemaphore(self.max_connections_per_host)
+            return self._host_semaphores[host]
+
+    @staticmethod
+    def _get_retry_policy(method):
+        """Returns the errors and the status codes on which a request with the given method is retried."""
+        if method.upper() in IDEMPOTENT_METHODS:
+            return RETRYABLE_ERRORS, RETRY_STATUS_CODES
+        return NON_IDEMPOTENT_RETRYABLE_ERRORS, NON_IDEMPOTENT_RETRY_STATUS_CODES
+
+    @staticmethod
+    def _get_host(url):
+        parts = urlsplit(str(url))
+        return f"{parts.scheme}://{parts.netloc}"
+
+    def _get_delay(self, attempt, response: Optional[httpx.Response] = None):
+        if response is not None:
+            retry_after = response.headers.get("retry-after")
+            if retry_after:
+                try:
+                    return min(float(retry_after), self.max_backoff)
+                except ValueError:
+                    pass
+        delay = min(self.backoff * 2 ** attempt, self.max_backoff)
+        # jitter spreads the retries of concurrent requests
+        return delay * (0.5 + random.random() / 2)
+
+
+_http_client_lock = threading.Lock()
+_http_client = None
+
+
+def get_http_client() -> HttpClient:
+    """Returns the HTTP client shared by all tools."""
+    global _http_client
+    with _http_client_lock:
+        if _http_client is None:
+            _http_client = HttpClient()
+        return _http_client
+
+
+def set_http_client(new_client: HttpClient):
+    """Sets the HTTP client shared by all tools, for example to change its timeouts or connection limits."""
+    global _http_client
+    with _http_client_lock:
+        _http_client = new_client
@@ -0,0 +1,243 @@
+import json
+import math
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, List, Sequence, Tuple
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+# (type, name, description, labels, buckets) of the metrics recorded by agency swarm
+BUILTIN_METRICS = (
+    ("histogram", "agency_swarm_completion_seconds", "Duration of a completion between two agents (one hop).",
+     ("agent",), DEFAULT_BUCKETS),
+    ("histogram", "agency_swarm_completion_api_calls", "Number of OpenAI API calls made by one completion.",
+     ("agent",), COUNT_BUCKETS),
+    ("counter", "agency_swarm_api_calls_total", "OpenAI API calls by endpoint.", ("endpoint",), None),
+    ("histogram", "agency_swarm_run_create_seconds", "Time until a created run is returned by the API.",
+     (), DEFAULT_BUCKETS),
+    ("histogram", "agency_swarm_run_status_seconds", "Time runs spend in the queued and in_progress statuses.",
+     ("status",), DEFAULT_BUCKETS),
+    ("histogram", "agency_swarm_submit_tool_outputs_seconds", "Time until submitted tool outputs are accepted.",
+     (), DEFAULT_BUCKETS),
+    ("counter", "agency_swarm_run_retries_total", "Runs retried after they failed or expired.", ("reason",), None),
+    ("histogram", "agency_swarm_tool_seconds", "Duration of tool executions by tool class.", ("tool",),
+     DEFAULT_BUCKETS),
+    ("counter", "agency_swarm_tool_errors_total", "Tool executions that raised an error by tool class.", ("tool",),
+     None),
+)
+
+
+class Counter:
+    """Monotonic counter with optional labels."""
+    type = "counter"
+
+    def __init__(self, name: str, description: str = "", labels: Sequence[str] = ()):
+        self.name = name
+        self.description = description
+        self.labels = tuple(labels)
+        self._values: Dict[Tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(labels.get(label, "") for label in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def get(self, **labels) -> float:
+        key = tuple(labels.get(label, "") for label in self.labels)
+        with self._lock:
+            return self._values.get(key, 0)
+
+    def reset(self):
+        with self._lock:
+            self._values = {}
+
+    def snapshot(self) -> List[Dict]:
+        with self._lock:
+            return [{"labels": dict(zip(self.labels, key)), "value": value} for key, value in self._values.items()]
+
+
+class Histogram:
+    """Histogram of observed values in cumulative buckets, with their count and sum, and optional labels."""
+    type = "histogram"
+
+    def __init__(self, name: str, description: str = "", labels: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.description = description
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [counts per bucket (the last one is +Inf), count, sum]
+        self._values: Dict[Tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(labels.get(label, "") for label in self.labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            values = self._values.get(key)
+            if values is None:
+                values = self._values[key] = [[0] * (len(self.buckets) + 1), 0, 0.0]
+            values[0][index] += 1
+            values[1] += 1
+            values[2] += value
+
+    @contextmanager
+    def time(self, **labels):
+        """Observes the duration of the block in seconds."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def reset(self):
+        with self._lock:
+            self._values = {}
+
+    def snapshot(self) -> List[Dict]:
+        with self._lock:
+            values = [(key, list(counts), count, total) for key, (counts, count, total) in self._values.items()]
+
+        result = []
+        for key, counts, count, total in values:
+            cumulative = 0
+            buckets = {}
+            for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+                cumulative += bucket_count
+                buckets[_format_number(bound)] = cumulative
+            result.append({"labels": dict(zip(self.labels, key)), "count": count, "sum": total,
+                           "buckets": buckets})
+        return result
+
+
+class MetricsRegistry:
+    """
+    Registry of the counters and histograms of agency swarm.
+
+    Threads, run engines and tool executors record API calls, run creation and submit latencies, time spent in each
+    run status, retries and tool durations into the shared registry returned by `get_metrics_registry`. The metrics
+    can be read with `snapshot`, or exported with `to_json` and `to_prometheus`. Recording takes a dictionary lookup
+    and a short lock, and can be turned off with `enabled = False`.
+    """
+
+    def __init__(self, enabled: bool = True):
+        """
+        Parameters:
+            enabled (bool, optional): Record metrics. Defaults to True.
+        """
+        self.enabled = enabled
+        self._metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+        for metric_type, name, description, labels, buckets in BUILTIN_METRICS:
+            if metric_type == "counter":
+                self.counter(name, description, labels)
+            else:
+                self.histogram(name, description, labels, buckets)
+
+    def counter(self, name: str, description: str = "", labels: Sequence[str] = ()) -> Counter:
+        """Returns the counter with the given name, creating it if it does not exist."""
+        return self._get_or_create(Counter, name, description, labels)
+
+    def histogram(self, name: str, description: str = "", labels: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        """Returns the histogram with the given name, creating it if it does not exist."""
+        return self._get_or_create(Histogram, name, description, labels, buckets)
+
+    def inc(self, name: str, amount: float = 1, **labels):
+        """Increments a registered counter, if metrics are enabled."""
+        if self.enabled:
+            self._metrics[name].inc(amount, **labels)
+
+    def observe(self, name: str, value: float, **labels):
+        """Observes a value of a registered histogram, if metrics are enabled."""
+        if self.enabled:
+            self._metrics[name].observe(value, **labels)
+
+    def reset(self):
+        """Resets the values of all metrics."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            metric.reset()
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """
+        Returns the current values of all metrics.
+
+        Returns:
+            Dict[str, Dict]: The type, description and values of each metric by name. Counter values have `labels` and
+                `value`; histogram values have `labels`, `count`, `sum` and cumulative `buckets` by upper bound.
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return {metric.name: {"type": metric.type, "description": metric.description, "values": metric.snapshot()}
+                for metric in metrics}
+
+    def to_json(self, indent: int = None) -> str:
+        """Exports all metrics as JSON, in the format of `snapshot`."""
+        return json.dumps(self.snapshot(), indent=indent)
+
+    def to_prometheus(self) -> str:
+        """Exports all metrics in the Prometheus text exposition format."""
+        lines = []
+        for name, metric in self.snapshot().items():
+            lines.append(f"# HELP {name} {metric['description']}")
+            lines.append(f"# TYPE {name} {metric['type']}")
+            for value in metric["values"]:
+                labels = value["labels"]
+                if metric["type"] == "counter":
+                    lines.append(f"{name}{_format_labels(labels)} {_format_number(value['value'])}")
+                    continue
+                for bound, count in value["buckets"].items():
+                    lines.append(f"{name}_bucket{_format_labels(labels, le=bound)} {count}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {_format_number(value['sum'])}")
+                lines.append(f"{name}_count{_format_labels(labels)} {value['count']}")
+        return "\n".join(lines) + "\n"
+
+    def _get_or_create(self, cls, name, description, labels, *args):
+        metric = self._metrics.get(name)
+        if metric is None:
+            with self._lock:
+                metric = self._metrics.get(name)
+                if metric is None:
+                    metric = self._metrics[name] = cls(name, description, labels, *args)
+        if not isinstance(metric, cls):
+            raise Exception(f"Metric {name} is already registered as a {metric.type}.")
+        return metric
+
+
+def _format_number(value) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(labels: Dict, **extra) -> str:
+    labels = {**labels, **extra}
+    if not labels:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+               for value in labels.values())
+    return "{" + ",".join(f'{label}="{value}"' for label, value in zip(labels, escaped)) + "}"
+
+
+_metrics_registry = MetricsRegistry()
+
+
+def get_metrics_registry() -> MetricsRegistry:
+    """Returns the metrics registry shared by all agencies."""
+    return _metrics_registry
+
+
+def set_metrics_registry(registry: MetricsRegistry):
+    """Sets the metrics registry shared by all agencies, for example to record the metrics of a test separately."""
+    global _metrics_registry
+    _metrics_registry = registry
@@ -9,6 +9,7 @@ load_dotenv()
 
 client_lock = threading.Lock()
 client = None
+async_client = None
 
 
 def get_openai_client():
@@ -25,16 +26,42 @@ def get_openai_client():
     return client
 
 
+def get_async_openai_client():
+    """Returns the AsyncOpenAI client, derived from the sync client settings if it was not set explicitly."""
+    global async_client
+    sync_client = get_openai_client()
+    with client_lock:
+        if async_client is None:
+            if isinstance(sync_client, openai.AzureOpenAI):
+                raise ValueError("Please set the async Azure OpenAI client using set_async_openai_client.")
+            async_client = openai.AsyncOpenAI(api_key=sync_client.api_key,
+                                              organization=sync_client.organization,
+                                              base_url=sync_client.base_url,
+                                              timeout=sync_client.timeout,
+                                              max_retries=sync_client.max_retries,
+                                              default_headers=sync_client._custom_headers,
+                                              default_query=sync_client._custom_query)
+    return async_client
+
+
 def set_openai_client(new_client):
-    global client
+    global client, async_client
     with client_lock:
         client = instructor.patch(new_client)
+        async_client = None
+
+
+def set_async_openai_client(new_client):
+    global async_client
+    with client_lock:
+        async_client = new_client
 
 
 def set_openai_key(key):
     if not key:
         raise ValueError("Invalid API key. The API key cannot be empty.")
     openai.api_key = key
-    global client
+    global client, async_client
     with client_lock:
         client = None
+        async_client = None
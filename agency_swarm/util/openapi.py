@@ -1,4 +1,15 @@
+import hashlib
 import json
+import os
+import tempfile
+from typing import Any, Dict, List, Optional, Union
+
+import jsonref
+
+# bump when the format of parsed operations changes
+OPENAPI_CACHE_VERSION = 2
+
+HTTP_METHODS = ("get", "put", "post", "delete", "options", "head", "patch", "trace")
 
 
 def validate_openapi_spec(spec: str):
@@ -23,4 +34,145 @@ def validate_openapi_spec(spec: str):
     # Perform any additional basic validation as needed
 
     # If the function reaches this point, the spec has passed basic validation
-    return spec
\ No newline at end of file
+    return spec
+
+
+def get_openapi_cache_dir():
+    """Returns the default folder of the parsed OpenAPI operations cache."""
+    cache_dir = os.getenv("AGENCY_SWARM_CACHE_DIR") or os.path.join(os.path.expanduser("~"), ".cache",
+                                                                      "agency_swarm")
+    return os.path.join(cache_dir, "openapi")
+
+
+def get_openapi_operations(schema: Union[str, dict],
+                           cache_dir: Optional[Union[str, bool]] = None) -> List[Dict[str, Any]]:
+    """
+    Returns the operations of an OpenAPI schema, each with its URL, HTTP method and OpenAI function schema.
+
+    Parsed operations are cached on disk by the hash of the schema, so parsing the same schema again, for example
+    after a restart, does not resolve the references again. Remote references are not part of the hash.
+
+    Parameters:
+        schema: The OpenAPI schema, as a JSON string or a dict.
+        cache_dir: Folder of the cache. True for the default folder `~/.cache/agency_swarm/openapi`, which can be
+            changed with the `AGENCY_SWARM_CACHE_DIR` environment variable. False to disable the cache. Defaults to
+            None, which caches in the `openapi` folder of `AGENCY_SWARM_CACHE_DIR` only if the variable is set.
+
+    Returns:
+        A list of operations with "url", "method" and "function" keys.
+    """
+    if cache_dir is None:
+        cache_dir = bool(os.getenv("AGENCY_SWARM_CACHE_DIR"))
+    if cache_dir is False:
+        return parse_openapi_operations(schema)
+
+    cache_dir = get_openapi_cache_dir() if cache_dir is True else cache_dir
+    cache_path = os.path.join(cache_dir, get_openapi_schema_hash(schema) + ".json")
+    try:
+        with open(cache_path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        pass
+
+    operations = parse_openapi_operations(schema)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=cache_dir, prefix=".openapi-", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(operations, f)
+            os.replace(temp_path, cache_path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+    except OSError as e:
+        print(f"Could not cache parsed OpenAPI schema: {e}")
+    return operations
+
+
+def get_openapi_schema_hash(schema: Union[str, dict]) -> str:
+    """Returns the SHA-256 hex digest of an OpenAPI schema and the cache format version."""
+    if not isinstance(schema, str):
+        schema = json.dumps(schema, sort_keys=True, default=str)
+    return hashlib.sha256(f"{OPENAPI_CACHE_VERSION}:{schema}".encode()).hexdigest()
+
+
+def parse_openapi_operations(schema: Union[str, dict]) -> List[Dict[str, Any]]:
+    """
+    Parses the operations of an OpenAPI schema into plain JSON, see `get_openapi_operations`.
+
+    Only the parts of an operation used by its function schema are resolved, and each referenced component is
+    converted once for all operations.
+    """
+    if isinstance(schema, dict):
+        openapi_spec = jsonref.JsonRef.replace_refs(schema)
+    else:
+        openapi_spec = jsonref.loads(schema)
+
+    to_json = _JsonConverter()
+    server_url = openapi_spec["servers"][0]["url"]
+    operations = []
+    for path, methods in openapi_spec["paths"].items():
+        for method, operation in methods.items():
+            if method not in HTTP_METHODS:
+                # path level parameters, summary, servers, ...
+                continue
+            operations.append({
+                "url": server_url + path,
+                "method": method,
+                "function": _get_function_schema(operation, to_json),
+            })
+    return operations
+
+
+def _get_function_schema(operation, to_json):
+    schema = {"type": "object", "properties": {}}
+
+    req_body_schema = operation.get("requestBody", {}).get("content", {}).get("application/json", {}).get("schema")
+    if req_body_schema:
+        schema["properties"]["requestBody"] = to_json(req_body_schema)
+
+    spec_params = operation.get("parameters", [])
+    if spec_params:
+        param_properties = {}
+        for param in spec_params:
+            if "schema" in param:
+                param_schema = dict(to_json(param["schema"]))
+            else:
+                param_schema = {"type": param["type"]} if "type" in param else {}
+            if "description" in param:
+                param_schema["description"] = param["description"]
+            if "required" in param:
+                param_schema["required"] = param["required"]
+            if "example" in param:
+                param_schema["example"] = to_json(param["example"])
+            param_properties[param["name"]] = param_schema
+        schema["properties"]["parameters"] = {"type": "object", "properties": param_properties}
+
+    return {
+        "name": operation.get("operationId"),
+        "description": operation.get("description") or operation.get("summary", ""),
+        "parameters": schema,
+    }
+
+
+class _JsonConverter:
+    """Converts resolved JSON references into plain JSON, converting each referenced object once."""
+
+    def __init__(self):
+        self.converted = {}
+
+    def __call__(self, node, _path=()):
+        if isinstance(node, jsonref.JsonRef):
+            subject = node.__subject__
+            key = id(subject)
+            if key in _path:
+                raise ValueError(f"Recursive reference {node.__reference__.get('$ref')} is not supported.")
+            if key not in self.converted:
+                self.converted[key] = self(subject, _path + (key,))
+            return self.converted[key]
+        if isinstance(node, dict):
+            return {k: self(v, _path) for k, v in node.items()}
+        if isinstance(node, list):
+            return [self(v, _path) for v in node]
+        return node
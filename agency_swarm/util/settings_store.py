@@ -0,0 +1,208 @@
+import hashlib
+import json
+import os
+import stat
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+class SettingsStore:
+    """
+    In-memory store of the assistant settings of an agency.
+
+    Settings are loaded once and indexed by assistant name and id. Changes are applied in memory and written by
+    `flush`, either to the save callback, if callbacks are provided, or to the settings file. The file is written
+    atomically through a temporary file and a rename, keeping the mode of the file, while holding a file lock in the
+    temporary directory, and changes are merged into the latest file contents, so several processes can share one
+    settings file. Inside a `batch` block, all changes are
+    written once at the end of the block.
+    """
+
+    def __init__(self, path: str = "./settings.json", callbacks: Dict = None):
+        """
+        Parameters:
+            path (str, optional): The path to the settings file. Defaults to "./settings.json".
+            callbacks (SettingsCallbacks, optional): A dictionary with "load" and "save" functions that replace reading and writing the settings file. Defaults to None.
+        """
+        self.path = path
+        self.callbacks = callbacks
+
+        self._settings: List[Dict] = []
+        self._by_id: Dict[str, Dict] = {}
+        self._by_name: Dict[str, Dict] = {}
+        # assistant id -> new settings, or None if the settings were deleted
+        self._changes: Dict[str, Optional[Dict]] = {}
+        self._loaded = False
+        self._batch_depth = 0
+        self._lock = threading.RLock()
+
+    @property
+    def settings(self) -> List[Dict]:
+        """All assistant settings, in the order they were added."""
+        with self._lock:
+            self._ensure_loaded()
+            return list(self._settings)
+
+    def load(self):
+        """(Re)loads the settings from the load callback or the settings file. Unflushed changes are kept."""
+        with self._lock:
+            if self.callbacks:
+                settings = self.callbacks["load"]() or []
+            else:
+                settings = self._read_file()
+            self._settings = self._apply_changes(settings)
+            self._index()
+            self._loaded = True
+
+    def get_by_name(self, name: str) -> Optional[Dict]:
+        with self._lock:
+            self._ensure_loaded()
+            return self._by_name.get(name)
+
+    def get_by_id(self, assistant_id: str) -> Optional[Dict]:
+        with self._lock:
+            self._ensure_loaded()
+            return self._by_id.get(assistant_id)
+
+    def upsert(self, assistant_settings: Dict):
+        """Adds the settings of an assistant, or replaces the settings with the same id."""
+        with self._lock:
+            self._ensure_loaded()
+            self._changes[assistant_settings["id"]] = assistant_settings
+            self._settings = self._apply_changes(self._settings, {assistant_settings["id"]: assistant_settings})
+            self._index()
+            self._flush_if_not_batched()
+
+    def delete(self, assistant_id: str):
+        """Removes the settings of an assistant."""
+        with self._lock:
+            self._ensure_loaded()
+            self._changes[assistant_id] = None
+            self._settings = self._apply_changes(self._settings, {assistant_id: None})
+            self._index()
+            self._flush_if_not_batched()
+
+    @contextmanager
+    def batch(self):
+        """Defers writing the changes made inside the block until the block exits, even if it raises."""
+        with self._lock:
+            self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._batch_depth -= 1
+                self._flush_if_not_batched()
+
+    def flush(self):
+        """Writes pending changes to the save callback or the settings file."""
+        with self._lock:
+            if not self._changes:
+                return
+
+            if self.callbacks:
+                self.callbacks["save"](list(self._settings))
+            else:
+                with self._file_lock():
+                    # merge into the latest file contents, which other processes may have changed
+                    self._settings = self._apply_changes(self._read_file())
+                    self._write_file(self._settings)
+                self._index()
+
+            self._changes = {}
+
+    # --- helpers ---
+
+    def _ensure_loaded(self):
+        if not self._loaded:
+            self.load()
+
+    def _flush_if_not_batched(self):
+        if self._batch_depth == 0:
+            self.flush()
+
+    def _apply_changes(self, settings, changes=None):
+        changes = self._changes if changes is None else changes
+        if not changes:
+            return list(settings)
+
+        result = []
+        applied = set()
+        for assistant_settings in settings:
+            assistant_id = assistant_settings.get("id")
+            if assistant_id in changes:
+                if assistant_id in applied:
+                    continue
+                applied.add(assistant_id)
+                if changes[assistant_id] is not None:
+                    result.append(changes[assistant_id])
+            else:
+                result.append(assistant_settings)
+
+        for assistant_id, assistant_settings in changes.items():
+            if assistant_id not in applied and assistant_settings is not None:
+                result.append(assistant_settings)
+        return result
+
+    def _index(self):
+        self._by_id = {}
+        self._by_name = {}
+        for assistant_settings in self._settings:
+            self._by_id.setdefault(assistant_settings.get("id"), assistant_settings)
+            self._by_name.setdefault(assistant_settings.get("name"), assistant_settings)
+
+    def _read_file(self):
+        if not os.path.isfile(self.path):
+            return []
+        with open(self.path, 'r') as f:
+            content = f.read()
+        return json.loads(content) if content.strip() else []
+
+    def _write_file(self, settings):
+        folder = os.path.dirname(os.path.abspath(self.path))
+        fd, temp_path = tempfile.mkstemp(dir=folder, prefix=".settings-", suffix=".json.tmp")
+        try:
+            # mkstemp creates files readable by the owner only, a new settings file gets the mode open() gives it
+            # with the umask of the process
+            if not os.path.exists(self.path):
+                os.close(os.open(self.path, os.O_WRONLY | os.O_CREAT, 0o666))
+            os.chmod(temp_path, stat.S_IMODE(os.stat(self.path).st_mode))
+            with os.fdopen(fd, 'w') as f:
+                json.dump(settings, f, indent=4)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.path)
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    def _get_lock_path(self):
+        # the lock file is never removed, which would let two processes lock different files, so it is kept out of
+        # the project folder
+        path_hash = hashlib.sha1(os.path.realpath(self.path).encode()).hexdigest()[:16]
+        return os.path.join(tempfile.gettempdir(), f"agency_swarm_settings_{path_hash}.lock")
+
+    @contextmanager
+    def _file_lock(self):
+        with open(self._get_lock_path(), 'a+') as f:
+            if fcntl:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+                else:
+                    f.seek(0)
+                    msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
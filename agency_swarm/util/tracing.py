@@ -0,0 +1,372 @@
+import cProfile
+import contextvars
+import itertools
+import json
+import os
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+_current_span = contextvars.ContextVar("agency_swarm_span", default=None)
+
+
+class Span:
+    """A timed operation of a conversation, like a completion between two agents or a tool call."""
+    __slots__ = ("name", "category", "span_id", "parent_id", "start", "end", "thread_id", "thread_name",
+                 "attributes", "profile", "_previous", "_active")
+
+    def __init__(self, name: str, category: str, span_id: int, parent: Optional["Span"], attributes: Dict):
+        self.name = name
+        self.category = category
+        self.span_id = span_id
+        self.parent_id = parent.span_id if parent else None
+        self.start = time.perf_counter_ns()
+        self.end = None
+        current_thread = threading.current_thread()
+        self.thread_id = current_thread.ident
+        self.thread_name = current_thread.name
+        self.attributes = attributes
+        # cProfile.Profile of a tool call, if tools are profiled
+        self.profile = None
+        self._previous = None
+        self._active = False
+
+    @property
+    def duration(self) -> float:
+        """Duration of the span in seconds, or None if it has not ended."""
+        return (self.end - self.start) / 1e9 if self.end is not None else None
+
+    def set_attribute(self, key: str, value):
+        self.attributes[key] = value
+
+    def __repr__(self):
+        return f"<Span {self.category}:{self.name} {self.duration}s>"
+
+
+class Tracer:
+    """
+    Records the call tree of agent conversations as spans.
+
+    `Agency.get_completion`, the completions of threads and every tool call, including `SendMessage`, open a span
+    that is the child of the span active in the same context. Async mode workers and parallel tool executors inherit
+    the span that started them, so the tree follows conversations across threads. Finished spans can be exported to
+    the Chrome trace format (chrome://tracing, Perfetto) or to speedscope for flamegraphs.
+
+    Tracing is off by default and costs a single attribute check per span when off. With `profile_tools`, every tool
+    call is also profiled with cProfile, see `save_tool_profiles`.
+    """
+
+    def __init__(self, enabled: bool = False, profile_tools: bool = False, max_spans: int = 100000):
+        """
+        Parameters:
+            enabled (bool, optional): Record spans. Defaults to False.
+            profile_tools (bool, optional): Profile each tool call with cProfile. Defaults to False.
+            max_spans (int, optional): Maximum number of finished spans kept; the oldest are dropped first.
+                Defaults to 100000.
+        """
+        self.enabled = enabled
+        self.profile_tools = profile_tools
+        self.spans = deque(maxlen=max_spans)
+        self.epoch = time.perf_counter_ns()
+
+        self._ids = itertools.count(1)
+        self._local = threading.local()
+
+    def start_span(self, name: str, category: str = "", activate: bool = True, **attributes) -> Optional[Span]:
+        """
+        Starts a span as a child of the current span.
+
+        Parameters:
+            name (str): The name of the span.
+            category (str, optional): The category of the span, like "agency", "thread" or "tool".
+            activate (bool, optional): Make the span the current span until it ends. Must be False if the span ends
+                in another thread or context. Defaults to True.
+            **attributes: Attributes of the span.
+
+        Returns:
+            Span: The span, or None if tracing is disabled.
+        """
+        if not self.enabled:
+            return None
+        span = Span(name, category, next(self._ids), _current_span.get(), attributes)
+        if activate:
+            span._previous = _current_span.get()
+            span._active = True
+            _current_span.set(span)
+        return span
+
+    def end_span(self, span: Optional[Span], **attributes):
+        """Ends a span started with `start_span` and restores the span that was current before it."""
+        if span is None or span.end is not None:
+            return
+        span.end = time.perf_counter_ns()
+        span.attributes.update(attributes)
+        if span._active:
+            _current_span.set(span._previous)
+            span._previous = None
+        self.spans.append(span)
+
+    @contextmanager
+    def span(self, name: str, category: str = "", **attributes):
+        """Records the block as a span. Yields the span, or None if tracing is disabled."""
+        span = self.start_span(name, category, **attributes)
+        try:
+            yield span
+        except BaseException as e:
+            if span is not None:
+                span.set_attribute("error", repr(e))
+            raise
+        finally:
+            self.end_span(span)
+
+    def trace_generator(self, gen, name: str, category: str = "", **attributes):
+        """
+        Yields from a generator inside a span and returns its return value. The span is the current span only while
+        the generator runs, not while the caller handles the yielded items, see `resume_in_span`.
+        """
+        span = self.start_span(name, category, activate=False, **attributes)
+        if span is None:
+            return (yield from gen)
+        try:
+            return (yield from resume_in_span(gen, span))
+        except BaseException as e:
+            span.set_attribute("error", repr(e))
+            raise
+        finally:
+            self.end_span(span)
+
+    async def trace_async_generator(self, agen, name: str, category: str = "", **attributes):
+        """Async version of `trace_generator` for async generators."""
+        span = self.start_span(name, category, activate=False, **attributes)
+        if span is None:
+            async for item in agen:
+                yield item
+            return
+        resumed = aresume_in_span(agen, span)
+        try:
+            async for item in resumed:
+                yield item
+        except BaseException as e:
+            span.set_attribute("error", repr(e))
+            raise
+        finally:
+            await resumed.aclose()
+            self.end_span(span)
+
+    def start_profile(self, span: Optional[Span]) -> bool:
+        """
+        Starts profiling a tool call span with cProfile, unless a tool call of this thread is already profiled. Starting
+        the profile of a span again adds to it. Returns True if profiling started.
+        """
+        if span is None or not self.profile_tools or getattr(self._local, "profiling", False):
+            return False
+        if span.profile is None:
+            span.profile = cProfile.Profile()
+        self._local.profiling = True
+        span.profile.enable()
+        return True
+
+    def stop_profile(self, span: Optional[Span]):
+        if span is None or span.profile is None or not getattr(self._local, "profiling", False):
+            return
+        span.profile.disable()
+        self._local.profiling = False
+
+    def get_spans(self, category: str = None) -> List[Span]:
+        """Returns the finished spans, optionally only those of a category."""
+        return [span for span in list(self.spans) if category is None or span.category == category]
+
+    def clear(self):
+        self.spans.clear()
+
+    def to_chrome_trace(self) -> Dict:
+        """Returns the finished spans in the Chrome trace event format."""
+        pid = os.getpid()
+        events = []
+        thread_names = {}
+        for span in self.get_spans():
+            thread_names[span.thread_id] = span.thread_name
+            events.append({
+                "name": span.name,
+                "cat": span.category,
+                "ph": "X",
+                "ts": (span.start - self.epoch) / 1000,
+                "dur": (span.end - span.start) / 1000,
+                "pid": pid,
+                "tid": span.thread_id,
+                "args": {"span_id": span.span_id, "parent_id": span.parent_id,
+                         **{key: _to_json_value(value) for key, value in span.attributes.items()}},
+            })
+        for thread_id, thread_name in thread_names.items():
+            events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": thread_id,
+                           "args": {"name": thread_name}})
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def to_speedscope(self, name: str = "agency-swarm") -> Dict:
+        """Returns the finished spans as a speedscope file, with one evented profile per thread."""
+        frames = []
+        frame_ids = {}
+        profiles = []
+        spans_by_thread = {}
+        for span in self.get_spans():
+            spans_by_thread.setdefault((span.thread_id, span.thread_name), []).append(span)
+
+        for (thread_id, thread_name), spans in spans_by_thread.items():
+            spans.sort(key=lambda s: (s.start, s.start - s.end))
+            events = []
+            # (frame, end) of the open spans; spans of one thread nest, overlaps are clamped to the parent
+            stack = []
+            for span in spans:
+                while stack and stack[-1][1] <= span.start:
+                    frame, end = stack.pop()
+                    events.append({"type": "C", "frame": frame, "at": (end - self.epoch) / 1e6})
+                frame_key = f"{span.category}:{span.name}" if span.category else span.name
+                if frame_key not in frame_ids:
+                    frame_ids[frame_key] = len(frames)
+                    frames.append({"name": frame_key})
+                end = min(span.end, stack[-1][1]) if stack else span.end
+                events.append({"type": "O", "frame": frame_ids[frame_key], "at": (span.start - self.epoch) / 1e6})
+                stack.append((frame_ids[frame_key], end))
+            while stack:
+                frame, end = stack.pop()
+                events.append({"type": "C", "frame": frame, "at": (end - self.epoch) / 1e6})
+
+            profiles.append({
+                "type": "evented",
+                "name": thread_name,
+                "unit": "milliseconds",
+                "startValue": events[0]["at"],
+                "endValue": events[-1]["at"],
+                "events": events,
+            })
+
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": "agency-swarm",
+            "shared": {"frames": frames},
+            "profiles": profiles,
+        }
+
+    def save_chrome_trace(self, path: str):
+        """Saves the finished spans to a Chrome trace file, which can be opened in chrome://tracing or Perfetto."""
+        with open(path, "w") as f:
+            json.dump(self.to_chrome_trace(), f)
+
+    def save_speedscope(self, path: str):
+        """Saves the finished spans to a speedscope file, which can be opened at https://www.speedscope.app."""
+        with open(path, "w") as f:
+            json.dump(self.to_speedscope(), f)
+
+    def save_tool_profiles(self, folder: str) -> List[str]:
+        """
+        Saves the cProfile profiles of the traced tool calls, as `<tool>-<span id>.prof` files for pstats or snakeviz.
+
+        Parameters:
+            folder (str): The folder to save the profiles to. It is created if it does not exist.
+
+        Returns:
+            List[str]: The paths of the saved profiles.
+        """
+        os.makedirs(folder, exist_ok=True)
+        paths = []
+        for span in self.get_spans():
+            if span.profile is None:
+                continue
+            file_name = re.sub(r"[^\w.-]", "_", f"{span.name}-{span.span_id}.prof")
+            path = os.path.join(folder, file_name)
+            span.profile.dump_stats(path)
+            paths.append(path)
+        return paths
+
+
+def _to_json_value(value):
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    return str(value)
+
+
+def get_current_span() -> Optional[Span]:
+    """Returns the span active in the current context, if any."""
+    return _current_span.get()
+
+
+def set_current_span(span: Optional[Span]):
+    """Sets the current span, for example in a worker that continues a traced conversation."""
+    _current_span.set(span)
+
+
+def resume_in_span(gen, span: Optional[Span], profile: bool = False):
+    """
+    Yields from a generator and returns its return value, making `span` the current span during each resume of the
+    generator. Between resumes, the caller keeps its own current span. With `profile`, each resume is added to the
+    profile of the span, see `Tracer.start_profile`.
+    """
+    tracer = get_tracer() if profile else None
+    send, value = gen.send, None
+    while True:
+        token = _current_span.set(span)
+        profiling = tracer is not None and tracer.start_profile(span)
+        try:
+            item = send(value)
+        except StopIteration as e:
+            return e.value
+        finally:
+            if profiling:
+                tracer.stop_profile(span)
+            _current_span.reset(token)
+
+        try:
+            value, send = (yield item), gen.send
+        except GeneratorExit:
+            token = _current_span.set(span)
+            try:
+                gen.close()
+            finally:
+                _current_span.reset(token)
+            raise
+        except BaseException as e:
+            value, send = e, gen.throw
+
+
+async def aresume_in_span(agen, span: Optional[Span], profile: bool = False):
+    """Async version of `resume_in_span` for async generators."""
+    tracer = get_tracer() if profile else None
+    while True:
+        token = _current_span.set(span)
+        profiling = tracer is not None and tracer.start_profile(span)
+        try:
+            item = await agen.__anext__()
+        except StopAsyncIteration:
+            return
+        finally:
+            if profiling:
+                tracer.stop_profile(span)
+            _current_span.reset(token)
+
+        try:
+            yield item
+        except GeneratorExit:
+            token = _current_span.set(span)
+            try:
+                await agen.aclose()
+            finally:
+                _current_span.reset(token)
+            raise
+
+
+_tracer = Tracer(enabled=os.environ.get("AGENCY_SWARM_TRACING", "").lower() in ("1", "true"))
+
+
+def get_tracer() -> Tracer:
+    """Returns the tracer shared by all agencies."""
+    return _tracer
+
+
+def set_tracer(tracer: Tracer):
+    """Sets the tracer shared by all agencies."""
+    global _tracer
+    _tracer = tracer
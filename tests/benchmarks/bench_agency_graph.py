@@ -0,0 +1,50 @@
+"""
+Benchmark of building the communication graph of large agencies.
+
+Reports the time to parse the agency chart, create the SendMessage tools and set up the threads of agencies with an
+increasing number of agents. Each agent can talk to the CEO and to its neighbours. Assistants are not initialized,
+no requests are sent to the OpenAI API.
+
+Usage:
+    python -m tests.benchmarks.bench_agency_graph [--agents 50 100 200 400] [--neighbours 5]
+"""
+import argparse
+import time
+from unittest import mock
+
+from openai import OpenAI
+
+from agency_swarm import Agency, Agent, set_openai_client
+
+
+def make_chart(num_agents, num_neighbours):
+    agents = [Agent(name=f"Agent{i}", description=f"Agent number {i}") for i in range(num_agents)]
+    chart = [agents[0]]
+    for i, agent in enumerate(agents[1:], start=1):
+        chart.append([agents[0], agent])
+        chart.append([agent] + [agents[(i + j) % num_agents] for j in range(1, num_neighbours + 1)])
+    return chart
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--agents", type=int, nargs="+", default=[50, 100, 200, 400],
+                        help="Numbers of agents in the agency.")
+    parser.add_argument("--neighbours", type=int, default=5, help="Number of agents each agent can talk to.")
+    args = parser.parse_args()
+
+    set_openai_client(OpenAI(api_key="sk-benchmark", max_retries=0, timeout=5))
+    print(f"Agency graph construction, each agent talks to the CEO and {args.neighbours} neighbours:")
+    with mock.patch.object(Agency, "_init_agents"):
+        for num_agents in args.agents:
+            chart = make_chart(num_agents, args.neighbours)
+            start = time.perf_counter()
+            agency = Agency(chart)
+            duration = time.perf_counter() - start
+            num_threads = sum(len(threads) for threads in agency.agents_and_threads.values())
+            print(f"  {num_agents:>5} agents, {num_threads:>6} threads: {duration * 1000:9.1f}ms, "
+                  f"{duration / num_agents * 1000:6.2f}ms per agent")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Startup benchmark of Agency construction against a local mock of the OpenAI API.
+
+Reports the wall time of a cold start, which creates all assistants, and of a warm start, which loads them from the
+settings file, with sequential and with parallel agent initialization.
+
+Usage:
+    python -m tests.benchmarks.bench_agency_startup [--agents 15] [--latency 0.1] [--workers 8]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from agency_swarm import Agency, Agent, set_openai_client
+from tests.fake_openai import FakeOpenAIServer
+
+
+def build_agency(num_agents, settings_path):
+    agents = [Agent(name=f"Agent{i}", description=f"Agent number {i}") for i in range(num_agents)]
+    return Agency([agents[0]] + [[agents[0], agent] for agent in agents[1:]], settings_path=settings_path)
+
+
+def measure(num_agents, settings_path):
+    start = time.perf_counter()
+    build_agency(num_agents, settings_path)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--agents", type=int, default=15, help="Number of agents in the agency.")
+    parser.add_argument("--latency", type=float, default=0.1, help="Simulated latency of each API request in seconds.")
+    parser.add_argument("--workers", type=int, default=Agency.init_agents_max_workers,
+                        help="Maximum number of agents initialized concurrently.")
+    args = parser.parse_args()
+
+    with FakeOpenAIServer(latency=args.latency) as server, tempfile.TemporaryDirectory() as temp_dir:
+        set_openai_client(server.client())
+
+        print(f"Agency startup with {args.agents} agents, {args.latency * 1000:.0f}ms per request:")
+        for workers in (1, args.workers):
+            Agency.init_agents_max_workers = workers
+            settings_path = os.path.join(temp_dir, f"settings_{workers}.json")
+            cold = measure(args.agents, settings_path)
+            warm = measure(args.agents, settings_path)
+            print(f"  {workers:>2} worker(s): cold start {cold:6.2f}s, warm start {warm:6.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Benchmark of reading the highlighted elements of a page in the browsing tools.
+
+Compares `get_highlighted_elements`, which reads the label, text, tag, role and bounding box of every highlighted
+element in a single `execute_script` call, against the former `find_elements` followed by one `element.text` call per
+element, on a large static HTML page. Reports WebDriver round trips and wall time. Needs Chrome, selenium,
+webdriver-manager and selenium-stealth.
+
+Usage:
+    python -m tests.benchmarks.bench_highlighted_elements [--elements 500] [--repeat 5]
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+from collections import Counter
+
+from agency_swarm.agents.browsing.tools.util import highlight_elements_with_labels, get_highlighted_elements
+from agency_swarm.agents.browsing.tools.util.selenium import create_web_driver, set_selenium_config
+
+SELECTOR = 'a, button, div[onclick], div[role="button"], div[tabindex], span[onclick], span[role="button"], ' \
+           'span[tabindex]'
+
+
+def make_page(num_elements):
+    """Returns a static HTML page with a dense grid of links, buttons and clickable divs that fit in the viewport."""
+    elements = []
+    for i in range(num_elements):
+        if i % 3 == 0:
+            elements.append(f'<a href="#item-{i}">Link {i}</a>')
+        elif i % 3 == 1:
+            elements.append(f'<button type="button">Button {i}</button>')
+        else:
+            elements.append(f'<div role="button" tabindex="0">Item {i}</div>')
+    return f"""<!DOCTYPE html>
+<html>
+<head>
+<style>
+    body {{ margin: 0; font: 9px sans-serif; }}
+    a, button, div {{ display: inline-block; width: 36px; height: 14px; margin: 1px; padding: 0; overflow: hidden; }}
+</style>
+</head>
+<body>{"".join(elements)}</body>
+</html>
+"""
+
+
+def count_commands(wd):
+    """Counts the WebDriver commands sent by the driver, each one is an HTTP round trip to chromedriver."""
+    commands = Counter()
+    execute = wd.execute
+
+    def counting_execute(driver_command, params=None):
+        commands[driver_command] += 1
+        return execute(driver_command, params)
+
+    wd.execute = counting_execute
+    return commands
+
+
+def legacy_read_elements(wd):
+    """Reading of the highlighted elements as implemented before `get_highlighted_elements`."""
+    from selenium.webdriver.common.by import By
+    all_elements = wd.find_elements(By.CSS_SELECTOR, '.highlighted-element')
+    return [element.text for element in all_elements]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--elements", type=int, default=500, help="Number of clickable elements on the page.")
+    parser.add_argument("--repeat", type=int, default=5, help="Number of measured reads of each implementation.")
+    args = parser.parse_args()
+
+    set_selenium_config({"headless": True})
+    wd = create_web_driver()
+    temp_dir = tempfile.mkdtemp()
+    try:
+        path = os.path.join(temp_dir, "page.html")
+        with open(path, "w") as f:
+            f.write(make_page(args.elements))
+        wd.get("file://" + path)
+        highlight_elements_with_labels(wd, SELECTOR)
+
+        legacy_texts = legacy_read_elements(wd)
+        elements = get_highlighted_elements(wd)
+        assert [element["text"] for element in elements] == legacy_texts
+
+        commands = count_commands(wd)
+        results = {}
+        for name, read in (("legacy (find_elements + element.text)", legacy_read_elements),
+                           ("get_highlighted_elements", get_highlighted_elements)):
+            commands.clear()
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                read(wd)
+            results[name] = ((time.perf_counter() - start) / args.repeat, sum(commands.values()) / args.repeat)
+
+        print(f"Reading {len(elements)} highlighted elements ({args.repeat} repeats):")
+        for name, (seconds, round_trips) in results.items():
+            print(f"  {name:<40} {seconds * 1000:9.1f} ms {round_trips:8.0f} round trips")
+    finally:
+        wd.quit()
+        shutil.rmtree(temp_dir)
+
+
+if __name__ == "__main__":
+    main()
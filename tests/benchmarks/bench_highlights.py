@@ -0,0 +1,191 @@
+"""
+Benchmark of the highlight pass of the browsing tools on a large page with a deep DOM.
+
+Compares `highlight_elements_with_labels`, which checks visibility with `Element.checkVisibility` and draws all labels
+in one overlay, on a changed page (cold) and on an unchanged page (cached), against the former pass, which walked the
+ancestors of every candidate with `getComputedStyle` and restyled the elements. Needs Chrome, selenium,
+webdriver-manager and selenium-stealth.
+
+Usage:
+    python -m tests.benchmarks.bench_highlights [--elements 500] [--depth 30] [--repeat 5]
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from agency_swarm.agents.browsing.tools.util import highlight_elements_with_labels, remove_highlight_and_labels
+from agency_swarm.agents.browsing.tools.util.selenium import create_web_driver, set_selenium_config
+from tests.benchmarks.bench_highlighted_elements import SELECTOR
+
+
+def make_deep_page(num_elements, depth):
+    """Returns a static HTML page with clickable elements, each nested `depth` divs deep."""
+    elements = []
+    for i in range(num_elements):
+        element = f'<button type="button">Button {i}</button>' if i % 2 else f'<a href="#item-{i}">Link {i}</a>'
+        elements.append("<div>" * depth + element + "</div>" * depth)
+    return f"""<!DOCTYPE html>
+<html>
+<head>
+<style>
+    body {{ margin: 0; font: 9px sans-serif; }}
+    body > div {{ display: inline-block; width: 38px; height: 16px; overflow: hidden; }}
+    a, button {{ display: block; width: 36px; height: 14px; margin: 1px; padding: 0; }}
+</style>
+</head>
+<body>{"".join(elements)}</body>
+</html>
+"""
+
+
+def legacy_highlight(driver, selector):
+    """Highlight pass as implemented before the overlay."""
+    script = f"""
+        // Helper function to check if an element is visible
+        function isElementVisible(element) {{
+            var rect = element.getBoundingClientRect();
+            if (rect.width <= 0 || rect.height <= 0 || 
+                rect.top >= (window.innerHeight || document.documentElement.clientHeight) || 
+                rect.bottom <= 0 || 
+                rect.left >= (window.innerWidth || document.documentElement.clientWidth) || 
+                rect.right <= 0) {{
+                return false;
+            }}
+            // Check if any parent element is hidden, which would hide this element as well
+            var parent = element;
+            while (parent) {{
+                var style = window.getComputedStyle(parent);
+                if (style.display === 'none' || style.visibility === 'hidden') {{
+                    return false;
+                }}
+                parent = parent.parentElement;
+            }}
+            return true;
+        }}
+
+        // Remove previous labels and styles if they exist
+        document.querySelectorAll('.highlight-label').forEach(function(label) {{
+            label.remove();
+        }});
+        document.querySelectorAll('.highlighted-element').forEach(function(element) {{
+            element.classList.remove('highlighted-element');
+            element.removeAttribute('data-highlighted');
+        }});
+
+        // Inject custom style for highlighting elements
+        var styleElement = document.getElementById('highlight-style');
+        if (!styleElement) {{
+            styleElement = document.createElement('style');
+            styleElement.id = 'highlight-style';
+            document.head.appendChild(styleElement);
+        }}
+        styleElement.textContent = `
+            .highlighted-element {{ 
+                border: 2px solid red !important; 
+                position: relative; 
+                box-sizing: border-box; 
+            }}
+            .highlight-label {{ 
+                position: absolute; 
+                z-index: 2147483647; 
+                background: yellow; 
+                color: black; 
+                font-size: 25px; 
+                padding: 3px 5px; 
+                border: 1px solid black; 
+                border-radius: 3px; 
+                white-space: nowrap; 
+                box-shadow: 0px 0px 2px #000; 
+                top: -25px; 
+                left: 0; 
+                display: none;
+            }}
+        `;
+
+        // Function to create and append a label to the body
+        function createAndAdjustLabel(element, index) {{
+            if (!isElementVisible(element)) return;
+
+            element.classList.add('highlighted-element');
+            var label = document.createElement('div');
+            label.className = 'highlight-label';
+            label.textContent = index.toString();
+            label.style.display = 'block'; // Make the label visible
+
+            // Calculate label position
+            var rect = element.getBoundingClientRect();
+            var top = rect.top + window.scrollY - 25; // Position label above the element
+            var left = rect.left + window.scrollX;
+
+            label.style.top = top + 'px';
+            label.style.left = left + 'px';
+
+            document.body.appendChild(label); // Append the label to the body
+        }}
+
+        // Select all clickable elements and apply the styles
+        var allElements = document.querySelectorAll('{selector}');
+        var index = 1;
+        allElements.forEach(function(element) {{
+            // Check if the element is not already highlighted and is visible
+            if (!element.dataset.highlighted && isElementVisible(element)) {{
+                element.dataset.highlighted = 'true';
+                createAndAdjustLabel(element, index++);
+            }}
+        }});
+        """
+
+    driver.execute_script(script)
+
+
+def touch_page(wd):
+    """Changes the DOM, so that the next highlight pass cannot use its cache."""
+    wd.execute_script("document.body.dataset.tick = Date.now();")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--elements", type=int, default=500, help="Number of clickable elements on the page.")
+    parser.add_argument("--depth", type=int, default=30, help="Number of divs around each element.")
+    parser.add_argument("--repeat", type=int, default=5, help="Number of measured highlight passes.")
+    args = parser.parse_args()
+
+    set_selenium_config({"headless": True})
+    wd = create_web_driver()
+    temp_dir = tempfile.mkdtemp()
+    try:
+        path = os.path.join(temp_dir, "page.html")
+        with open(path, "w") as f:
+            f.write(make_deep_page(args.elements, args.depth))
+        wd.get("file://" + path)
+
+        cases = {
+            "legacy (ancestor walk + restyle)": (legacy_highlight, touch_page),
+            "overlay, changed page": (highlight_elements_with_labels, touch_page),
+            "overlay, unchanged page": (highlight_elements_with_labels, remove_highlight_and_labels),
+        }
+        results = {}
+        for name, (highlight, prepare) in cases.items():
+            highlight(wd, SELECTOR)
+            total = 0
+            for _ in range(args.repeat):
+                prepare(wd)
+                start = time.perf_counter()
+                highlight(wd, SELECTOR)
+                total += time.perf_counter() - start
+            results[name] = total / args.repeat
+            # reload the page, so the cases do not see each other's highlights
+            wd.refresh()
+
+        print(f"Highlight pass ({args.elements} elements, depth {args.depth}, {args.repeat} repeats):")
+        for name, seconds in results.items():
+            print(f"  {name:<40} {seconds * 1000:9.1f} ms")
+    finally:
+        wd.quit()
+        shutil.rmtree(temp_dir)
+
+
+if __name__ == "__main__":
+    main()
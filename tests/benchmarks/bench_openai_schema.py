@@ -0,0 +1,91 @@
+"""
+Benchmark of BaseTool.openai_schema generation for agents with many tools.
+
+Compares generating the schema of every tool on each access, as before the schema cache, with the cached schemas,
+for the calls made on every agency start: Agent.get_oai_tools() and Agent._check_parameters().
+Runs offline, no requests are sent to the OpenAI API.
+
+Usage:
+    python -m tests.benchmarks.bench_openai_schema [--tools 150] [--repeat 5]
+"""
+import argparse
+import time
+from typing import List, Optional
+from unittest import mock
+
+from openai import OpenAI
+from pydantic import BaseModel, Field, create_model
+
+from agency_swarm import Agent, BaseTool, set_openai_client
+
+
+class Address(BaseModel):
+    street: str = Field(..., description="Street name and number.")
+    city: str = Field(..., description="City.")
+    country: Optional[str] = Field(None, description="Country code.")
+
+
+class BenchmarkTool(BaseTool):
+    """
+    Tool used for benchmarking.
+
+    Args:
+        name: Name of the customer.
+    """
+    name: str = Field(..., description="Name of the customer.")
+    addresses: List[Address] = Field(default_factory=list, description="Addresses of the customer.")
+    tags: List[str] = Field(default_factory=list, description="Tags to filter by.")
+    limit: int = Field(10, description="Maximum number of results.")
+
+    def run(self):
+        return self.name
+
+
+def make_tools(num_tools):
+    return [create_model(f"BenchmarkTool{i}", __base__=BenchmarkTool, __doc__=f"Benchmark tool number {i}.")
+            for i in range(num_tools)]
+
+
+def timed(func, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tools", type=int, default=150, help="Number of tools of the agent.")
+    parser.add_argument("--repeat", type=int, default=5, help="Number of repetitions of each measurement.")
+    args = parser.parse_args()
+
+    set_openai_client(OpenAI(api_key="sk-benchmark", max_retries=0, timeout=5))
+    agent = Agent(name="BenchmarkAgent", tools=make_tools(args.tools))
+    settings = {"name": agent.name, "description": agent.description, "instructions": agent.instructions,
+                "tools": agent.get_oai_tools(), "file_ids": [], "metadata": {}, "model": agent.model}
+
+    def check():
+        agent._check_parameters(settings)
+
+    cached = {"get_oai_tools": timed(agent.get_oai_tools, args.repeat), "_check_parameters": timed(check, args.repeat)}
+
+    # generate the schema on every access, like before the cache
+    with mock.patch("agency_swarm.tools.BaseTool._openai_schema_cache", {}) as cache:
+        def uncached(func):
+            def wrapper():
+                cache.clear()
+                func()
+                cache.clear()
+            return wrapper
+
+        uncached_results = {"get_oai_tools": timed(uncached(agent.get_oai_tools), args.repeat),
+                            "_check_parameters": timed(uncached(check), args.repeat)}
+
+    print(f"openai_schema generation with {args.tools} tools:")
+    for name in cached:
+        print(f"  {name:<18} uncached {uncached_results[name] * 1000:8.2f}ms, cached {cached[name] * 1000:8.2f}ms, "
+              f"speedup {uncached_results[name] / cached[name]:5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Benchmark of creating tools from a large OpenAPI schema with ToolFactory.from_openapi_schema.
+
+Compares building the models of all tools up front without the parsed operations cache, as before lazy tools, with
+lazy tools on the first start (empty cache) and on a restart (warm cache). Also reports the memory allocated for
+the tools. Runs offline, no requests are sent.
+
+Usage:
+    python -m tests.benchmarks.bench_openapi_spec [--operations 1000]
+"""
+import argparse
+import gc
+import json
+import shutil
+import tempfile
+import time
+import tracemalloc
+
+from agency_swarm.tools import ToolFactory
+
+
+def make_spec(num_operations):
+    components = {
+        "Address": {"type": "object", "title": "Address", "properties": {
+            "street": {"type": "string", "description": "Street name and number."},
+            "city": {"type": "string", "description": "City."},
+        }},
+        "Customer": {"type": "object", "title": "Customer", "properties": {
+            "name": {"type": "string", "description": "Name of the customer."},
+            "address": {"$ref": "#/components/schemas/Address"},
+            "tags": {"type": "array", "items": {"type": "string"}},
+        }, "required": ["name"]},
+    }
+    paths = {}
+    for i in range(num_operations):
+        paths[f"/customers{i}/{{customer_id}}"] = {"post": {
+            "operationId": f"UpdateCustomer{i}",
+            "description": f"Updates a customer of account {i}.",
+            "parameters": [
+                {"name": "customer_id", "in": "path", "required": True, "description": "Customer id.",
+                 "schema": {"type": "string"}},
+                {"name": "notify", "in": "query", "description": "Notify the customer.",
+                 "schema": {"type": "boolean"}},
+            ],
+            "requestBody": {"content": {"application/json": {"schema": {"$ref": "#/components/schemas/Customer"}}}},
+            "responses": {"200": {"description": "The customer.", "content": {"application/json": {
+                "schema": {"$ref": "#/components/schemas/Customer"}}}}},
+        }}
+    return json.dumps({"openapi": "3.1.0", "info": {"title": "Customers", "version": "v1.0.0"},
+                       "servers": [{"url": "https://customers.example.com"}], "paths": paths,
+                       "components": {"schemas": components}})
+
+
+def measure(func, setup):
+    """Returns the duration and allocated memory of func, measured in separate runs."""
+    arg = setup()
+    gc.collect()
+    start = time.perf_counter()
+    func(arg)
+    duration = time.perf_counter() - start
+
+    arg = setup()
+    tracemalloc.start()
+    result = func(arg)
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return duration, memory
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--operations", type=int, default=1000, help="Number of operations of the schema.")
+    args = parser.parse_args()
+
+    spec = make_spec(args.operations)
+    cache_dirs = []
+
+    def empty_cache():
+        cache_dirs.append(tempfile.mkdtemp())
+        return cache_dirs[-1]
+
+    def warm_cache():
+        cache_dir = empty_cache()
+        ToolFactory.from_openapi_schema(spec, cache_dir=cache_dir)
+        return cache_dir
+
+    def eager(_):
+        return ToolFactory.from_openapi_schema(spec, lazy=False, cache_dir=False)
+
+    def lazy(cache_dir):
+        return ToolFactory.from_openapi_schema(spec, cache_dir=cache_dir)
+
+    try:
+        results = {
+            "eager": measure(eager, lambda: None),
+            "lazy, cold cache": measure(lazy, empty_cache),
+            "lazy, warm cache": measure(lazy, warm_cache),
+        }
+        tools = lazy(warm_cache())
+        start = time.perf_counter()
+        tools[0](parameters={"customer_id": "1"})
+        first_call = time.perf_counter() - start
+    finally:
+        for cache_dir in cache_dirs:
+            shutil.rmtree(cache_dir)
+
+    print(f"Tools from an OpenAPI schema with {args.operations} operations ({len(spec) / 1e6:.1f}MB):")
+    baseline = results["eager"][0]
+    for name, (duration, memory) in results.items():
+        print(f"  {name:<17} {duration * 1000:9.1f}ms, {memory / 1e6:7.1f}MB, speedup {baseline / duration:6.1f}x")
+    print(f"  first call of a lazy tool builds its model in {first_call * 1000:.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Benchmark of tools created with ToolFactory.from_openapi_schema against a local stand-in API server.
+
+Compares a new connection per request, as before the pooled HTTP client, with the pooled client, called from a
+thread pool like the thread tool executor, and with the async `arun` of the tools, like the asyncio tool executor.
+
+Usage:
+    python -m tests.benchmarks.bench_openapi_tools [--requests 500] [--concurrency 8] [--latency 0.002]
+"""
+import argparse
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from agency_swarm.tools import ToolFactory
+from agency_swarm.util.http_client import HttpClient
+from tests.fake_api import FakeAPIServer
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=500, help="Number of tool calls.")
+    parser.add_argument("--concurrency", type=int, default=8, help="Number of concurrent tool calls.")
+    parser.add_argument("--latency", type=float, default=0.002, help="Latency of the API server in seconds.")
+    args = parser.parse_args()
+
+    server = FakeAPIServer(latency=args.latency).start()
+    http_client = HttpClient(max_connections_per_host=args.concurrency)
+    get_item = ToolFactory.from_openapi_schema(server.spec, http_client=http_client, cache_dir=False)[0]
+
+    def unpooled(i):
+        # like the callbacks before the pooled client, a new connection for every call
+        return requests.get(f"{server.base_url}/items/{i}").json()
+
+    def pooled(i):
+        return get_item(parameters={"item_id": str(i)}).run()
+
+    async def pooled_async():
+        semaphore = asyncio.Semaphore(args.concurrency)
+
+        async def call(i):
+            async with semaphore:
+                return await get_item(parameters={"item_id": str(i)}).arun()
+
+        await asyncio.gather(*[call(i) for i in range(args.requests)])
+        await http_client.aclose()
+
+    results = {}
+    for name, func in (("unpooled", unpooled), ("pooled", pooled)):
+        server.reset()
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+            list(executor.map(func, range(args.requests)))
+        results[name] = (time.perf_counter() - start, server.connections)
+
+    server.reset()
+    start = time.perf_counter()
+    asyncio.run(pooled_async())
+    results["pooled async"] = (time.perf_counter() - start, server.connections)
+
+    http_client.close()
+    server.stop()
+
+    print(f"{args.requests} OpenAPI tool calls, {args.concurrency} concurrent, {args.latency * 1000:.1f}ms latency:")
+    baseline = results["unpooled"][0]
+    for name, (duration, connections) in results.items():
+        print(f"  {name:<13} {args.requests / duration:8.1f} calls/s, {connections:4d} connections, "
+              f"speedup {baseline / duration:4.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Micro-benchmark of the cost of dispatching a tool call to a tool instance in Thread._init_tool.
+
+Compares the indexed lookup with json validation against the former linear scan over `Agent.functions` with `eval`.
+Runs offline, no requests are sent to the OpenAI API.
+
+Usage:
+    python -m tests.benchmarks.bench_tool_dispatch [--tools 50] [--calls 20000]
+"""
+import argparse
+import json
+import timeit
+from typing import List
+
+from openai import OpenAI
+from openai.types.beta.threads.required_action_function_tool_call import RequiredActionFunctionToolCall, Function
+from pydantic import Field, create_model
+
+from agency_swarm import Agent, BaseTool, set_openai_client
+from agency_swarm.threads import Thread
+from agency_swarm.user import User
+
+
+class BenchmarkTool(BaseTool):
+    """Tool used for benchmarking."""
+    query: str = Field(..., description="Search query.")
+    limit: int = Field(10, description="Maximum number of results.")
+    tags: List[str] = Field(default_factory=list, description="Tags to filter by.")
+
+    def run(self):
+        return self.query
+
+
+def make_tools(num_tools):
+    return [create_model(f"BenchmarkTool{i}", __base__=BenchmarkTool) for i in range(num_tools)]
+
+
+def legacy_init_tool(tool_call, recipient_agent):
+    """Tool dispatch as implemented before the agent tool index."""
+    funcs = [tool for tool in recipient_agent.tools if issubclass(tool, BaseTool)]
+    func = next((func for func in funcs if func.__name__ == tool_call.function.name), None)
+    func = func(**eval(tool_call.function.arguments))
+    func.caller_agent = recipient_agent
+    return func
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tools", type=int, default=50, help="Number of tools of the agent.")
+    parser.add_argument("--calls", type=int, default=20000, help="Number of dispatched tool calls.")
+    args = parser.parse_args()
+
+    set_openai_client(OpenAI(api_key="sk-benchmark", max_retries=0, timeout=5))
+
+    tools = make_tools(args.tools)
+    agent = Agent(name="BenchmarkAgent", tools=tools)
+    thread = Thread(User(), agent)
+
+    # the last tool is the worst case for the linear scan
+    tool_call = RequiredActionFunctionToolCall(
+        id="call_0", type="function",
+        function=Function(name=tools[-1].__name__,
+                          arguments=json.dumps({"query": "agency swarm", "limit": 5, "tags": ["a", "b", "c"]})))
+
+    assert legacy_init_tool(tool_call, agent).model_dump() == thread._init_tool(tool_call, agent).model_dump()
+
+    results = {
+        "legacy (scan + eval)": timeit.timeit(lambda: legacy_init_tool(tool_call, agent), number=args.calls),
+        "indexed (dict + model_validate_json)": timeit.timeit(lambda: thread._init_tool(tool_call, agent),
+                                                              number=args.calls),
+    }
+
+    print(f"Dispatch cost per tool call ({args.tools} tools, {args.calls} calls):")
+    for name, seconds in results.items():
+        print(f"  {name:<40} {seconds / args.calls * 1e6:8.2f} us")
+
+
+if __name__ == "__main__":
+    main()
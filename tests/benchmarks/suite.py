@@ -0,0 +1,296 @@
+"""
+Micro-benchmark suite of the local hot paths of the library, with JSON baselines.
+
+Measures tool schema generation, tool creation from OpenAI and OpenAPI schemas, schema (de)referencing, agency
+construction, tool call dispatch and the overhead of metrics and tracing. Each benchmark is timed with timeit, and
+the median time per call is compared against a JSON baseline, so regressions show up in review. Runs offline, no
+requests are sent to the OpenAI API.
+
+Usage:
+    python -m tests.benchmarks.suite [--filter schema] [--quick]
+    python -m tests.benchmarks.suite --save tests/benchmarks/baseline.json
+    python -m tests.benchmarks.suite --compare tests/benchmarks/baseline.json [--threshold 0.25]
+"""
+import argparse
+import json
+import os
+import platform
+import re
+import statistics
+import sys
+import timeit
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+from unittest import mock
+
+from openai import OpenAI
+from openai.types.beta.threads.required_action_function_tool_call import RequiredActionFunctionToolCall, Function
+from pydantic import BaseModel, Field, create_model
+
+from agency_swarm import Agency, Agent, BaseTool, set_openai_client
+from agency_swarm.threads import Thread
+from agency_swarm.tools import ToolFactory
+from agency_swarm.tools.BaseTool import _openai_schema_cache
+from agency_swarm.user import User
+from agency_swarm.util.metrics import MetricsRegistry
+from agency_swarm.util.schema import dereference_schema, reference_schema
+from agency_swarm.util.tracing import Tracer
+from tests.benchmarks.bench_agency_graph import make_chart
+from tests.benchmarks.bench_openapi_spec import make_spec
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+# name -> setup function that prepares a benchmark and returns the callable to time
+BENCHMARKS: Dict[str, Callable[[], Callable]] = {}
+
+
+def benchmark(name: str):
+    """Registers a benchmark setup function under a name."""
+    def decorator(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return decorator
+
+
+class Address(BaseModel):
+    street: str = Field(..., description="Street name and number.")
+    city: str = Field(..., description="City.")
+    country: Optional[str] = Field(None, description="Country code.")
+
+
+class BenchmarkTool(BaseTool):
+    """Tool used for benchmarking."""
+    name: str = Field(..., description="Name of the customer.")
+    addresses: List[Address] = Field(default_factory=list, description="Addresses of the customer.")
+    tags: List[str] = Field(default_factory=list, description="Tags to filter by.")
+    limit: int = Field(10, description="Maximum number of results.")
+
+    def run(self):
+        return self.name
+
+
+@benchmark("openai_schema.cached")
+def bench_openai_schema_cached():
+    BenchmarkTool.openai_schema
+    return lambda: BenchmarkTool.openai_schema
+
+
+@benchmark("openai_schema.uncached")
+def bench_openai_schema_uncached():
+    def generate():
+        _openai_schema_cache.pop(BenchmarkTool, None)
+        return BenchmarkTool.openai_schema
+    return generate
+
+
+@benchmark("schema.dereference")
+def bench_dereference_schema():
+    schema = BenchmarkTool.openai_schema
+    return lambda: dereference_schema(schema)
+
+
+@benchmark("schema.reference")
+def bench_reference_schema():
+    schema = dereference_schema(BenchmarkTool.openai_schema)
+    return lambda: reference_schema(schema)
+
+
+@benchmark("tool_factory.from_openai_schema")
+def bench_from_openai_schema():
+    schema = {
+        "name": "SearchCustomers",
+        "description": "Searches customers.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "query": {"type": "string", "description": "Search query."},
+                "limit": {"type": "integer", "description": "Maximum number of results."},
+                "tags": {"type": "array", "items": {"type": "string"}, "description": "Tags to filter by."},
+                "exact": {"type": "boolean", "description": "Match the query exactly."},
+            },
+            "required": ["query"],
+        },
+    }
+    return lambda: ToolFactory.from_openai_schema(schema, lambda *args, **kwargs: None)
+
+
+@benchmark("tool_factory.from_openapi_schema.eager_100")
+def bench_from_openapi_schema_eager():
+    spec = make_spec(100)
+    return lambda: ToolFactory.from_openapi_schema(spec, lazy=False, cache_dir=False)
+
+
+@benchmark("tool_factory.from_openapi_schema.lazy_1000")
+def bench_from_openapi_schema_lazy():
+    spec = make_spec(1000)
+    return lambda: ToolFactory.from_openapi_schema(spec, cache_dir=False)
+
+
+@benchmark("agency.construction_100")
+def bench_agency_construction():
+    set_openai_client(OpenAI(api_key="sk-benchmark", max_retries=0, timeout=5))
+    patch = mock.patch.object(Agency, "_init_agents")
+
+    def construct():
+        # assistants are not initialized, only the graph, tools and threads are built
+        with patch:
+            Agency(make_chart(100, 5))
+    return construct
+
+
+@benchmark("thread.execute_tool")
+def bench_execute_tool():
+    set_openai_client(OpenAI(api_key="sk-benchmark", max_retries=0, timeout=5))
+    tools = [create_model(f"BenchmarkTool{i}", __base__=BenchmarkTool) for i in range(50)]
+    agent = Agent(name="BenchmarkAgent", tools=tools)
+    thread = Thread(User(), agent)
+    tool_call = RequiredActionFunctionToolCall(id="call_0", type="function", function=Function(
+        name="BenchmarkTool25", arguments=json.dumps({"name": "John", "tags": ["a", "b"], "limit": 3})))
+    return lambda: thread.execute_tool(tool_call, agent)
+
+
+@benchmark("instrumentation.metrics_observe")
+def bench_metrics_observe():
+    registry = MetricsRegistry()
+    return lambda: registry.observe("agency_swarm_tool_seconds", 0.01, tool="BenchmarkTool")
+
+
+@benchmark("instrumentation.span_disabled")
+def bench_span_disabled():
+    tracer = Tracer()
+
+    def span():
+        with tracer.span("BenchmarkTool", "tool"):
+            pass
+    return span
+
+
+def run_benchmark(setup: Callable[[], Callable], min_time: float = 0.2, repeat: int = 5) -> Dict:
+    """
+    Times a benchmark.
+
+    Parameters:
+        setup (Callable): The setup function of the benchmark, which returns the callable to time.
+        min_time (float, optional): Minimum duration of each repetition in seconds. Defaults to 0.2.
+        repeat (int, optional): Number of repetitions. Defaults to 5.
+
+    Returns:
+        Dict: The `min`, `median` and `mean` time per call in seconds, the `number` of calls per repetition and the
+            number of repetitions.
+    """
+    timer = timeit.Timer(setup())
+    number = 1
+    while True:
+        duration = timer.timeit(number)
+        if duration >= min_time:
+            break
+        number = max(number * 2, int(number * min_time / max(duration, 1e-9) * 1.1))
+    times = [duration / number for duration in timer.repeat(repeat=repeat, number=number)]
+    return {"min": min(times), "median": statistics.median(times), "mean": statistics.mean(times),
+            "number": number, "repeat": repeat}
+
+
+def run_suite(pattern: str = None, min_time: float = 0.2, repeat: int = 5, verbose: bool = True) -> Dict:
+    """Runs the benchmarks whose name matches the pattern and returns the results with the machine info."""
+    results = {}
+    for name, setup in BENCHMARKS.items():
+        if pattern and not re.search(pattern, name):
+            continue
+        results[name] = run_benchmark(setup, min_time, repeat)
+        if verbose:
+            print(f"  {name:<46} {format_time(results[name]['median'])}")
+    return {"machine": get_machine_info(), "benchmarks": results}
+
+
+def compare(results: Dict, baseline: Dict, threshold: float = 0.25) -> Dict[str, List[str]]:
+    """
+    Compares the median times of benchmark results against a baseline.
+
+    Parameters:
+        results (Dict): Results of `run_suite`.
+        baseline (Dict): Baseline results of `run_suite`.
+        threshold (float, optional): Relative change of the median time that counts as a regression or an
+            improvement. Defaults to 0.25.
+
+    Returns:
+        Dict[str, List[str]]: The names of the benchmarks by outcome: "regressions", "improvements", "unchanged"
+            and "new", for benchmarks without a baseline.
+    """
+    outcomes = {"regressions": [], "improvements": [], "unchanged": [], "new": []}
+    for name, result in results["benchmarks"].items():
+        base = baseline["benchmarks"].get(name)
+        if base is None:
+            outcomes["new"].append(name)
+            continue
+        ratio = result["median"] / base["median"]
+        if ratio > 1 + threshold:
+            outcomes["regressions"].append(name)
+        elif ratio < 1 / (1 + threshold):
+            outcomes["improvements"].append(name)
+        else:
+            outcomes["unchanged"].append(name)
+    return outcomes
+
+
+def get_machine_info() -> Dict:
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+
+
+def format_time(seconds: float) -> str:
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:8.2f}{unit}"
+    return f"{seconds / 1e-9:8.2f}ns"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--filter", help="Only run the benchmarks whose name matches this regular expression.")
+    parser.add_argument("--quick", action="store_true", help="Shorter measurements, less precise.")
+    parser.add_argument("--repeat", type=int, default=5, help="Number of repetitions of each benchmark.")
+    parser.add_argument("--save", nargs="?", const=BASELINE_PATH, help="Save the results as a JSON baseline.")
+    parser.add_argument("--compare", nargs="?", const=BASELINE_PATH,
+                        help="Compare the results against a JSON baseline. Exits with 1 on regressions.")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Relative slowdown of the median time that counts as a regression.")
+    parser.add_argument("--list", action="store_true", help="List the benchmarks and exit.")
+    args = parser.parse_args()
+
+    if args.list:
+        print("\n".join(BENCHMARKS))
+        return
+
+    print("Median time per call:")
+    results = run_suite(args.filter, min_time=0.05 if args.quick else 0.2, repeat=3 if args.quick else args.repeat)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=4)
+            f.write("\n")
+        print(f"Saved the results to {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        outcomes = compare(results, baseline, args.threshold)
+        print(f"Compared to {args.compare} ({baseline['machine']['date']}, "
+              f"Python {baseline['machine']['python']}):")
+        for name, result in results["benchmarks"].items():
+            base = baseline["benchmarks"].get(name)
+            change = f"{result['median'] / base['median'] - 1:+7.1%}" if base else "    new"
+            flag = " REGRESSION" if name in outcomes["regressions"] else ""
+            print(f"  {name:<46} {format_time(result['median'])} {change}{flag}")
+        if outcomes["regressions"]:
+            print(f"{len(outcomes['regressions'])} regressions above {args.threshold:.0%}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+import json
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+
+class FakeAPIServer:
+    """
+    Local stand-in for an external REST API, used by tools created from OpenAPI schemas.
+
+    Serves `GET /items/{item_id}`, which echoes the item id, query parameters and headers, and `POST /items`, which
+    echoes the request body. Every request is delayed by `latency` seconds. The server counts new connections in
+    `connections`, requests per "<method> <path>" in `calls`, and tracks the maximum number of concurrent requests in
+    `max_concurrency`. The next N requests of a path in `failures` fail with `failure_status`.
+    """
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.connections = 0
+        self.calls = Counter()
+        self.failures = Counter()
+        self.failure_status = 503
+        self.max_concurrency = 0
+        self.lock = threading.Lock()
+        self._active = 0
+        self._httpd = None
+
+    def start(self):
+        server = self
+
+        class Handler(_Handler):
+            fake = server
+
+        class Server(ThreadingHTTPServer):
+            request_queue_size = 128
+
+            def handle_error(self, request, client_address):
+                # clients that time out close their connections before the response is sent
+                pass
+
+        self._httpd = Server(("127.0.0.1", 0), Handler)
+        self._httpd.daemon_threads = True
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._httpd:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+    def reset(self):
+        with self.lock:
+            self.connections = 0
+            self.calls.clear()
+            self.failures.clear()
+            self.max_concurrency = 0
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self._httpd.server_address[1]}"
+
+    @property
+    def spec(self):
+        """OpenAPI schema of the server."""
+        return {
+            "openapi": "3.1.0",
+            "info": {"title": "Items", "version": "v1.0.0"},
+            "servers": [{"url": self.base_url}],
+            "paths": {
+                "/items/{item_id}": {
+                    "get": {
+                        "operationId": "GetItem",
+                        "description": "Returns an item.",
+                        "parameters": [
+                            {"name": "item_id", "in": "path", "required": True, "description": "Item id.",
+                             "schema": {"type": "string"}},
+                            {"name": "fields", "in": "query", "required": False, "description": "Fields to return.",
+                             "schema": {"type": "string"}},
+                        ],
+                    }
+                },
+                "/items": {
+                    "post": {
+                        "operationId": "CreateItem",
+                        "description": "Creates an item.",
+                        "requestBody": {"content": {"application/json": {"schema": {
+                            "type": "object",
+                            "properties": {"name": {"type": "string", "description": "Item name."}},
+                            "required": ["name"],
+                        }}}},
+                    }
+                },
+            },
+        }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    fake: FakeAPIServer = None
+    # keep-alive
+    protocol_version = "HTTP/1.1"
+    # headers and body are written separately, avoid delayed acks on reused connections, like real servers
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+    def setup(self):
+        super().setup()
+        with self.fake.lock:
+            self.fake.connections += 1
+
+    def do_GET(self):
+        self._handle()
+
+    def do_POST(self):
+        self._handle()
+
+    def _handle(self):
+        fake = self.fake
+        url = urlparse(self.path)
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length)) if length else None
+
+        with fake.lock:
+            fake.calls[f"{self.command} {url.path}"] += 1
+            fake._active += 1
+            fake.max_concurrency = max(fake.max_concurrency, fake._active)
+            fail = fake.failures[url.path] > 0
+            if fail:
+                fake.failures[url.path] -= 1
+        try:
+            if fake.latency:
+                time.sleep(fake.latency)
+            if fail:
+                self._send(fake.failure_status, {"error": "unavailable"})
+            elif self.command == "GET" and url.path.startswith("/items/"):
+                self._send(200, {"id": url.path.rsplit("/", 1)[1],
+                                 "query": {k: v[0] for k, v in parse_qs(url.query).items()},
+                                 "authorization": self.headers.get("Authorization")})
+            elif self.command == "POST" and url.path == "/items":
+                self._send(200, {"created": body})
+            else:
+                self._send(404, {"error": "not found"})
+        finally:
+            with fake.lock:
+                fake._active -= 1
+
+    def _send(self, status, payload):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        if status == 503:
+            self.send_header("Retry-After", "0")
+        self.end_headers()
+        self.wfile.write(data)
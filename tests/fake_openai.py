@@ -0,0 +1,390 @@
+import json
+import re
+import threading
+import time
+import uuid
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+import openai
+
+
+def _new_id(prefix):
+    return f"{prefix}_{uuid.uuid4().hex[:24]}"
+
+
+class FakeOpenAIServer:
+    """
+    Local stand-in for the subset of the OpenAI Assistants API used by agency_swarm.
+
+    Runs take `run_delay` seconds to settle. Each assistant follows a script of steps: a step is either
+    {"tool_calls": [(name, arguments_json), ...]} which puts the run into `requires_action`, or {"message": text}
+    which completes the run with an assistant message. Assistants without a script reply with "ok".
+    Every request is counted in `calls`, keyed by "<resource>.<action>", and delayed by `latency` seconds to
+    simulate network round trips.
+    """
+
+    def __init__(self, run_delay=0.1, streaming=True, latency=0.0):
+        self.run_delay = run_delay
+        self.streaming = streaming
+        # end run streams right after the request was accepted, without sending any event
+        self.empty_streams = False
+        self.latency = latency
+        self.calls = Counter()
+        # number of upcoming requests per "<resource>.<action>" that fail with a server error
+        self.failures = Counter()
+        self.assistants = {}
+        self.threads = {}
+        self.files = {}
+        self.scripts = {}
+        self.lock = threading.RLock()
+        self._httpd = None
+        self._thread = None
+
+    # --- lifecycle ---
+
+    def start(self):
+        server = self
+
+        class Handler(_Handler):
+            fake = server
+
+        class Server(ThreadingHTTPServer):
+            # many concurrent conversations open connections at once
+            request_queue_size = 128
+
+        self._httpd = Server(("127.0.0.1", 0), Handler)
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._httpd:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self._httpd.server_address[1]}/v1"
+
+    def client(self, **kwargs):
+        kwargs.setdefault("max_retries", 0)
+        kwargs.setdefault("timeout", 5)
+        return openai.OpenAI(api_key="sk-test", base_url=self.base_url, **kwargs)
+
+    def async_client(self, **kwargs):
+        kwargs.setdefault("max_retries", 0)
+        kwargs.setdefault("timeout", 5)
+        return openai.AsyncOpenAI(api_key="sk-test", base_url=self.base_url, **kwargs)
+
+    def set_script(self, assistant_id, steps):
+        self.scripts[assistant_id] = list(steps)
+
+    # --- objects ---
+
+    def _thread_obj(self, thread_id):
+        return {"id": thread_id, "object": "thread", "created_at": int(time.time()), "metadata": {}}
+
+    def _add_message(self, thread_id, role, content, run_id=None, assistant_id=None, file_ids=None):
+        message = {
+            "id": _new_id("msg"),
+            "object": "thread.message",
+            "created_at": int(time.time()),
+            "thread_id": thread_id,
+            "role": role,
+            "content": [{"type": "text", "text": {"value": content, "annotations": []}}],
+            "file_ids": file_ids or [],
+            "assistant_id": assistant_id,
+            "run_id": run_id,
+            "metadata": {},
+        }
+        self.threads[thread_id]["messages"].append(message)
+        return message
+
+    def _new_run(self, thread_id, assistant_id):
+        run = {
+            "id": _new_id("run"),
+            "object": "thread.run",
+            "created_at": int(time.time()),
+            "thread_id": thread_id,
+            "assistant_id": assistant_id,
+            "status": "queued",
+            "required_action": None,
+            "last_error": None,
+            "expires_at": None,
+            "started_at": None,
+            "cancelled_at": None,
+            "failed_at": None,
+            "completed_at": None,
+            "model": self.assistants.get(assistant_id, {}).get("model", "gpt-4"),
+            "instructions": "",
+            "tools": [],
+            "file_ids": [],
+            "metadata": {},
+            "usage": None,
+            "_step": 0,
+            "_ready_at": time.time() + self.run_delay,
+            "_tool_outputs": [],
+        }
+        self.threads[thread_id]["runs"].append(run)
+        return run
+
+    def _settle(self, run):
+        """Moves a pending run forward once its delay has passed. Returns a newly created message, if any."""
+        if run["status"] not in ("queued", "in_progress"):
+            return None
+        if time.time() < run["_ready_at"]:
+            run["status"] = "in_progress"
+            return None
+
+        steps = self.scripts.get(run["assistant_id"], [{"message": "ok"}])
+        step = steps[min(run["_step"], len(steps) - 1)]
+        if "tool_calls" in step:
+            run["status"] = "requires_action"
+            run["required_action"] = {
+                "type": "submit_tool_outputs",
+                "submit_tool_outputs": {"tool_calls": [
+                    {"id": _new_id("call"), "type": "function", "function": {"name": name, "arguments": arguments}}
+                    for name, arguments in step["tool_calls"]
+                ]},
+            }
+            return None
+
+        run["status"] = "completed"
+        run["required_action"] = None
+        run["completed_at"] = int(time.time())
+        return self._add_message(run["thread_id"], "assistant", step["message"], run_id=run["id"],
+                                 assistant_id=run["assistant_id"])
+
+    def _find_run(self, thread_id, run_id):
+        for run in self.threads[thread_id]["runs"]:
+            if run["id"] == run_id:
+                return run
+        return None
+
+    @staticmethod
+    def public(obj):
+        return {k: v for k, v in obj.items() if not k.startswith("_")}
+
+    @staticmethod
+    def page(items, query):
+        order = query.get("order", ["desc"])[0]
+        limit = int(query.get("limit", [20])[0])
+        items = list(items) if order == "asc" else list(reversed(items))
+        ids = [item["id"] for item in items]
+        if "after" in query and query["after"][0] in ids:
+            items = items[ids.index(query["after"][0]) + 1:]
+        if "before" in query and query["before"][0] in ids:
+            items = items[:ids.index(query["before"][0])]
+        data = items[:limit]
+        return {
+            "object": "list",
+            "data": [FakeOpenAIServer.public(item) for item in data],
+            "first_id": data[0]["id"] if data else None,
+            "last_id": data[-1]["id"] if data else None,
+            "has_more": len(items) > limit,
+        }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    fake: FakeOpenAIServer = None
+
+    routes = [
+        ("POST", r"/v1/assistants", "assistants.create"),
+        ("GET", r"/v1/assistants/(?P<aid>[^/]+)", "assistants.retrieve"),
+        ("POST", r"/v1/assistants/(?P<aid>[^/]+)", "assistants.update"),
+        ("DELETE", r"/v1/assistants/(?P<aid>[^/]+)", "assistants.delete"),
+        ("POST", r"/v1/files", "files.create"),
+        ("DELETE", r"/v1/files/(?P<fid>[^/]+)", "files.delete"),
+        ("POST", r"/v1/threads", "threads.create"),
+        ("GET", r"/v1/threads/(?P<tid>[^/]+)", "threads.retrieve"),
+        ("POST", r"/v1/threads/(?P<tid>[^/]+)/messages", "messages.create"),
+        ("GET", r"/v1/threads/(?P<tid>[^/]+)/messages", "messages.list"),
+        ("POST", r"/v1/threads/(?P<tid>[^/]+)/runs", "runs.create"),
+        ("GET", r"/v1/threads/(?P<tid>[^/]+)/runs", "runs.list"),
+        ("GET", r"/v1/threads/(?P<tid>[^/]+)/runs/(?P<rid>[^/]+)", "runs.retrieve"),
+        ("POST", r"/v1/threads/(?P<tid>[^/]+)/runs/(?P<rid>[^/]+)/submit_tool_outputs", "runs.submit_tool_outputs"),
+    ]
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def do_DELETE(self):
+        self._dispatch("DELETE")
+
+    def _dispatch(self, method):
+        url = urlparse(self.path)
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        body = {}
+        if raw and self.headers.get("Content-Type", "").startswith("application/json"):
+            body = json.loads(raw)
+
+        for route_method, pattern, name in self.routes:
+            match = re.fullmatch(pattern, url.path)
+            if route_method == method and match:
+                fake = self.fake
+                fake.calls[name] += 1
+                if fake.latency:
+                    time.sleep(fake.latency)
+                with fake.lock:
+                    fail = fake.failures[name] > 0
+                    if fail:
+                        fake.failures[name] -= 1
+                if fail:
+                    return self._send_json({"error": {"message": "Internal server error"}}, status=500)
+                handler = getattr(self, "_" + name.replace(".", "_"))
+                with fake.lock:
+                    handler(body=body, query=parse_qs(url.query), raw=raw, **match.groupdict())
+                return
+
+        self._send_json({"error": {"message": f"Unknown route {method} {url.path}"}}, status=404)
+
+    # --- responses ---
+
+    def _send_json(self, payload, status=200):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_event(self, event, data):
+        chunk = f"event: {event}\ndata: {json.dumps(data) if not isinstance(data, str) else data}\n\n".encode()
+        self.wfile.write(f"{len(chunk):x}\r\n".encode() + chunk + b"\r\n")
+        self.wfile.flush()
+
+    def _stream_run(self, run):
+        fake = self.fake
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        if fake.empty_streams:
+            self._send_event("done", "[DONE]")
+            self.wfile.write(b"0\r\n\r\n")
+            self.wfile.flush()
+            return
+        self._send_event("thread.run.created" if run["status"] == "queued" else "thread.run.queued",
+                         fake.public(run))
+
+        # release the lock while the run is "thinking", so that other requests can be served
+        fake.lock.release()
+        try:
+            time.sleep(max(0.0, run["_ready_at"] - time.time()))
+        finally:
+            fake.lock.acquire()
+
+        fake._settle(run)
+        fake._settle(run)
+        if run["status"] == "completed":
+            message = fake.threads[run["thread_id"]]["messages"][-1]
+            self._send_event("thread.message.completed", message)
+        self._send_event(f"thread.run.{run['status']}", fake.public(run))
+        self._send_event("done", "[DONE]")
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+    def _reject_stream(self):
+        self._send_json({"error": {"message": "Unrecognized request argument supplied: stream",
+                                   "type": "invalid_request_error"}}, status=400)
+
+    # --- handlers ---
+
+    def _assistants_create(self, body, **kwargs):
+        assistant = {"id": _new_id("asst"), "object": "assistant", "created_at": int(time.time()),
+                     "name": None, "description": None, "instructions": None, "tools": [], "file_ids": [],
+                     "metadata": {}, "model": "gpt-4"}
+        assistant.update(body)
+        self.fake.assistants[assistant["id"]] = assistant
+        self._send_json(assistant)
+
+    def _assistants_retrieve(self, aid, **kwargs):
+        if aid not in self.fake.assistants:
+            return self._send_json({"error": {"message": "No assistant found"}}, status=404)
+        self._send_json(self.fake.assistants[aid])
+
+    def _assistants_update(self, aid, body, **kwargs):
+        self.fake.assistants[aid].update(body)
+        self._send_json(self.fake.assistants[aid])
+
+    def _assistants_delete(self, aid, **kwargs):
+        self.fake.assistants.pop(aid, None)
+        self._send_json({"id": aid, "object": "assistant.deleted", "deleted": True})
+
+    def _files_create(self, raw, **kwargs):
+        file = {"id": _new_id("file"), "object": "file", "bytes": len(raw), "created_at": int(time.time()),
+                "filename": "upload", "purpose": "assistants", "status": "processed"}
+        self.fake.files[file["id"]] = raw
+        self._send_json(file)
+
+    def _files_delete(self, fid, **kwargs):
+        self.fake.files.pop(fid, None)
+        self._send_json({"id": fid, "object": "file", "deleted": True})
+
+    def _threads_create(self, **kwargs):
+        thread_id = _new_id("thread")
+        self.fake.threads[thread_id] = {"messages": [], "runs": []}
+        self._send_json(self.fake._thread_obj(thread_id))
+
+    def _threads_retrieve(self, tid, **kwargs):
+        self.fake.threads.setdefault(tid, {"messages": [], "runs": []})
+        self._send_json(self.fake._thread_obj(tid))
+
+    def _messages_create(self, tid, body, **kwargs):
+        message = self.fake._add_message(tid, body.get("role", "user"), body.get("content", ""),
+                                         file_ids=body.get("file_ids"))
+        self._send_json(message)
+
+    def _messages_list(self, tid, query, **kwargs):
+        page = self.fake.page(self.fake.threads[tid]["messages"], query)
+        self.fake.calls["messages.list.items"] += len(page["data"])
+        self._send_json(page)
+
+    def _runs_create(self, tid, body, **kwargs):
+        if body.get("stream") and not self.fake.streaming:
+            return self._reject_stream()
+        run = self.fake._new_run(tid, body["assistant_id"])
+        if body.get("stream"):
+            return self._stream_run(run)
+        self._send_json(self.fake.public(run))
+
+    def _runs_list(self, tid, query, **kwargs):
+        for run in self.fake.threads[tid]["runs"]:
+            self.fake._settle(run)
+        self._send_json(self.fake.page(self.fake.threads[tid]["runs"], query))
+
+    def _runs_retrieve(self, tid, rid, **kwargs):
+        run = self.fake._find_run(tid, rid)
+        self.fake._settle(run)
+        self._send_json(self.fake.public(run))
+
+    def _runs_submit_tool_outputs(self, tid, rid, body, **kwargs):
+        if body.get("stream") and not self.fake.streaming:
+            return self._reject_stream()
+        run = self.fake._find_run(tid, rid)
+        run["_tool_outputs"].append(body["tool_outputs"])
+        run["_step"] += 1
+        run["status"] = "queued"
+        run["required_action"] = None
+        run["_ready_at"] = time.time() + self.fake.run_delay
+        if body.get("stream"):
+            return self._stream_run(run)
+        self._send_json(self.fake.public(run))
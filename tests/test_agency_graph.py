@@ -0,0 +1,81 @@
+import unittest
+from unittest import mock
+
+from openai import OpenAI
+
+from agency_swarm import Agency, Agent, set_openai_client
+from agency_swarm.agency.agency_graph import AgencyGraph
+from agency_swarm.util import oai
+
+
+class AgencyGraphTest(unittest.TestCase):
+    def setUp(self):
+        set_openai_client(OpenAI(api_key="sk-test", max_retries=0, timeout=5))
+        self.ceo = Agent(name="CEO")
+        self.dev = Agent(name="Dev")
+        self.va = Agent(name="VA")
+
+    def test_from_chart(self):
+        """it should index agents and connect each agent of a list, except the last one, to the others"""
+        graph = AgencyGraph.from_chart([self.ceo, self.dev, [self.ceo, self.dev, self.va], [self.dev, self.ceo]])
+
+        self.assertIs(graph.ceo, self.ceo)
+        self.assertEqual(graph.agents, [self.ceo, self.dev, self.va])
+        self.assertEqual(graph.main_recipients, [self.ceo, self.dev])
+        self.assertEqual(graph.get_recipient_names("CEO"), ["Dev", "VA"])
+        self.assertEqual(graph.get_recipients("Dev"), [self.ceo, self.va])
+        self.assertEqual(graph.get_recipient_names("VA"), [])
+        self.assertTrue(graph.can_send("Dev", "CEO"))
+        self.assertFalse(graph.can_send("VA", "CEO"))
+        self.assertIs(graph.get_agent("VA"), self.va)
+        self.assertIs(graph.get_agent_by_id(self.va.id), self.va)
+
+    def test_invalid_chart(self):
+        """it should reject invalid charts, unknown agents and duplicate agent names"""
+        for chart in ([], {}, [self.ceo, "Dev"], [[self.ceo, "Dev"]]):
+            with self.assertRaises(Exception):
+                AgencyGraph.from_chart(chart)
+        with self.assertRaises(Exception):
+            AgencyGraph.from_chart([self.ceo]).get_agent("Dev")
+        with self.assertRaises(Exception):
+            AgencyGraph.from_chart([self.ceo, [self.ceo, Agent(name="CEO")]])
+
+    def test_reindex(self):
+        """it should find agents by their new ids after reindexing"""
+        graph = AgencyGraph.from_chart([self.ceo, [self.ceo, self.dev]])
+        temp_id = self.dev.id
+        self.dev.id = "asst_dev"
+
+        graph.reindex()
+
+        self.assertIs(graph.get_agent_by_id("asst_dev"), self.dev)
+        self.assertIsNone(graph.get_agent_by_id(temp_id))
+        self.assertEqual(graph.add_agent(self.dev), 1)
+
+    @mock.patch.object(Agency, "_init_agents")
+    def test_agency(self, _):
+        """it should create threads and tools of the agency from the graph"""
+        agency = Agency([self.ceo, [self.ceo, self.dev], [self.ceo, self.va], [self.dev, self.va]],
+                        async_mode="threading")
+
+        self.assertEqual({name: list(threads) for name, threads in agency.agents_and_threads.items()},
+                         {"CEO": ["Dev", "VA"], "Dev": ["VA"]})
+        thread = agency.agents_and_threads["CEO"]["VA"]
+        self.assertIs(thread.agent, self.ceo)
+        self.assertIs(thread.recipient_agent, self.va)
+
+        send_message = self.ceo.get_function("SendMessage")
+        get_response = self.ceo.get_function("GetResponse")
+        recipients = send_message.model_fields["recipient"].annotation
+        self.assertIs(recipients, get_response.model_fields["recipient"].annotation)
+        self.assertIs(recipients, agency.graph.get_recipients_enum("CEO"))
+        self.assertEqual([r.value for r in recipients], ["Dev", "VA"])
+        self.assertIsNone(self.va.get_function("SendMessage"))
+
+    def tearDown(self):
+        oai.client = None
+        oai.async_client = None
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import json
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from agency_swarm import Agency, Agent, set_openai_client
+from agency_swarm.util import oai
+from tests.fake_openai import FakeOpenAIServer
+
+
+def make_agents(num_agents):
+    return [Agent(name=f"Agent{i}", description=f"Agent number {i}") for i in range(num_agents)]
+
+
+class AgencyInitTest(unittest.TestCase):
+    server = None
+    latency = 0.05
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = FakeOpenAIServer(latency=cls.latency).start()
+        set_openai_client(cls.server.client())
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.settings_path = os.path.join(self.temp_dir, "settings.json")
+        self.server.calls.clear()
+
+    def make_agency(self, num_agents, **kwargs):
+        agents = make_agents(num_agents)
+        return Agency([agents[0]] + [[agents[0], agent] for agent in agents[1:]],
+                      settings_path=self.settings_path, **kwargs)
+
+    def test_parallel_init(self):
+        """it should create and later load all assistants concurrently and save the settings once"""
+        num_agents = 8
+
+        start = time.perf_counter()
+        agency = self.make_agency(num_agents)
+        cold = time.perf_counter() - start
+
+        self.assertEqual(self.server.calls["assistants.create"], num_agents)
+        with open(self.settings_path) as f:
+            settings = json.load(f)
+        self.assertEqual(sorted(s["name"] for s in settings), sorted(a.name for a in agency.agents))
+        self.assertEqual({s["id"] for s in settings}, {a.id for a in agency.agents})
+
+        start = time.perf_counter()
+        agency = self.make_agency(num_agents)
+        warm = time.perf_counter() - start
+
+        self.assertEqual(self.server.calls["assistants.create"], num_agents)
+        self.assertEqual({a.id for a in agency.agents}, {s["id"] for s in settings})
+
+        # one round trip per agent, sequential initialization takes num_agents * latency
+        for elapsed in (cold, warm):
+            self.assertLess(elapsed, num_agents * self.latency)
+
+    def test_settings_callbacks(self):
+        """it should pass the settings between the callbacks without writing the settings file"""
+        saved = []
+        agency = self.make_agency(3, settings_callbacks={"load": lambda: [], "save": saved.append})
+
+        self.assertEqual(len(saved), 1)
+        self.assertEqual({s["id"] for s in saved[0]}, {a.id for a in agency.agents})
+        self.assertFalse(os.path.exists(self.settings_path))
+
+        self.server.calls.clear()
+        self.make_agency(3, settings_callbacks={"load": lambda: saved[0], "save": saved.append})
+        self.assertEqual(self.server.calls["assistants.create"], 0)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+        oai.client = None
+
+
+if __name__ == '__main__':
+    unittest.main()
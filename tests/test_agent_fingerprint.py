@@ -0,0 +1,114 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from pydantic import Field
+
+from agency_swarm import Agent, BaseTool, set_openai_client
+from agency_swarm.agents.agent import FINGERPRINT_METADATA_KEY, MAX_METADATA_KEYS
+from agency_swarm.tools import Retrieval
+from agency_swarm.util import oai
+from tests.fake_openai import FakeOpenAIServer
+
+
+class LookupTool(BaseTool):
+    """Looks up a value."""
+    key: str = Field(..., description="Key to look up.")
+
+    def run(self):
+        return self.key
+
+
+class AgentFingerprintTest(unittest.TestCase):
+    server = None
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = FakeOpenAIServer().start()
+        set_openai_client(cls.server.client())
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.settings_path = os.path.join(self.temp_dir, "settings.json")
+
+    def make_agent(self, **kwargs):
+        kwargs.setdefault("tools", [LookupTool, Retrieval])
+        kwargs.setdefault("metadata", {"team": "a"})
+        agent = Agent(name="FingerprintAgent", **kwargs)
+        agent.settings_path = self.settings_path
+        return agent
+
+    def init_agent(self, **kwargs):
+        self.server.calls.clear()
+        return self.make_agent(**kwargs).init_oai()
+
+    def assistant_calls(self):
+        return {k: v for k, v in self.server.calls.items() if k.startswith("assistants.")}
+
+    def test_fingerprint_is_stable(self):
+        """it should not depend on the order of tools and file ids"""
+        agent1 = self.make_agent(tools=[LookupTool, Retrieval], file_ids=["file-1", "file-2"])
+        agent2 = self.make_agent(tools=[Retrieval, LookupTool], file_ids=["file-2", "file-1"])
+        agent3 = self.make_agent(tools=[LookupTool, Retrieval], file_ids=["file-1", "file-2"], model="gpt-4")
+
+        self.assertEqual(agent1.get_fingerprint(), agent2.get_fingerprint())
+        self.assertNotEqual(agent1.get_fingerprint(), agent3.get_fingerprint())
+
+    def test_unchanged_agent_skips_api_calls(self):
+        """it should load an unchanged agent from the settings without any api calls"""
+        agent = self.init_agent()
+        self.assertEqual(self.assistant_calls(), {"assistants.create": 1})
+        self.assertEqual(self.server.assistants[agent.id]["metadata"][FINGERPRINT_METADATA_KEY],
+                         agent.get_fingerprint())
+
+        loaded = self.init_agent()
+        self.assertEqual(self.assistant_calls(), {})
+        self.assertEqual(loaded.id, agent.id)
+        self.assertEqual(loaded.assistant.instructions, agent.assistant.instructions)
+
+    def test_changed_agent_is_updated(self):
+        """it should update the assistant and the stored fingerprint if the configuration changed"""
+        agent = self.init_agent()
+
+        changed = self.init_agent(instructions="New instructions.")
+        self.assertEqual(self.assistant_calls(), {"assistants.retrieve": 1, "assistants.update": 1})
+        self.assertEqual(changed.id, agent.id)
+        self.assertEqual(self.server.assistants[agent.id]["instructions"], "New instructions.")
+
+        self.init_agent(instructions="New instructions.")
+        self.assertEqual(self.assistant_calls(), {})
+
+    def test_full_metadata(self):
+        """it should compare the parameters of agents whose metadata has no room for the fingerprint"""
+        metadata = {f"key{i}": str(i) for i in range(MAX_METADATA_KEYS)}
+        agent = self.init_agent(metadata=metadata)
+        self.assertEqual(self.server.assistants[agent.id]["metadata"], metadata)
+
+        self.init_agent(metadata=metadata)
+        self.assertEqual(self.assistant_calls(), {"assistants.retrieve": 1})
+
+        self.init_agent(metadata=metadata, instructions="New instructions.")
+        self.assertEqual(self.assistant_calls(), {"assistants.retrieve": 1, "assistants.update": 1})
+
+    def test_check_parameters_ignores_fingerprint(self):
+        """it should compare assistants without the fingerprint metadata"""
+        agent = self.init_agent()
+        settings = agent.assistant.model_dump()
+        settings["metadata"][FINGERPRINT_METADATA_KEY] = "outdated"
+
+        self.assertTrue(agent._check_parameters(settings))
+        agent.model = "gpt-4"
+        self.assertFalse(agent._check_parameters(settings))
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+        oai.client = None
+
+
+if __name__ == '__main__':
+    unittest.main()
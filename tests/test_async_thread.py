@@ -0,0 +1,127 @@
+import asyncio
+import json
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from agency_swarm import Agency, Agent, set_openai_client, set_async_openai_client
+from agency_swarm.threads import AsyncThread
+from agency_swarm.user import User
+from agency_swarm.util import oai
+from tests.fake_openai import FakeOpenAIServer
+
+
+class AsyncThreadTest(unittest.TestCase):
+    server = None
+    agency = None
+    ceo = None
+    agent1 = None
+    temp_dir = None
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = FakeOpenAIServer(run_delay=0.2).start()
+        set_openai_client(cls.server.client())
+        cls.temp_dir = tempfile.mkdtemp()
+
+        cls.ceo = Agent(name="CEO")
+        cls.agent1 = Agent(name="Agent1", description="Test agent")
+        cls.agency = Agency([cls.ceo, [cls.ceo, cls.agent1]],
+                            settings_path=os.path.join(cls.temp_dir, "settings.json"))
+
+    def setUp(self):
+        # each test runs in a new event loop, so the async client must not be shared between tests
+        set_async_openai_client(None)
+        self.agency.async_threads = {}
+
+    def test_aget_completion(self):
+        """it should yield messages of nested agent conversations from the event loop"""
+        self.server.set_script(self.ceo.id, [
+            {"tool_calls": [("SendMessage", json.dumps({"instructions": "say hi", "recipient": "Agent1",
+                                                        "message": "hi"}))]},
+            {"message": "done"},
+        ])
+        self.server.set_script(self.agent1.id, [{"message": "hi from Agent1"}])
+
+        async def collect():
+            return [message async for message in self.agency.aget_completion("start")]
+
+        messages = asyncio.run(collect())
+
+        self.assertEqual(messages[-1].content, "done")
+        self.assertIn("hi from Agent1", [m.content for m in messages])
+        self.assertEqual(self.agency.main_thread.id, self.agency.async_threads[self.agency.main_thread].id)
+
+        runs = self.server.threads[self.agency.main_thread.id]["runs"]
+        self.assertEqual(runs[-1]["_tool_outputs"][0][0]["output"], "hi from Agent1")
+
+    def test_only_final_message(self):
+        """it should only yield the final response if yield_messages is False"""
+        self.server.set_script(self.agent1.id, [{"message": "ok"}])
+
+        async def collect():
+            thread = AsyncThread(User(), self.agent1)
+            return [message async for message in thread.get_completion("hi", yield_messages=False)]
+
+        messages = asyncio.run(collect())
+        self.assertEqual([m.content for m in messages], ["ok"])
+
+    def test_concurrent_conversations(self):
+        """it should run many conversations concurrently on one event loop"""
+        self.server.set_script(self.agent1.id, [{"message": "ok"}])
+        num_threads = 20
+
+        async def converse():
+            thread = AsyncThread(User(), self.agent1)
+            return [message async for message in thread.get_completion("hi", yield_messages=False)]
+
+        async def run_all():
+            return await asyncio.gather(*[converse() for _ in range(num_threads)])
+
+        start = time.perf_counter()
+        results = asyncio.run(run_all())
+        elapsed = time.perf_counter() - start
+
+        self.assertEqual(len(results), num_threads)
+        self.assertTrue(all(r[-1].content == "ok" for r in results))
+        # sequential execution would take at least num_threads * run_delay
+        self.assertLess(elapsed, num_threads * self.server.run_delay / 2)
+
+    def test_aget_completion_async_mode(self):
+        """it should start the task of the recipient from the event loop in async mode"""
+        ceo = Agent(name="AsyncCEO")
+        worker = Agent(name="AsyncWorker", description="Test agent")
+        agency = Agency([ceo, [ceo, worker]], async_mode='threading',
+                        settings_path=os.path.join(self.temp_dir, "async_settings.json"))
+        self.server.set_script(ceo.id, [
+            {"tool_calls": [("SendMessage", json.dumps({"instructions": "say hi", "recipient": "AsyncWorker",
+                                                        "message": "hi"}))]},
+            {"message": "done"},
+        ])
+        self.server.set_script(worker.id, [{"message": "hi from AsyncWorker"}])
+
+        async def collect():
+            return [message async for message in agency.aget_completion("start")]
+
+        messages = asyncio.run(collect())
+        self.assertEqual(messages[-1].content, "done")
+
+        runs = self.server.threads[agency.main_thread.id]["runs"]
+        self.assertIn("Task has started", runs[-1]["_tool_outputs"][0][0]["output"])
+
+        worker_thread = agency.agents_and_threads["AsyncCEO"]["AsyncWorker"]
+        worker_thread.wait(timeout=10)
+        self.assertIn("hi from AsyncWorker", worker_thread.check_status())
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+        shutil.rmtree(cls.temp_dir)
+        oai.client = None
+        oai.async_client = None
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,38 @@
+import json
+import unittest
+
+from agency_swarm.util import oai
+from tests.benchmarks import suite
+
+
+class BenchmarkSuiteTest(unittest.TestCase):
+    def test_benchmarks_run(self):
+        """it should run every benchmark of the suite"""
+        for name, setup in suite.BENCHMARKS.items():
+            with self.subTest(name):
+                setup()()
+
+    def test_compare(self):
+        """it should report regressions, improvements and new benchmarks against a baseline"""
+        def results(**medians):
+            return {"benchmarks": {name: {"median": median} for name, median in medians.items()}}
+
+        baseline = results(slower=1.0, faster=1.0, same=1.0)
+        outcomes = suite.compare(results(slower=1.5, faster=0.5, same=1.1, added=1.0), baseline, threshold=0.25)
+        self.assertEqual(outcomes, {"regressions": ["slower"], "improvements": ["faster"], "unchanged": ["same"],
+                                    "new": ["added"]})
+
+    def test_baseline(self):
+        """it should have a baseline for every benchmark"""
+        with open(suite.BASELINE_PATH) as f:
+            baseline = json.load(f)
+        self.assertEqual(set(baseline["benchmarks"]), set(suite.BENCHMARKS))
+
+    @classmethod
+    def tearDownClass(cls):
+        oai.client = None
+        oai.async_client = None
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,153 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+import unittest
+
+from agency_swarm import Agency, Agent, set_openai_client
+from agency_swarm.threads import Thread
+from agency_swarm.user import User
+from agency_swarm.util import oai, SQLiteConversationStore
+from tests.fake_openai import FakeOpenAIServer
+
+
+class ConversationStoreTest(unittest.TestCase):
+    server = None
+    agent = None
+    temp_dir = None
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = FakeOpenAIServer(run_delay=0.01).start()
+        set_openai_client(cls.server.client())
+        cls.temp_dir = tempfile.mkdtemp()
+
+        cls.agent = Agent(name="StoreAgent", tools=[])
+        cls.agent.settings_path = os.path.join(cls.temp_dir, "settings.json")
+        cls.agent.init_oai()
+
+    def setUp(self):
+        self.server.calls.clear()
+        self.path = os.path.join(self.temp_dir, f"{self._testMethodName}.db")
+
+    def get_completion(self, thread, message):
+        gen = thread.get_completion(message, yield_messages=False)
+        while True:
+            try:
+                next(gen)
+            except StopIteration as e:
+                return e.value
+
+    def test_thread_ids(self):
+        """it should save and load the thread ids of each session"""
+        thread_ids = {"CEO": {"Dev": "thread_1", "VA": "thread_2"}, "main_thread": "thread_0"}
+        with SQLiteConversationStore(self.path) as store:
+            callbacks = store.threads_callbacks("user-1")
+            self.assertIs(callbacks["store"], store)
+            self.assertEqual(callbacks["load"](), {})
+            callbacks["save"](thread_ids)
+            store.threads_callbacks("user-2")["save"]({"main_thread": "thread_3"})
+
+        with SQLiteConversationStore(self.path) as store:
+            self.assertEqual(store.threads_callbacks("user-1")["load"](), thread_ids)
+            self.assertEqual(store.load_thread_ids("user-2"), {"main_thread": "thread_3"})
+
+    def test_resume_from_store(self):
+        """it should record messages and runs, and serve resumed conversations from the store"""
+        with SQLiteConversationStore(self.path) as store:
+            thread = Thread(User(), self.agent)
+            thread.conversation_store = store
+            for i in range(3):
+                self.server.set_script(self.agent.id, [{"message": f"answer {i}"}])
+                self.assertEqual(self.get_completion(thread, f"question {i}"), f"answer {i}")
+            thread_id = thread.id
+
+            runs = store.get_runs(thread_id)
+            self.assertEqual(len(runs), 3)
+            self.assertEqual({run["status"] for run in runs}, {"completed"})
+
+        self.server.calls.clear()
+        with SQLiteConversationStore(self.path) as store:
+            resumed = Thread(User(), self.agent)
+            resumed.conversation_store = store
+            resumed.id = thread_id
+            contents = [m.content[0].text.value for m in resumed.get_messages()]
+
+            self.assertEqual(contents, ["question 0", "answer 0", "question 1", "answer 1", "question 2", "answer 2"])
+            # only the messages after the last stored message were requested
+            self.assertEqual(self.server.calls["messages.list"], 1)
+            self.assertEqual(self.server.calls["messages.list.items"], 0)
+
+    def test_tool_outputs(self):
+        """it should record the tool calls of a run with their outputs"""
+        self.server.set_script(self.agent.id, [{"tool_calls": [("Unknown", "{}")]}, {"message": "done"}])
+        with SQLiteConversationStore(self.path) as store:
+            thread = Thread(User(), self.agent)
+            thread.conversation_store = store
+            self.assertEqual(self.get_completion(thread, "use a tool"), "done")
+
+            run_id = store.get_runs(thread.id)[0]["id"]
+            outputs = store.get_tool_outputs(run_id)
+            self.assertEqual(len(outputs), 1)
+            self.assertEqual(outputs[0]["name"], "Unknown")
+            self.assertIn("Function Unknown not found", outputs[0]["output"])
+
+    def test_concurrent_writes(self):
+        """it should store the writes of many threads in batches"""
+        with SQLiteConversationStore(self.path, batch_size=50) as store:
+            def save(session):
+                for i in range(50):
+                    store.save_thread_ids(f"session-{session}", {"CEO": {f"Agent{i}": f"thread_{session}_{i}"}})
+
+            workers = [threading.Thread(target=save, args=(session,)) for session in range(8)]
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+
+            for session in range(8):
+                self.assertEqual(len(store.load_thread_ids(f"session-{session}")["CEO"]), 50)
+
+    def test_reads_wait_for_own_writes(self):
+        """it should only wait for the pending writes of the session, thread or run that is read"""
+        with SQLiteConversationStore(self.path) as store:
+            store.save_thread_ids("user-1", {"main_thread": "thread_1"})
+            store.flush()
+
+            # the writer waits while another connection holds the write lock
+            blocker = sqlite3.connect(self.path, check_same_thread=False)
+            blocker.execute("BEGIN IMMEDIATE")
+            try:
+                store.save_thread_ids("user-2", {"main_thread": "thread_2"})
+                start = time.perf_counter()
+                self.assertEqual(store.load_thread_ids("user-1"), {"main_thread": "thread_1"})
+                self.assertLess(time.perf_counter() - start, 1)
+            finally:
+                threading.Timer(0.1, blocker.rollback).start()
+
+            self.assertEqual(store.load_thread_ids("user-2"), {"main_thread": "thread_2"})
+            blocker.close()
+
+    def test_agency(self):
+        """it should persist the threads of an agency through threads_callbacks"""
+        ceo = Agent(name="StoreCEO")
+        settings_path = os.path.join(self.temp_dir, "agency_settings.json")
+        with SQLiteConversationStore(self.path) as store:
+            agency = Agency([ceo], threads_callbacks=store.threads_callbacks("user-1"), settings_path=settings_path)
+            self.assertIs(agency.main_thread.conversation_store, store)
+            self.assertEqual(agency.get_completion("hi", yield_messages=False), "ok")
+            self.assertEqual(len(store.get_messages(agency.main_thread.id)), 2)
+            self.assertEqual(store.load_thread_ids("user-1")["main_thread"], agency.main_thread.id)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+        shutil.rmtree(cls.temp_dir)
+        oai.client = None
+        oai.async_client = None
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+import json
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from agency_swarm import Agency, Agent, set_openai_client
+from agency_swarm.util import oai
+from agency_swarm.util.file_uploader import FileUploader, MANIFEST_FILE_NAME, get_file_uploader
+from tests.fake_openai import FakeOpenAIServer
+
+
+class FileUploaderTest(unittest.TestCase):
+    server = None
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = FakeOpenAIServer().start()
+
+    def setUp(self):
+        # a new client gets a new shared uploader, so uploads of other tests are not reused
+        set_openai_client(self.server.client())
+        self.server.calls.clear()
+        self.server.latency = 0
+        self.temp_dir = tempfile.mkdtemp()
+        self.folder = self.make_folder("files", 5)
+
+    def make_folder(self, name, num_files, prefix="file"):
+        folder = os.path.join(self.temp_dir, name)
+        os.makedirs(folder)
+        for i in range(num_files):
+            with open(os.path.join(folder, f"{prefix}{i}.txt"), "w") as f:
+                f.write(f"{name} content {i}")
+        return folder
+
+    def test_upload_folder(self):
+        """it should upload each file once, keep file names and record the uploads in the manifest"""
+        file_ids = FileUploader(max_retries=0).upload_folder(self.folder)
+
+        self.assertEqual(len(set(file_ids)), 5)
+        self.assertEqual(self.server.calls["files.create"], 5)
+        self.assertEqual(sorted(os.listdir(self.folder)),
+                         sorted([MANIFEST_FILE_NAME] + [f"file{i}.txt" for i in range(5)]))
+        with open(os.path.join(self.folder, MANIFEST_FILE_NAME)) as f:
+            manifest = json.load(f)
+        self.assertEqual(sorted(entry["file_id"] for entry in manifest.values()), sorted(file_ids))
+
+        # a new uploader, e.g. in a new process, reads the manifest
+        self.assertEqual(FileUploader().upload_folder(self.folder), file_ids)
+        self.assertEqual(self.server.calls["files.create"], 5)
+
+        # only changed content is uploaded again
+        with open(os.path.join(self.folder, "file0.txt"), "w") as f:
+            f.write("changed")
+        new_file_ids = FileUploader().upload_folder(self.folder)
+        self.assertEqual(self.server.calls["files.create"], 6)
+        self.assertNotEqual(new_file_ids[0], file_ids[0])
+        self.assertEqual(new_file_ids[1:], file_ids[1:])
+
+    def test_concurrent_uploads(self):
+        """it should upload files concurrently"""
+        self.server.latency = 0.1
+        folder = self.make_folder("many", 8)
+
+        start = time.perf_counter()
+        FileUploader(max_workers=8).upload_folder(folder)
+
+        self.assertLess(time.perf_counter() - start, 8 * 0.1 / 2)
+
+    def test_retry(self):
+        """it should retry failed uploads with backoff"""
+        self.server.failures["files.create"] = 2
+        file_ids = FileUploader(oai.client.with_options(max_retries=0), max_workers=1, backoff=0.01) \
+            .upload_folder(self.folder)
+
+        self.assertEqual(len(file_ids), 5)
+        self.assertEqual(self.server.calls["files.create"], 7)
+
+    def test_legacy_file_names(self):
+        """it should reuse file ids of files renamed by earlier versions without uploading them"""
+        os.rename(os.path.join(self.folder, "file0.txt"), os.path.join(self.folder, "file0_file-legacy123.txt"))
+
+        file_ids = FileUploader().upload_folder(self.folder)
+
+        self.assertIn("file-legacy123", file_ids)
+        self.assertEqual(self.server.calls["files.create"], 4)
+
+    def test_shared_files_are_uploaded_once(self):
+        """it should upload the shared files of an agency once for all agents"""
+        shared = self.make_folder("shared", 3, prefix="shared")
+        ceo = Agent(name="CEO", files_folder=self.folder)
+        dev = Agent(name="Dev", files_folder=self.folder)
+        self.assertEqual(self.server.calls["files.create"], 5)
+        self.assertEqual(ceo.file_ids, dev.file_ids)
+
+        Agency([ceo, [ceo, dev]], shared_files=shared, settings_path=os.path.join(self.temp_dir, "settings.json"))
+
+        self.assertEqual(self.server.calls["files.create"], 8)
+        for agent in (ceo, dev):
+            self.assertEqual(len(agent.file_ids), 8)
+            self.assertEqual(len(self.server.assistants[agent.id]["file_ids"]), 8)
+        self.assertIs(get_file_uploader(), get_file_uploader())
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+        oai.client = None
+
+
+if __name__ == '__main__':
+    unittest.main()
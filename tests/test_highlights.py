@@ -0,0 +1,44 @@
+import importlib.util
+import unittest
+
+SELENIUM_INSTALLED = importlib.util.find_spec("selenium") is not None
+
+
+class FakeDriver:
+    def __init__(self, result=None):
+        self.result = result
+        self.scripts = []
+
+    def execute_script(self, script, *args):
+        self.scripts.append((script, args))
+        return self.result
+
+
+@unittest.skipUnless(SELENIUM_INSTALLED, "selenium is not installed")
+class HighlightsTest(unittest.TestCase):
+    def test_highlight(self):
+        """it should highlight and remove highlights in one call each, passing the selector as an argument"""
+        from agency_swarm.agents.browsing.tools.util import highlights
+
+        driver = FakeDriver(result=3)
+        highlights.highlight_elements_with_labels(driver, "a[title='it\\'s']")
+        highlights.remove_highlight_and_labels(driver)
+        self.assertEqual(len(driver.scripts), 2)
+        self.assertEqual(driver.scripts[0][1], ("a[title='it\\'s']",))
+        self.assertIn(highlights.OVERLAY_ID, driver.scripts[1][0])
+
+    def test_get_highlighted_elements(self):
+        """it should read all highlighted elements in one call"""
+        from agency_swarm.agents.browsing.tools.util import get_highlighted_elements
+
+        driver = FakeDriver(result=[[1, "Sign up", "button", None, 10, 20, 80, 30, "element-1", None],
+                                    [2, "", "select", "listbox", 10, 60, 80, 30, "element-2", ["DE", "FR"]]])
+        elements = get_highlighted_elements(driver)
+        self.assertEqual(len(driver.scripts), 1)
+        self.assertEqual(elements[0], {"label": 1, "text": "Sign up", "tag": "button", "role": None, "x": 10, "y": 20,
+                                       "width": 80, "height": 30, "element": "element-1", "options": None})
+        self.assertEqual(elements[1]["options"], ["DE", "FR"])
+
+
+if __name__ == '__main__':
+    unittest.main()
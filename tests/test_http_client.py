@@ -0,0 +1,135 @@
+import asyncio
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+
+from agency_swarm.tools import ToolFactory
+from agency_swarm.util.http_client import HttpClient, get_http_client, set_http_client
+from tests.fake_api import FakeAPIServer
+
+
+class HttpClientTest(unittest.TestCase):
+    server = None
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = FakeAPIServer().start()
+
+    def setUp(self):
+        self.server.reset()
+        self.server.latency = 0
+        self.http_client = HttpClient(backoff=0.01)
+
+    def test_keep_alive(self):
+        """it should reuse one connection for sequential requests"""
+        for i in range(20):
+            response = self.http_client.request("GET", f"{self.server.base_url}/items/{i}")
+            self.assertEqual(response.json()["id"], str(i))
+
+        self.assertEqual(self.server.connections, 1)
+
+    def test_per_host_limit(self):
+        """it should limit the number of concurrent requests per host"""
+        self.server.latency = 0.05
+        http_client = HttpClient(max_connections_per_host=2)
+
+        with ThreadPoolExecutor(max_workers=6) as executor:
+            list(executor.map(lambda i: http_client.request("GET", f"{self.server.base_url}/items/{i}"), range(6)))
+
+        self.assertEqual(self.server.max_concurrency, 2)
+        self.assertLessEqual(self.server.connections, 2)
+
+    def test_retry(self):
+        """it should retry 429 and 5xx responses with backoff and return the last response if all retries fail"""
+        self.server.failures["/items/1"] = 2
+        response = self.http_client.request("GET", f"{self.server.base_url}/items/1")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.server.calls["GET /items/1"], 3)
+
+        self.server.failure_status = 429
+        self.server.failures["/items/2"] = 10
+        response = HttpClient(max_retries=1, backoff=0.01).request("GET", f"{self.server.base_url}/items/2")
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(self.server.calls["GET /items/2"], 2)
+        self.server.failure_status = 503
+
+    def test_non_idempotent_retry(self):
+        """it should retry POST requests only if the server did not process them"""
+        self.server.failures["/items"] = 1
+        response = self.http_client.request("POST", f"{self.server.base_url}/items", json={"name": "test"})
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(self.server.calls["POST /items"], 1)
+
+        self.server.failure_status = 429
+        self.server.failures["/items"] = 1
+        response = self.http_client.request("POST", f"{self.server.base_url}/items", json={"name": "test"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.server.calls["POST /items"], 3)
+        self.server.failure_status = 503
+
+        self.server.latency = 0.5
+        with self.assertRaises(httpx.TimeoutException):
+            HttpClient(timeout=0.1, backoff=0.01).request("POST", f"{self.server.base_url}/items", json={})
+        self.assertEqual(self.server.calls["POST /items"], 4)
+        # let the server finish the abandoned request
+        time.sleep(self.server.latency)
+
+    def test_timeout(self):
+        """it should raise once a request times out on every attempt"""
+        self.server.latency = 0.5
+        http_client = HttpClient(timeout=0.1, max_retries=1, backoff=0.01)
+
+        with self.assertRaises(httpx.TimeoutException):
+            http_client.request("GET", f"{self.server.base_url}/items/1")
+        self.assertEqual(self.server.calls["GET /items/1"], 2)
+
+    def test_async_requests(self):
+        """it should send concurrent async requests over pooled connections"""
+        self.server.latency = 0.05
+
+        async def main():
+            responses = await asyncio.gather(*[
+                self.http_client.arequest("GET", f"{self.server.base_url}/items/{i}") for i in range(10)])
+            await self.http_client.aclose()
+            return responses
+
+        start = time.perf_counter()
+        responses = asyncio.run(main())
+
+        self.assertEqual([r.json()["id"] for r in responses], [str(i) for i in range(10)])
+        self.assertLess(time.perf_counter() - start, 10 * 0.05 / 2)
+
+    def test_openapi_tools(self):
+        """it should send the requests of OpenAPI tools to their own operations through the shared client"""
+        set_http_client(self.http_client)
+        get_item, create_item = ToolFactory.from_openapi_schema(self.server.spec,
+                                                                headers={"Authorization": "Bearer test"},
+                                                                cache_dir=False)
+
+        output = get_item(parameters={"item_id": "42", "fields": "name"}).run()
+        self.assertEqual(output, {"id": "42", "query": {"fields": "name"}, "authorization": "Bearer test"})
+        self.assertEqual(create_item(requestBody={"name": "test"}).run(), {"created": {"name": "test"}})
+
+        # headers without a value, like a missing API key, are not sent
+        get_item, _ = ToolFactory.from_openapi_schema(self.server.spec, headers={"Authorization": None},
+                                                      cache_dir=False)
+        self.assertIsNone(get_item(parameters={"item_id": "1"}).run()["authorization"])
+
+        async_output = asyncio.run(get_item(parameters={"item_id": "7"}).arun())
+        self.assertEqual(async_output["id"], "7")
+        self.assertEqual(self.server.connections, 2)
+        self.assertIs(get_http_client(), self.http_client)
+
+    def tearDown(self):
+        self.http_client.close()
+        set_http_client(None)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+
+if __name__ == '__main__':
+    unittest.main()
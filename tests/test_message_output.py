@@ -0,0 +1,63 @@
+import hashlib
+import pickle
+import unittest
+
+from agency_swarm.messages import MessageOutput
+from agency_swarm.messages.message_output import EMOJIS
+
+
+class Content:
+    def __init__(self):
+        self.calls = 0
+
+    def __str__(self):
+        self.calls += 1
+        return "formatted content"
+
+
+class MessageOutputTest(unittest.TestCase):
+    def test_lazy_content(self):
+        """it should convert the content to a string on first use only"""
+        content = Content()
+        message = MessageOutput("function", "Dev", "CEO", content)
+        self.assertEqual(content.calls, 0)
+
+        self.assertEqual(message.content, "formatted content")
+        self.assertEqual(message.get_formatted_content(), "Dev 🛠️ Executing Function\nformatted content\n")
+        self.assertEqual(content.calls, 1)
+
+    def test_immutable(self):
+        """it should not allow changing or adding attributes"""
+        message = MessageOutput("text", "user", "CEO", "hello")
+
+        with self.assertRaises(AttributeError):
+            message.content = "changed"
+        with self.assertRaises(AttributeError):
+            message.sender_name = "Dev"
+        with self.assertRaises(AttributeError):
+            message.client = None
+        self.assertFalse(hasattr(message, "__dict__"))
+
+    def test_formatting(self):
+        """it should select emojis and colors like before and cache them"""
+        message = MessageOutput("text", "Developer", "CEO", "hello")
+        expected = EMOJIS[int(hashlib.md5(b"developer").hexdigest(), 16) % len(EMOJIS)]
+
+        self.assertEqual(message.get_sender_emoji(), expected)
+        self.assertIs(message.get_formatted_header(), message.get_formatted_header())
+        self.assertEqual(message.get_formatted_header(), "Developer 🗣️ @CEO")
+        self.assertEqual(MessageOutput("text", "user", "CEO", "hi").get_sender_emoji(), "👤")
+        self.assertEqual(MessageOutput("function_output", "Tool", "ceo", "ok").get_sender_emoji(), "🤵")
+        self.assertEqual(MessageOutput("function_output", "Tool", "CEO", "ok").hash_names_to_color(), "dim")
+        self.assertEqual(MessageOutput("system", "Tool", "CEO", "ok").get_sender_emoji(), "🤖")
+
+    def test_pickle(self):
+        """it should be picklable, with the content as a string"""
+        message = pickle.loads(pickle.dumps(MessageOutput("function", "Dev", "CEO", Content())))
+
+        self.assertEqual((message.msg_type, message.sender_name, message.receiver_name, message.content),
+                         ("function", "Dev", "CEO", "formatted content"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,154 @@
+import json
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from agency_swarm import Agent, BaseTool, set_openai_client
+from agency_swarm.threads import Thread
+from agency_swarm.user import User
+from agency_swarm.util import oai, MetricsRegistry, get_metrics_registry, set_metrics_registry
+from agency_swarm.util.metrics import Histogram
+from tests.fake_openai import FakeOpenAIServer
+
+
+class SlowTool(BaseTool):
+    """Sleeps for a moment."""
+
+    def run(self):
+        time.sleep(0.02)
+        return "slept"
+
+
+class FailingTool(BaseTool):
+    """Always fails."""
+
+    def run(self):
+        raise ValueError("broken")
+
+
+class MetricsRegistryTest(unittest.TestCase):
+    def test_histogram(self):
+        """it should count observations in cumulative buckets by label"""
+        histogram = Histogram("latency", labels=("tool",), buckets=(0.1, 1))
+        for value in (0.05, 0.1, 0.5, 5):
+            histogram.observe(value, tool="A")
+        histogram.observe(0.5, tool="B")
+
+        values = {value["labels"]["tool"]: value for value in histogram.snapshot()}
+        self.assertEqual(values["A"]["buckets"], {"0.1": 2, "1": 3, "+Inf": 4})
+        self.assertEqual(values["A"]["count"], 4)
+        self.assertAlmostEqual(values["A"]["sum"], 5.65)
+        self.assertEqual(values["B"]["count"], 1)
+
+    def test_exporters(self):
+        """it should export counters and histograms as prometheus text and json"""
+        registry = MetricsRegistry()
+        registry.inc("agency_swarm_api_calls_total", endpoint="runs.create")
+        registry.inc("agency_swarm_api_calls_total", 2, endpoint="runs.create")
+        registry.observe("agency_swarm_tool_seconds", 0.3, tool='Say "hi"')
+
+        text = registry.to_prometheus()
+        self.assertIn("# TYPE agency_swarm_api_calls_total counter", text)
+        self.assertIn('agency_swarm_api_calls_total{endpoint="runs.create"} 3', text)
+        self.assertIn('agency_swarm_tool_seconds_bucket{tool="Say \\"hi\\"",le="0.25"} 0', text)
+        self.assertIn('agency_swarm_tool_seconds_bucket{tool="Say \\"hi\\"",le="+Inf"} 1', text)
+        self.assertIn('agency_swarm_tool_seconds_count{tool="Say \\"hi\\""} 1', text)
+
+        snapshot = json.loads(registry.to_json())
+        self.assertEqual(snapshot["agency_swarm_api_calls_total"]["values"],
+                         [{"labels": {"endpoint": "runs.create"}, "value": 3}])
+
+        registry.reset()
+        self.assertEqual(registry.snapshot()["agency_swarm_api_calls_total"]["values"], [])
+
+    def test_disabled(self):
+        """it should not record anything when disabled and reject conflicting metric types"""
+        registry = MetricsRegistry(enabled=False)
+        registry.inc("agency_swarm_api_calls_total", endpoint="runs.create")
+        self.assertEqual(registry.counter("agency_swarm_api_calls_total").get(endpoint="runs.create"), 0)
+
+        with self.assertRaises(Exception):
+            registry.histogram("agency_swarm_api_calls_total")
+
+
+class RunMetricsTest(unittest.TestCase):
+    server = None
+    agent = None
+    temp_dir = None
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = FakeOpenAIServer(run_delay=0.05).start()
+        set_openai_client(cls.server.client())
+        cls.temp_dir = tempfile.mkdtemp()
+
+        cls.agent = Agent(name="MetricsAgent", tools=[SlowTool, FailingTool])
+        cls.agent.settings_path = os.path.join(cls.temp_dir, "settings.json")
+        cls.agent.init_oai()
+
+    def setUp(self):
+        self.default_registry = get_metrics_registry()
+        self.registry = MetricsRegistry()
+        set_metrics_registry(self.registry)
+
+    def tearDown(self):
+        set_metrics_registry(self.default_registry)
+
+    def get_completion(self, thread, message):
+        gen = thread.get_completion(message, yield_messages=False)
+        while True:
+            try:
+                next(gen)
+            except StopIteration as e:
+                return e.value
+
+    def test_run_metrics(self):
+        """it should record api calls, run latencies, status times and tool timings of a completion"""
+        self.server.set_script(self.agent.id, [{"tool_calls": [("SlowTool", "{}")]},
+                                               {"tool_calls": [("FailingTool", "{}")]},
+                                               {"message": "done"}])
+        thread = Thread(User(), self.agent)
+        thread.tool_executor = None
+        self.assertEqual(self.get_completion(thread, "work"), "done")
+
+        snapshot = self.registry.snapshot()
+
+        def values(name):
+            return {tuple(value["labels"].values()): value for value in snapshot[name]["values"]}
+
+        api_calls = {key[0]: value["value"] for key, value in values("agency_swarm_api_calls_total").items()}
+        self.assertEqual(api_calls["threads.create"], 1)
+        self.assertEqual(api_calls["messages.create"], 1)
+        self.assertEqual(api_calls["runs.create"], 1)
+        self.assertEqual(api_calls["runs.submit_tool_outputs"], 2)
+        self.assertEqual(values("agency_swarm_completion_api_calls")[("MetricsAgent",)]["sum"],
+                         sum(api_calls.values()))
+
+        self.assertEqual(values("agency_swarm_run_create_seconds")[()]["count"], 1)
+        self.assertEqual(values("agency_swarm_submit_tool_outputs_seconds")[()]["count"], 2)
+        status_times = values("agency_swarm_run_status_seconds")
+        self.assertLessEqual(set(status_times), {("queued",), ("in_progress",)})
+        self.assertGreaterEqual(sum(value["sum"] for value in status_times.values()), 0.1)
+
+        tools = values("agency_swarm_tool_seconds")
+        self.assertGreaterEqual(tools[("SlowTool",)]["sum"], 0.02)
+        self.assertEqual(tools[("FailingTool",)]["count"], 1)
+        self.assertEqual(values("agency_swarm_tool_errors_total"), {("FailingTool",): {
+            "labels": {"tool": "FailingTool"}, "value": 1}})
+
+        completion = values("agency_swarm_completion_seconds")[("MetricsAgent",)]
+        self.assertEqual(completion["count"], 1)
+        self.assertGreaterEqual(completion["sum"], 0.15)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+        shutil.rmtree(cls.temp_dir)
+        oai.client = None
+        oai.async_client = None
+
+
+if __name__ == '__main__':
+    unittest.main()
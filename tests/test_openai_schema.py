@@ -0,0 +1,84 @@
+import json
+import unittest
+from typing import List
+from unittest import mock
+
+from pydantic import BaseModel, Field
+
+from agency_swarm import BaseTool
+from agency_swarm.tools import ToolFactory
+
+
+class Item(BaseModel):
+    name: str = Field(..., description="Name of the item.")
+
+
+class OrderTool(BaseTool):
+    """Places an order."""
+    items: List[Item] = Field(..., description="Items to order.")
+
+    def run(self):
+        return "ordered"
+
+
+class OpenAISchemaTest(unittest.TestCase):
+    def test_schema(self):
+        """it should exclude caller_agent and shared_state from the schema"""
+        schema = OrderTool.openai_schema
+        self.assertEqual(schema["name"], "OrderTool")
+        self.assertEqual(schema["description"], "Places an order.")
+        self.assertEqual(list(schema["parameters"]["properties"]), ["items"])
+        self.assertEqual(schema["parameters"]["required"], ["items"])
+
+    def test_cache_returns_copies(self):
+        """it should generate the schema once and return copies that callers can modify"""
+        with mock.patch.object(OrderTool, "_build_openai_schema", wraps=OrderTool._build_openai_schema) as build:
+            OrderTool.__doc__ = "Places an order now."
+            schema = OrderTool.openai_schema
+            schema["parameters"]["properties"].clear()
+            del schema["parameters"]["$defs"]
+
+            self.assertIn("items", OrderTool.openai_schema["parameters"]["properties"])
+            self.assertIn("$defs", OrderTool.openai_schema["parameters"])
+            self.assertEqual(build.call_count, 1)
+        OrderTool.__doc__ = "Places an order."
+
+    def test_cache_invalidation(self):
+        """it should regenerate the schema when the class changes"""
+        class ChangingTool(BaseTool):
+            """First description."""
+            value: int = Field(..., description="A value.")
+
+            def run(self):
+                return self.value
+
+        self.assertEqual(ChangingTool.openai_schema["description"], "First description.")
+
+        ChangingTool.__doc__ = "Second description."
+        self.assertEqual(ChangingTool.openai_schema["description"], "Second description.")
+
+        ChangingTool.model_fields["value"].description = "A new value."
+        ChangingTool.model_rebuild(force=True)
+        self.assertEqual(ChangingTool.openai_schema["parameters"]["properties"]["value"]["description"],
+                         "A new value.")
+
+    def test_subclass_cache(self):
+        """it should cache schemas per class, not per base class"""
+        class SpecialOrderTool(OrderTool):
+            """Places a special order."""
+
+        self.assertEqual(OrderTool.openai_schema["name"], "OrderTool")
+        self.assertEqual(SpecialOrderTool.openai_schema["name"], "SpecialOrderTool")
+
+    def test_openapi_schema_does_not_mutate(self):
+        """it should move the definitions into components without modifying the tool schema"""
+        schema = json.loads(ToolFactory.get_openapi_schema([OrderTool], "https://example.com"))
+
+        self.assertIn("Item", schema["components"]["schemas"])
+        self.assertNotIn("$defs", schema["paths"]["/OrderTool"]["post"]["requestBody"]["content"]
+                         ["application/json"]["schema"])
+        self.assertIn("$defs", OrderTool.openai_schema["parameters"])
+
+
+if __name__ == '__main__':
+    unittest.main()
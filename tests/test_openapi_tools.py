@@ -0,0 +1,145 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from openai import OpenAI
+from pydantic import ValidationError
+
+from agency_swarm import Agent, set_openai_client
+from agency_swarm.tools import BaseTool, LazyTool, ToolFactory
+from agency_swarm.util import oai
+from agency_swarm.util.openapi import get_openapi_operations
+
+SPEC = {
+    "openapi": "3.1.0",
+    "info": {"title": "Pets", "version": "v1.0.0"},
+    "servers": [{"url": "https://pets.example.com"}],
+    "paths": {
+        "/pets/{pet_id}": {
+            "parameters": [],
+            "get": {
+                "operationId": "GetPet",
+                "description": "Returns a pet.",
+                "parameters": [{"name": "pet_id", "in": "path", "required": True, "description": "Pet id.",
+                                "schema": {"$ref": "#/components/schemas/Id"}}],
+            },
+            "put": {
+                "operationId": "UpdatePet",
+                "summary": "Updates a pet.",
+                "parameters": [{"name": "pet_id", "in": "path", "required": True,
+                                "schema": {"$ref": "#/components/schemas/Id"}}],
+                "requestBody": {"required": True, "content": {"application/json": {
+                    "schema": {"$ref": "#/components/schemas/Pet"}}}},
+            },
+        },
+    },
+    "components": {"schemas": {
+        "Id": {"type": "string"},
+        "Pet": {"type": "object", "title": "Pet", "properties": {"name": {"type": "string"}}, "required": ["name"]},
+    }},
+}
+
+
+class OpenAPIToolsTest(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+
+    def test_operations(self):
+        """it should resolve references and skip path level keys that are not operations"""
+        operations = get_openapi_operations(SPEC, cache_dir=False)
+
+        self.assertEqual([(o["url"], o["method"]) for o in operations],
+                         [("https://pets.example.com/pets/{pet_id}", "get"),
+                          ("https://pets.example.com/pets/{pet_id}", "put")])
+        get_pet = operations[0]["function"]
+        self.assertEqual(get_pet["name"], "GetPet")
+        self.assertEqual(get_pet["parameters"]["properties"]["parameters"],
+                         {"type": "object", "properties": {"pet_id": {"type": "string", "description": "Pet id.",
+                                                                      "required": True}}})
+        update_pet = operations[1]["function"]
+        self.assertEqual(update_pet["description"], "Updates a pet.")
+        self.assertNotIn("required", update_pet["parameters"])
+        self.assertEqual(update_pet["parameters"]["properties"]["requestBody"]["properties"],
+                         {"name": {"type": "string"}})
+        # the shared component is not modified by the parameter keywords
+        self.assertEqual(update_pet["parameters"]["properties"]["parameters"]["properties"]["pet_id"],
+                         {"type": "string", "required": True})
+        self.assertEqual(SPEC["components"]["schemas"]["Id"], {"type": "string"})
+
+    def test_recursive_reference(self):
+        """it should reject recursive references"""
+        spec = json.loads(json.dumps(SPEC))
+        spec["components"]["schemas"]["Pet"]["properties"]["parent"] = {"$ref": "#/components/schemas/Pet"}
+
+        with self.assertRaises(ValueError):
+            get_openapi_operations(spec, cache_dir=False)
+
+    def test_lazy_tools(self):
+        """it should build the model of a lazy tool once, on first use"""
+        get_pet, update_pet = ToolFactory.from_openapi_schema(SPEC, cache_dir=self.cache_dir)
+        self.assertTrue(issubclass(get_pet, LazyTool))
+        self.assertEqual(get_pet.__name__, "GetPet")
+
+        set_openai_client(OpenAI(api_key="sk-test", max_retries=0, timeout=5))
+        agent = Agent(name="PetAgent", tools=[get_pet, update_pet])
+        self.assertEqual([t["function"]["name"] for t in agent.get_oai_tools()], ["GetPet", "UpdatePet"])
+        self.assertIsNone(get_pet.tool_class)
+
+        tool = agent.get_function("GetPet").model_validate_json('{"parameters": {"pet_id": "1"}}')
+        self.assertIsInstance(tool, BaseTool)
+        self.assertEqual(tool.model_dump()["parameters"], {"pet_id": "1"})
+        self.assertTrue(hasattr(tool, "arun"))
+        tool_class = get_pet.tool_class
+        self.assertIsNotNone(tool_class)
+
+        self.assertIsInstance(get_pet(parameters={"pet_id": "2"}), tool_class)
+        self.assertIs(get_pet.materialize(), tool_class)
+        self.assertIsNone(update_pet.tool_class)
+
+        with self.assertRaises(ValidationError):
+            update_pet(parameters={"pet_id": 1})
+
+    def test_eager_tools(self):
+        """it should build all models when lazy is False"""
+        tools = ToolFactory.from_openapi_schema(SPEC, lazy=False, cache_dir=False)
+
+        self.assertFalse(any(issubclass(tool, LazyTool) for tool in tools))
+        self.assertEqual(tools[0](parameters={"pet_id": "1"}).model_dump()["parameters"], {"pet_id": "1"})
+
+    def test_cache(self):
+        """it should reuse parsed operations of the same schema from disk"""
+        operations = get_openapi_operations(json.dumps(SPEC), cache_dir=self.cache_dir)
+        self.assertEqual(len(os.listdir(self.cache_dir)), 1)
+
+        with mock.patch("agency_swarm.util.openapi.parse_openapi_operations") as parse:
+            self.assertEqual(get_openapi_operations(json.dumps(SPEC), cache_dir=self.cache_dir), operations)
+            parse.assert_not_called()
+
+        spec = json.loads(json.dumps(SPEC))
+        spec["servers"][0]["url"] = "https://new.example.com"
+        operations = get_openapi_operations(json.dumps(spec), cache_dir=self.cache_dir)
+        self.assertEqual(operations[0]["url"], "https://new.example.com/pets/{pet_id}")
+        self.assertEqual(len(os.listdir(self.cache_dir)), 2)
+
+    def test_cache_opt_in(self):
+        """it should only cache parsed operations by default if AGENCY_SWARM_CACHE_DIR is set"""
+        with mock.patch.dict(os.environ, {"AGENCY_SWARM_CACHE_DIR": ""}), \
+                mock.patch("agency_swarm.util.openapi.tempfile.mkstemp") as mkstemp:
+            ToolFactory.from_openapi_schema(SPEC)
+            mkstemp.assert_not_called()
+
+        with mock.patch.dict(os.environ, {"AGENCY_SWARM_CACHE_DIR": self.cache_dir}):
+            ToolFactory.from_openapi_schema(SPEC)
+        self.assertEqual(len(os.listdir(os.path.join(self.cache_dir, "openapi"))), 1)
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+        oai.client = None
+        oai.async_client = None
+
+
+if __name__ == '__main__':
+    unittest.main()
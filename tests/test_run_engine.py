@@ -0,0 +1,142 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from pydantic import Field
+
+from agency_swarm import Agent, BaseTool, set_openai_client
+from agency_swarm.threads import Thread
+from agency_swarm.threads.run_engine import RunEngine, iter_sse_events
+from agency_swarm.user import User
+from agency_swarm.util import oai
+from tests.fake_openai import FakeOpenAIServer
+
+
+class EchoTool(BaseTool):
+    """Echoes the given text."""
+    text: str = Field(..., description="Text to echo.")
+
+    def run(self):
+        return self.text
+
+
+class RunEngineTest(unittest.TestCase):
+    server = None
+    agent = None
+    temp_dir = None
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = FakeOpenAIServer(run_delay=0.1).start()
+        set_openai_client(cls.server.client())
+        cls.temp_dir = tempfile.mkdtemp()
+
+        cls.agent = Agent(name="EchoAgent", tools=[EchoTool])
+        cls.agent.settings_path = os.path.join(cls.temp_dir, "settings.json")
+        cls.agent.init_oai()
+
+    def setUp(self):
+        self.server.streaming = True
+        self.server.empty_streams = False
+        self.server.calls.clear()
+        self.server.set_script(self.agent.id, [{"message": "ok"}])
+
+    def get_completion(self, thread, message="hi"):
+        gen = thread.get_completion(message, yield_messages=False)
+        while True:
+            try:
+                next(gen)
+            except StopIteration as e:
+                return e.value
+
+    def test_streamed_run_does_not_poll(self):
+        """it should settle runs from the event stream without calling runs.retrieve"""
+        thread = Thread(User(), self.agent)
+
+        self.assertEqual(self.get_completion(thread), "ok")
+        self.assertEqual(self.server.calls["runs.retrieve"], 0)
+        self.assertEqual(thread.run.status, "completed")
+
+    def test_streamed_tool_calls(self):
+        """it should submit tool outputs over the stream and continue to completion"""
+        self.server.set_script(self.agent.id, [
+            {"tool_calls": [("EchoTool", '{"text": "first"}'), ("EchoTool", '{"text": "second"}')]},
+            {"message": "done"},
+        ])
+        thread = Thread(User(), self.agent)
+
+        self.assertEqual(self.get_completion(thread), "done")
+        outputs = self.server.threads[thread.id]["runs"][-1]["_tool_outputs"][0]
+        self.assertEqual([o["output"] for o in outputs], ["first", "second"])
+        self.assertEqual(self.server.calls["runs.retrieve"], 0)
+
+    def test_fallback_to_polling(self):
+        """it should disable streaming and poll with backoff if the endpoint rejects stream=True"""
+        self.server.streaming = False
+        thread = Thread(User(), self.agent)
+
+        self.assertEqual(self.get_completion(thread), "ok")
+        self.assertFalse(thread.run_engine.stream)
+        self.assertGreater(self.server.calls["runs.retrieve"], 0)
+
+    def test_empty_stream(self):
+        """it should poll the accepted run instead of creating it again if the stream ends without events"""
+        self.server.set_script(self.agent.id, [
+            {"tool_calls": [("EchoTool", '{"text": "first"}')]},
+            {"message": "done"},
+        ])
+        self.server.empty_streams = True
+        thread = Thread(User(), self.agent)
+
+        self.assertEqual(self.get_completion(thread), "done")
+        self.assertEqual(len(self.server.threads[thread.id]["runs"]), 1)
+        self.assertEqual(self.server.calls["runs.create"], 1)
+        self.assertTrue(thread.run_engine.stream)
+
+    def test_adaptive_backoff(self):
+        """it should grow the polling interval while the run status does not change"""
+        self.server.streaming = False
+        self.server.run_delay = 1.0
+        try:
+            thread = Thread(User(), self.agent)
+            thread.run_engine = RunEngine(thread.client, stream=False, poll_interval=0.01, max_poll_interval=0.2)
+            self.assertEqual(self.get_completion(thread), "ok")
+        finally:
+            self.server.run_delay = 0.1
+
+        # a fixed 10 ms interval would need ~100 requests
+        self.assertLess(self.server.calls["runs.retrieve"], 20)
+
+    def test_latency_against_fixed_polling(self):
+        """it should settle a run faster than the previous fixed 0.5s polling loop"""
+        fixed_thread = Thread(User(), self.agent)
+        fixed_thread.run_engine = RunEngine(fixed_thread.client, stream=False, poll_interval=0.5, backoff_factor=1)
+        streamed_thread = Thread(User(), self.agent)
+
+        start = time.perf_counter()
+        self.get_completion(fixed_thread)
+        fixed_latency = time.perf_counter() - start
+
+        start = time.perf_counter()
+        self.get_completion(streamed_thread)
+        streamed_latency = time.perf_counter() - start
+
+        self.assertLess(streamed_latency, fixed_latency)
+
+    def test_iter_sse_events(self):
+        lines = ["event: thread.run.created", 'data: {"a": 1}', "", ": keep-alive", "",
+                 "event: done", "data: [DONE]", ""]
+        self.assertEqual(list(iter_sse_events(lines)),
+                         [("thread.run.created", '{"a": 1}'), ("done", "[DONE]")])
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+        shutil.rmtree(cls.temp_dir)
+        oai.client = None
+
+
+if __name__ == '__main__':
+    unittest.main()
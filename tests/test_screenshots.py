@@ -0,0 +1,84 @@
+import base64
+import importlib.util
+import unittest
+
+from agency_swarm.util import MetricsRegistry, get_metrics_registry, set_metrics_registry
+
+SELENIUM_INSTALLED = importlib.util.find_spec("selenium") is not None
+
+# 1x1 white PNG
+PNG_IMAGE = base64.b64decode("iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAIAAACQd1PeAAAADElEQVR4nGP4//8/AAX+Av4N70a4AAAAAElFTkSuQmCC")
+
+
+class FakeChrome:
+    """Driver with a 960x1080 viewport at a device pixel ratio of 2, scrolled down by 500 pixels."""
+
+    def __init__(self, screenshot=b"jpeg image", devtools=True):
+        self.screenshot = screenshot
+        self.devtools = devtools
+        self.commands = []
+        self.png_screenshots = 0
+
+    def execute_cdp_cmd(self, command, params):
+        if not self.devtools:
+            raise Exception("not a chromium driver")
+        self.commands.append((command, params))
+        if command == "Page.getLayoutMetrics":
+            return {"cssVisualViewport": {"pageX": 0, "pageY": 500, "clientWidth": 960, "clientHeight": 1080},
+                    "visualViewport": {"pageX": 0, "pageY": 500, "clientWidth": 1920, "clientHeight": 2160}}
+        return {"data": base64.b64encode(self.screenshot).decode()}
+
+    def get_screenshot_as_png(self):
+        self.png_screenshots += 1
+        return PNG_IMAGE
+
+
+@unittest.skipUnless(SELENIUM_INSTALLED, "selenium is not installed")
+class ScreenshotTest(unittest.TestCase):
+    def setUp(self):
+        self.default_registry = get_metrics_registry()
+        self.registry = MetricsRegistry()
+        set_metrics_registry(self.registry)
+
+    def test_devtools_capture(self):
+        """it should let chrome downscale and encode the viewport and record the size of each screenshot"""
+        from agency_swarm.agents.browsing.tools.util import get_screenshot_data_url
+
+        wd = FakeChrome()
+        self.assertEqual(get_screenshot_data_url(wd), "data:image/jpeg;base64,anBlZyBpbWFnZQ==")
+        params = wd.commands[-1][1]
+        self.assertEqual(params["format"], "jpeg")
+        self.assertEqual(params["clip"]["y"], 500)
+        # 1080 CSS pixels at a device pixel ratio of 2 fit in 1024 pixels
+        self.assertAlmostEqual(params["clip"]["scale"], 1024 / 2160)
+
+        get_screenshot_data_url(wd)
+        snapshot = self.registry.snapshot()
+        self.assertEqual(snapshot["agency_swarm_screenshot_bytes"]["values"][0]["count"], 2)
+        # screenshots encoded by chrome are not cached
+        self.assertNotIn("agency_swarm_screenshot_cache_hits_total", snapshot)
+
+    def test_fallback(self):
+        """it should fall back to a regular screenshot without the devtools protocol"""
+        from agency_swarm.agents.browsing.tools.util import capture_screenshot
+
+        wd = FakeChrome(devtools=False)
+        mime_type, screenshot = capture_screenshot(wd)
+        self.assertEqual(wd.png_screenshots, 1)
+        # encoded as jpeg if pillow is installed, as captured otherwise
+        if importlib.util.find_spec("PIL") is None:
+            self.assertEqual((mime_type, base64.b64decode(screenshot)), ("image/png", PNG_IMAGE))
+        else:
+            self.assertEqual(mime_type, "image/jpeg")
+
+        # the encoded image of an unchanged page comes from the cache
+        self.assertEqual(capture_screenshot(wd), (mime_type, screenshot))
+        snapshot = self.registry.snapshot()
+        self.assertEqual(snapshot["agency_swarm_screenshot_cache_hits_total"]["values"][0]["value"], 1)
+
+    def tearDown(self):
+        set_metrics_registry(self.default_registry)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from agency_swarm.util.settings_store import SettingsStore
+
+
+def assistant(assistant_id, name, **kwargs):
+    return {"id": assistant_id, "name": name, **kwargs}
+
+
+class SettingsStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, "settings.json")
+
+    def read(self):
+        with open(self.path) as f:
+            return json.load(f)
+
+    def test_index(self):
+        """it should load the settings once and look them up by name and id"""
+        with open(self.path, "w") as f:
+            json.dump([assistant("asst_1", "CEO"), assistant("asst_2", "Dev")], f)
+
+        store = SettingsStore(self.path)
+        with mock.patch.object(store, "_read_file", wraps=store._read_file) as read_file:
+            self.assertEqual(store.get_by_name("Dev")["id"], "asst_2")
+            self.assertEqual(store.get_by_id("asst_1")["name"], "CEO")
+            self.assertIsNone(store.get_by_name("Missing"))
+            self.assertEqual(read_file.call_count, 1)
+
+    def test_batch(self):
+        """it should write all changes of a batch once and atomically"""
+        store = SettingsStore(self.path)
+        with mock.patch.object(store, "_write_file", wraps=store._write_file) as write_file:
+            with store.batch():
+                with ThreadPoolExecutor(max_workers=8) as executor:
+                    list(executor.map(lambda i: store.upsert(assistant(f"asst_{i}", f"Agent{i}")), range(20)))
+                store.upsert(assistant("asst_0", "Agent0", model="gpt-4"))
+                store.delete("asst_1")
+                self.assertFalse(os.path.exists(self.path))
+
+            self.assertEqual(write_file.call_count, 1)
+
+        settings = self.read()
+        self.assertEqual(len(settings), 19)
+        self.assertEqual(store.get_by_id("asst_0")["model"], "gpt-4")
+        self.assertNotIn("asst_1", [s["id"] for s in settings])
+        self.assertEqual([f for f in os.listdir(self.temp_dir) if f.endswith(".tmp")], [])
+
+    def test_merge_concurrent_writers(self):
+        """it should keep the changes of other stores sharing the same file"""
+        store1 = SettingsStore(self.path)
+        store2 = SettingsStore(self.path)
+        store1.load()
+        store2.load()
+
+        store1.upsert(assistant("asst_1", "CEO"))
+        store2.upsert(assistant("asst_2", "Dev"))
+        store1.upsert(assistant("asst_1", "CEO", model="gpt-4"))
+
+        settings = self.read()
+        self.assertEqual([s["id"] for s in settings], ["asst_1", "asst_2"])
+        self.assertEqual(settings[0]["model"], "gpt-4")
+
+    @unittest.skipIf(os.name == "nt", "file modes are not supported on Windows")
+    def test_file_mode_and_lock(self):
+        """it should keep the mode of the settings file and leave no lock file in its folder"""
+        with open(self.path, "w") as f:
+            json.dump([], f)
+        os.chmod(self.path, 0o644)
+
+        SettingsStore(self.path).upsert(assistant("asst_1", "CEO"))
+
+        self.assertEqual(os.stat(self.path).st_mode & 0o777, 0o644)
+        self.assertEqual(os.listdir(self.temp_dir), ["settings.json"])
+
+        # a new settings file gets the mode of files created with open()
+        new_path = os.path.join(self.temp_dir, "new.json")
+        SettingsStore(new_path).upsert(assistant("asst_1", "CEO"))
+        reference_path = os.path.join(self.temp_dir, "reference.json")
+        open(reference_path, "w").close()
+        self.assertEqual(os.stat(new_path).st_mode & 0o777, os.stat(reference_path).st_mode & 0o777)
+
+    def test_callbacks(self):
+        """it should load and save the settings through the callbacks instead of the settings file"""
+        saved = []
+        store = SettingsStore(self.path, {"load": lambda: [assistant("asst_1", "CEO")], "save": saved.append})
+
+        with store.batch():
+            store.upsert(assistant("asst_2", "Dev"))
+            store.upsert(assistant("asst_3", "VA"))
+
+        self.assertEqual(len(saved), 1)
+        self.assertEqual([s["id"] for s in saved[0]], ["asst_1", "asst_2", "asst_3"])
+        self.assertFalse(os.path.exists(self.path))
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,156 @@
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+from agency_swarm import Agency, Agent, set_openai_client
+from agency_swarm.threads.thread_async import ThreadAsync
+from agency_swarm.threads.worker_pool import WorkerPool
+from agency_swarm.user import User
+from agency_swarm.util import oai
+from tests.fake_openai import FakeOpenAIServer
+
+
+class ThreadAsyncTest(unittest.TestCase):
+    server = None
+    agent = None
+    temp_dir = None
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = FakeOpenAIServer(run_delay=0.05).start()
+        set_openai_client(cls.server.client())
+        cls.temp_dir = tempfile.mkdtemp()
+
+        cls.agent = Agent(name="Worker")
+        cls.agent.settings_path = os.path.join(cls.temp_dir, "settings.json")
+        cls.agent.init_oai()
+
+    def setUp(self):
+        self.server.calls.clear()
+
+    def test_status_from_memory(self):
+        """it should answer status checks from the local future without API calls"""
+        self.server.set_script(self.agent.id, [{"message": "done"}])
+        thread = ThreadAsync(User(), self.agent, worker_pool=WorkerPool(2), max_queue_size=0)
+
+        self.assertIn("Task has started", thread.get_completion_async("task"))
+        self.assertIn("was not received", thread.get_completion_async("another task"))
+        self.assertIn("not completed yet", thread.check_status())
+        self.assertEqual(thread.wait(5), "Worker's Response: 'done'")
+
+        calls = sum(self.server.calls.values())
+        for _ in range(3):
+            self.assertEqual(thread.check_status(), "Worker's Response: 'done'")
+        self.assertEqual(sum(self.server.calls.values()), calls)
+        self.assertEqual(self.server.calls["runs.list"], 0)
+
+    def test_message_queue(self):
+        """it should queue messages while busy, combine them into the next task and reject them when the queue is full"""
+        self.server.set_script(self.agent.id, [{"message": "first"}])
+        thread = ThreadAsync(User(), self.agent, worker_pool=WorkerPool(2), max_queue_size=2)
+        queued = []
+
+        def next_script(*args):
+            self.server.set_script(self.agent.id, [{"message": "second"}])
+
+        self.assertIn("Task has started", thread.get_completion_async("task", callback=next_script))
+        self.assertIn("queued at position 1", thread.get_completion_async("one", ["file-1"]))
+        self.assertIn("queued at position 2",
+                      thread.get_completion_async("two", ["file-2"], callback=lambda *args: queued.append(args)))
+        self.assertTrue(thread.queue_full)
+        self.assertIn("was not received", thread.get_completion_async("three"))
+        self.assertIn("not completed yet", thread.check_status())
+
+        self.assertEqual(thread.wait(5), "Worker's Response: 'second'")
+        self.assertEqual(thread.queue_depth, 0)
+        self.assertEqual(queued, [(thread, "Worker's Response: 'second'", None)])
+        self.assertEqual(self.server.calls["runs.create"], 2)
+        self.assertEqual((thread.queued_messages, thread.rejected_messages, thread.coalesced_tasks), (2, 1, 1))
+
+        user_messages = [m for m in self.server.threads[thread.id]["messages"] if m["role"] == "user"]
+        self.assertEqual([m["content"][0]["text"]["value"] for m in user_messages], ["task", "one\n\ntwo"])
+        self.assertEqual(user_messages[1]["file_ids"], ["file-1", "file-2"])
+
+    def test_completion_callbacks(self):
+        """it should notify completion callbacks with the response or the error"""
+        thread = ThreadAsync(User(), self.agent, worker_pool=WorkerPool(2))
+        results = []
+        completed = threading.Event()
+
+        def callback(t, response, error):
+            results.append((t, response, error))
+            if len(results) == 2:
+                completed.set()
+
+        thread.add_completion_callback(callback)
+        self.server.set_script(self.agent.id, [{"message": "first"}])
+        thread.get_completion_async("task", callback=callback)
+        self.assertTrue(completed.wait(5))
+        self.assertEqual(results, [(thread, "Worker's Response: 'first'", None)] * 2)
+
+        results.clear()
+        completed.clear()
+        self.server.failures["runs.create"] = 1
+        thread.get_completion_async("failing task", callback=callback)
+        self.assertTrue(completed.wait(5))
+        self.assertEqual(len(results), 2)
+        self.assertIsNone(results[0][1])
+        self.assertIsNotNone(results[0][2])
+        self.assertIn("Agent run failed", thread.check_status())
+
+    def test_bounded_pool(self):
+        """it should run at most max_workers tasks at once and report saturation and queue wait"""
+        pool = WorkerPool(max_workers=2)
+        threads = [ThreadAsync(User(), self.agent, worker_pool=pool) for _ in range(4)]
+
+        for thread in threads:
+            thread.get_completion_async("task")
+        for thread in threads:
+            self.assertEqual(thread.wait(5), "Worker's Response: 'ok'")
+
+        metrics = pool.get_metrics()
+        self.assertEqual(metrics["submitted"], 4)
+        self.assertEqual(metrics["completed"], 4)
+        self.assertEqual(metrics["peak_active"], 2)
+        self.assertEqual(metrics["saturated"], 2)
+        self.assertGreater(metrics["queue_wait_max"], 0.05)
+        self.assertEqual(metrics["active"], 0)
+
+    def test_agency(self):
+        """it should run the threads of an agency in async mode on its worker pool"""
+        ceo = Agent(name="AsyncCEO")
+        dev = Agent(name="AsyncDev")
+        agency = Agency([ceo, [ceo, dev]], async_mode="threading",
+                        settings_path=os.path.join(self.temp_dir, "agency_settings.json"))
+        responses = []
+        completed = threading.Event()
+
+        def callback(t, response, error):
+            responses.append(response)
+            completed.set()
+
+        agency.add_async_completion_callback(callback)
+
+        thread = agency.agents_and_threads["AsyncCEO"]["AsyncDev"]
+        self.assertIs(thread.worker_pool, agency.worker_pool)
+        thread.get_completion_async("task")
+        self.assertEqual(thread.wait(5), "AsyncDev's Response: 'ok'")
+        self.assertTrue(completed.wait(5))
+        self.assertEqual(responses, ["AsyncDev's Response: 'ok'"])
+        metrics = agency.get_async_metrics()
+        self.assertEqual(metrics["completed"], 1)
+        self.assertEqual(metrics["pending_messages"], 0)
+        self.assertEqual(thread.max_queue_size, Agency.async_max_queue_size)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+        shutil.rmtree(cls.temp_dir)
+        oai.client = None
+        oai.async_client = None
+
+
+if __name__ == '__main__':
+    unittest.main()
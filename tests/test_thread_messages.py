@@ -0,0 +1,143 @@
+import asyncio
+import os
+import shutil
+import tempfile
+import unittest
+
+from agency_swarm import Agent, set_openai_client, set_async_openai_client
+from agency_swarm.threads import Thread, AsyncThread
+from agency_swarm.threads.thread_async import ThreadAsync
+from agency_swarm.user import User
+from agency_swarm.util import oai
+from tests.fake_openai import FakeOpenAIServer
+
+
+class ThreadMessagesTest(unittest.TestCase):
+    server = None
+    agent = None
+    temp_dir = None
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = FakeOpenAIServer(run_delay=0.01).start()
+        set_openai_client(cls.server.client())
+        cls.temp_dir = tempfile.mkdtemp()
+
+        cls.agent = Agent(name="HistoryAgent")
+        cls.agent.settings_path = os.path.join(cls.temp_dir, "settings.json")
+        cls.agent.init_oai()
+
+    def setUp(self):
+        set_async_openai_client(None)
+        self.server.calls.clear()
+
+    def get_completion(self, thread, message):
+        gen = thread.get_completion(message, yield_messages=False)
+        while True:
+            try:
+                next(gen)
+            except StopIteration as e:
+                return e.value
+
+    def test_incremental_retrieval(self):
+        """it should only fetch the messages created since the last completion"""
+        thread = Thread(User(), self.agent)
+        for i in range(5):
+            self.server.set_script(self.agent.id, [{"message": f"answer {i}"}])
+            self.assertEqual(self.get_completion(thread, f"question {i}"), f"answer {i}")
+
+        # every message is fetched exactly once: 5 questions and 5 answers
+        self.assertEqual(self.server.calls["messages.list.items"], 10)
+        self.assertEqual(self.server.calls["messages.list"], 5)
+
+        contents = [m.content[0].text.value for m in thread.get_messages()]
+        self.assertEqual(contents[-2:], ["question 4", "answer 4"])
+        self.assertEqual(len(contents), 10)
+        self.assertEqual(self.server.calls["messages.list.items"], 10)
+
+    def test_paging_and_reset(self):
+        """it should page through long histories and reset the cache if the thread id changes"""
+        thread = Thread(User(), self.agent)
+        thread.init_thread()
+        for i in range(7):
+            thread.client.beta.threads.messages.create(thread_id=thread.id, role="user", content=str(i))
+        thread.messages_page_size = 3
+
+        self.assertEqual([m.content[0].text.value for m in thread.get_messages()], [str(i) for i in range(7)])
+        self.assertEqual(thread.sync_messages(), [])
+
+        other = Thread(User(), self.agent)
+        other.init_thread()
+        thread.id = other.id
+        self.assertEqual(thread.get_messages(), [])
+
+    def test_abandoned_completion(self):
+        """it should fail instead of blocking when a completion of the same thread is still suspended"""
+        thread = Thread(User(), self.agent)
+        self.server.set_script(self.agent.id, [{"message": "first"}])
+        abandoned = thread.get_completion("question")
+        next(abandoned)
+
+        with self.assertRaises(Exception) as error:
+            self.get_completion(thread, "another question")
+        self.assertIn("already in progress", str(error.exception))
+
+        abandoned.close()
+        self.server.set_script(self.agent.id, [{"message": "second"}])
+        self.assertEqual(self.get_completion(thread, "another question"), "second")
+
+    def test_resumed_thread(self):
+        """it should start the cache of a resumed thread at its last message instead of fetching its history"""
+        thread = Thread(User(), self.agent)
+        thread.init_thread()
+        for i in range(7):
+            thread.client.beta.threads.messages.create(thread_id=thread.id, role="user", content=str(i))
+        self.server.calls.clear()
+
+        resumed = Thread(User(), self.agent)
+        resumed.id = thread.id
+        resumed.messages_page_size = 3
+        self.server.set_script(self.agent.id, [{"message": "answer"}])
+        self.assertEqual(self.get_completion(resumed, "question"), "answer")
+
+        # the last message of the history, then the question and the answer
+        self.assertEqual(self.server.calls["messages.list.items"], 3)
+        self.assertEqual([m.content[0].text.value for m in resumed.get_messages()], ["6", "question", "answer"])
+
+    def test_async_check_status(self):
+        """it should read the response of ThreadAsync from the message cache"""
+        self.server.set_script(self.agent.id, [{"message": "async answer"}])
+        thread = ThreadAsync(User(), self.agent)
+        thread.get_completion_async("question")
+        thread.future.result()
+
+        self.assertEqual(thread.check_status(), "HistoryAgent's Response: 'async answer'")
+        self.assertEqual(self.server.calls["messages.list.items"], 2)
+
+    def test_async_thread(self):
+        """it should fetch messages incrementally in AsyncThread"""
+
+        async def converse():
+            thread = AsyncThread(User(), self.agent)
+            responses = []
+            for i in range(3):
+                self.server.set_script(self.agent.id, [{"message": f"answer {i}"}])
+                responses += [m.content async for m in thread.get_completion(f"question {i}", yield_messages=False)]
+            return responses, await thread.get_messages()
+
+        responses, messages = asyncio.run(converse())
+
+        self.assertEqual(responses, ["answer 0", "answer 1", "answer 2"])
+        self.assertEqual(len(messages), 6)
+        self.assertEqual(self.server.calls["messages.list.items"], 6)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+        shutil.rmtree(cls.temp_dir)
+        oai.client = None
+        oai.async_client = None
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import unittest
+
+from openai import OpenAI
+from openai.types.beta.threads.required_action_function_tool_call import RequiredActionFunctionToolCall, Function
+from pydantic import Field
+
+from agency_swarm import Agent, BaseTool, set_openai_client
+from agency_swarm.threads import Thread
+from agency_swarm.tools import Retrieval
+from agency_swarm.user import User
+from agency_swarm.util import oai
+
+
+class FlagTool(BaseTool):
+    """Returns the given flag."""
+    flag: bool = Field(..., description="A boolean flag.")
+    count: int = Field(1, description="A count.")
+
+    def run(self):
+        return self.flag
+
+
+class OtherTool(BaseTool):
+    """Another tool."""
+
+    def run(self):
+        return "other"
+
+
+def tool_call(name, arguments):
+    return RequiredActionFunctionToolCall(id="call_0", type="function",
+                                          function=Function(name=name, arguments=arguments))
+
+
+class ToolDispatchTest(unittest.TestCase):
+    def setUp(self):
+        set_openai_client(OpenAI(api_key="sk-test", max_retries=0, timeout=5))
+        self.agent = Agent(name="DispatchAgent", tools=[FlagTool, Retrieval])
+        self.thread = Thread(User(), self.agent)
+
+    def test_function_index(self):
+        """it should index function tools by name and update the index when tools are added"""
+        self.assertIs(self.agent.get_function("FlagTool"), FlagTool)
+        self.assertIsNone(self.agent.get_function("OtherTool"))
+        self.assertEqual(self.agent.functions, [FlagTool])
+
+        self.agent.add_tool(OtherTool)
+        self.assertIs(self.agent.get_function("OtherTool"), OtherTool)
+
+        self.agent.tools = [OtherTool]
+        self.assertIsNone(self.agent.get_function("FlagTool"))
+
+    def test_json_arguments(self):
+        """it should parse json arguments, including json literals that eval could not parse"""
+        tool = self.thread._init_tool(tool_call("FlagTool", '{"flag": true, "count": 3}'), self.agent)
+
+        self.assertIsInstance(tool, FlagTool)
+        self.assertTrue(tool.flag)
+        self.assertEqual(tool.count, 3)
+        self.assertIs(tool.caller_agent, self.agent)
+
+    def test_invalid_arguments(self):
+        """it should return an error message for arguments that are not valid json or fail validation"""
+        output = self.thread.execute_tool(tool_call("FlagTool", '__import__("os").getcwd()'), self.agent)
+        self.assertTrue(output.startswith("Error:"))
+
+        output = self.thread.execute_tool(tool_call("FlagTool", '{"count": 2}'), self.agent)
+        self.assertTrue(output.startswith("Error:"))
+        self.assertIn("flag", output)
+
+    def test_missing_function(self):
+        """it should list the available functions if the tool is not found"""
+        output = self.thread.execute_tool(tool_call("MissingTool", "{}"), self.agent)
+        self.assertIn("MissingTool not found", output)
+        self.assertIn("FlagTool", output)
+
+    def tearDown(self):
+        oai.client = None
+        oai.async_client = None
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,245 @@
+import asyncio
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from typing import ClassVar
+
+from pydantic import Field
+
+from agency_swarm import Agent, BaseTool, set_openai_client
+from agency_swarm.messages import MessageOutput
+from agency_swarm.threads import Thread
+from agency_swarm.tools import ToolExecutor
+from agency_swarm.user import User
+from agency_swarm.util import oai
+from tests.fake_openai import FakeOpenAIServer
+
+
+class SleepTool(BaseTool):
+    """Sleeps for the given number of seconds and returns the label."""
+    label: str = Field(..., description="Label to return.")
+    seconds: float = Field(0.2, description="Seconds to sleep.")
+
+    def run(self):
+        time.sleep(self.seconds)
+        return self.label
+
+
+class FailingTool(BaseTool):
+    """Always fails."""
+
+    def run(self):
+        raise ValueError("boom")
+
+
+class ExclusiveTool(BaseTool):
+    """Records how many calls of this tool run at the same time."""
+    parallel_safe = False
+    active: ClassVar[int] = 0
+    max_active: ClassVar[int] = 0
+    lock: ClassVar[threading.Lock] = threading.Lock()
+
+    def run(self):
+        with ExclusiveTool.lock:
+            ExclusiveTool.active += 1
+            ExclusiveTool.max_active = max(ExclusiveTool.max_active, ExclusiveTool.active)
+        time.sleep(0.05)
+        with ExclusiveTool.lock:
+            ExclusiveTool.active -= 1
+        return "exclusive"
+
+
+class MessagingTool(BaseTool):
+    """Yields a message before returning."""
+
+    def run(self):
+        yield MessageOutput("text", "MessagingTool", "user", "working")
+        return "messaged"
+
+
+class AsyncSleepTool(BaseTool):
+    """Sleeps on the event loop."""
+    label: str = Field(..., description="Label to return.")
+
+    def run(self):
+        raise NotImplementedError
+
+    async def arun(self):
+        await asyncio.sleep(0.2)
+        return self.label
+
+
+def call(name, **arguments):
+    return name, json.dumps(arguments)
+
+
+class ToolExecutorTest(unittest.TestCase):
+    server = None
+    agent = None
+    executor = None
+    temp_dir = None
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = FakeOpenAIServer(run_delay=0.01).start()
+        set_openai_client(cls.server.client())
+        cls.temp_dir = tempfile.mkdtemp()
+
+        cls.agent = Agent(name="ParallelAgent", tools=[SleepTool, FailingTool, ExclusiveTool, MessagingTool])
+        cls.agent.settings_path = os.path.join(cls.temp_dir, "settings.json")
+        cls.agent.init_oai()
+        cls.executor = ToolExecutor()
+
+    def parallel_thread(self):
+        thread = Thread(User(), self.agent)
+        thread.tool_executor = self.executor
+        return thread
+
+    def get_completion(self, thread):
+        messages = []
+        gen = thread.get_completion("hi")
+        while True:
+            try:
+                messages.append(next(gen))
+            except StopIteration as e:
+                return e.value, messages
+
+    def get_tool_outputs(self, thread):
+        return [o["output"] for o in self.server.threads[thread.id]["runs"][-1]["_tool_outputs"][0]]
+
+    def test_parallel_tool_calls(self):
+        """it should execute independent tool calls concurrently and submit outputs in call order"""
+        self.server.set_script(self.agent.id, [
+            {"tool_calls": [call("SleepTool", label=str(i), seconds=0.3 - i * 0.05) for i in range(5)]},
+            {"message": "done"},
+        ])
+        thread = self.parallel_thread()
+
+        start = time.perf_counter()
+        response, messages = self.get_completion(thread)
+        elapsed = time.perf_counter() - start
+
+        self.assertEqual(response, "done")
+        self.assertEqual(self.get_tool_outputs(thread), ["0", "1", "2", "3", "4"])
+        # sequential execution would take 1 second
+        self.assertLess(elapsed, 0.7)
+
+        # the output of each call is yielded as soon as it finishes
+        outputs = [m.content for m in messages if m.msg_type == "function_output"]
+        self.assertEqual(outputs, ["4", "3", "2", "1", "0"])
+
+    def test_sequential_by_default(self):
+        """it should execute tool calls one by one without a tool executor"""
+        self.server.set_script(self.agent.id, [
+            {"tool_calls": [call("SleepTool", label=str(i), seconds=0.1) for i in range(3)]},
+            {"message": "done"},
+        ])
+        thread = Thread(User(), self.agent)
+        self.assertIsNone(thread.tool_executor)
+
+        start = time.perf_counter()
+        self.get_completion(thread)
+
+        self.assertGreaterEqual(time.perf_counter() - start, 0.3)
+        self.assertEqual(self.get_tool_outputs(thread), ["0", "1", "2"])
+
+    def test_error_isolation(self):
+        """it should report a failing tool call without affecting the other calls of the batch"""
+        self.server.set_script(self.agent.id, [
+            {"tool_calls": [call("SleepTool", label="a", seconds=0.01), call("FailingTool"),
+                            call("SleepTool", label="b", seconds=0.01), call("MissingTool")]},
+            {"message": "done"},
+        ])
+        thread = self.parallel_thread()
+
+        self.get_completion(thread)
+
+        outputs = self.get_tool_outputs(thread)
+        self.assertEqual(outputs[0], "a")
+        self.assertEqual(outputs[1], "Error: boom")
+        self.assertEqual(outputs[2], "b")
+        self.assertIn("MissingTool", outputs[3])
+
+    def test_parallel_unsafe_tools_do_not_overlap(self):
+        """it should never run tools with parallel_safe = False concurrently with other calls"""
+        ExclusiveTool.max_active = 0
+        self.server.set_script(self.agent.id, [
+            {"tool_calls": [call("ExclusiveTool"), call("ExclusiveTool"), call("SleepTool", label="a", seconds=0.01),
+                            call("ExclusiveTool")]},
+            {"message": "done"},
+        ])
+        thread = self.parallel_thread()
+
+        self.get_completion(thread)
+
+        self.assertEqual(ExclusiveTool.max_active, 1)
+        self.assertEqual(self.get_tool_outputs(thread), ["exclusive", "exclusive", "a", "exclusive"])
+
+    def test_generator_tool_messages(self):
+        """it should forward the messages yielded by generator tools executed in parallel"""
+        self.server.set_script(self.agent.id, [
+            {"tool_calls": [call("MessagingTool"), call("SleepTool", label="a", seconds=0.01)]},
+            {"message": "done"},
+        ])
+        thread = self.parallel_thread()
+
+        _, messages = self.get_completion(thread)
+
+        self.assertIn("working", [m.content for m in messages])
+        self.assertEqual(self.get_tool_outputs(thread), ["messaged", "a"])
+
+    def test_backends(self):
+        """it should return results in order for every backend"""
+        for backend in ["thread", "process", "asyncio"]:
+            with self.subTest(backend=backend):
+                executor = ToolExecutor(backend)
+                try:
+                    tools = [SleepTool(label=str(i), seconds=0.01) for i in range(3)] + [FailingTool(),
+                                                                                           MessagingTool()]
+                    results = executor.execute(tools)
+                finally:
+                    executor.shutdown()
+
+                self.assertEqual([r[0] for r in results[:3]], ["0", "1", "2"])
+                self.assertIsInstance(results[3], ValueError)
+                self.assertEqual(results[4][0], "messaged")
+                self.assertEqual(len(results[4][1]), 1)
+
+    def test_execute_as_completed(self):
+        """it should yield the index and result of each tool as it finishes"""
+        executor = ToolExecutor()
+        try:
+            tools = [SleepTool(label=str(i), seconds=0.2 - i * 0.05) for i in range(3)]
+            results = list(executor.execute_as_completed(tools))
+        finally:
+            executor.shutdown()
+
+        self.assertEqual([(index, result[0]) for index, result in results], [(2, "2"), (1, "1"), (0, "0")])
+
+    def test_asyncio_backend_awaits_arun(self):
+        """it should run arun coroutines concurrently on the event loop of the asyncio backend"""
+        executor = ToolExecutor("asyncio")
+        try:
+            start = time.perf_counter()
+            results = executor.execute([AsyncSleepTool(label=str(i)) for i in range(10)])
+            elapsed = time.perf_counter() - start
+        finally:
+            executor.shutdown()
+
+        self.assertEqual([r[0] for r in results], [str(i) for i in range(10)])
+        self.assertLess(elapsed, 1)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.executor.shutdown()
+        cls.server.stop()
+        shutil.rmtree(cls.temp_dir)
+        oai.client = None
+
+
+if __name__ == '__main__':
+    unittest.main()
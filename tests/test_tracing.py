@@ -0,0 +1,202 @@
+import asyncio
+import json
+import os
+import pstats
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+from agency_swarm import Agency, Agent, BaseTool, set_openai_client, set_async_openai_client
+from agency_swarm.util import oai, Tracer, get_tracer, set_tracer
+from tests.fake_openai import FakeOpenAIServer
+
+
+class SlowTool(BaseTool):
+    """Sleeps for a moment."""
+
+    def run(self):
+        time.sleep(0.02)
+        return "slept"
+
+
+def send_message(recipient, message="do it"):
+    return "SendMessage", json.dumps({"instructions": "delegate", "recipient": recipient, "message": message})
+
+
+class TracerTest(unittest.TestCase):
+    def test_spans(self):
+        """it should nest spans, record errors and do nothing when disabled"""
+        tracer = Tracer()
+        with tracer.span("off") as span:
+            self.assertIsNone(span)
+        self.assertEqual(tracer.get_spans(), [])
+
+        tracer.enabled = True
+        with tracer.span("outer", "agency") as outer:
+            with tracer.span("inner", "tool", answer=42) as inner:
+                pass
+            with self.assertRaises(ValueError):
+                with tracer.span("failing", "tool"):
+                    raise ValueError("broken")
+
+        self.assertEqual([span.name for span in tracer.get_spans()], ["inner", "failing", "outer"])
+        self.assertEqual(inner.parent_id, outer.span_id)
+        self.assertIsNone(outer.parent_id)
+        self.assertEqual(inner.attributes, {"answer": 42})
+        self.assertIn("broken", tracer.get_spans("tool")[1].attributes["error"])
+        self.assertGreaterEqual(outer.duration, inner.duration)
+
+    def test_generator_spans(self):
+        """it should make the span of a generator current only while the generator runs"""
+        tracer = Tracer(enabled=True)
+
+        def generator():
+            with tracer.span("inside", "tool"):
+                yield 1
+            return 2
+
+        outer = tracer.trace_generator(generator(), "generator", "thread")
+        self.assertEqual(next(outer), 1)
+        with tracer.span("between", "tool"):
+            pass
+        with self.assertRaises(StopIteration) as stop:
+            next(outer)
+        self.assertEqual(stop.exception.value, 2)
+
+        spans = {span.name: span for span in tracer.get_spans()}
+        self.assertEqual(spans["inside"].parent_id, spans["generator"].span_id)
+        self.assertIsNone(spans["between"].parent_id)
+
+    def test_exports(self):
+        """it should export spans to chrome trace and speedscope files"""
+        tracer = Tracer(enabled=True)
+        with tracer.span("outer", "agency"):
+            with tracer.span("inner", "tool"):
+                time.sleep(0.01)
+
+        temp_dir = tempfile.mkdtemp()
+        try:
+            tracer.save_chrome_trace(os.path.join(temp_dir, "trace.json"))
+            with open(os.path.join(temp_dir, "trace.json")) as f:
+                events = json.load(f)["traceEvents"]
+            spans = {event["name"]: event for event in events if event["ph"] == "X"}
+            self.assertEqual(spans["inner"]["args"]["parent_id"], spans["outer"]["args"]["span_id"])
+            self.assertGreaterEqual(spans["inner"]["dur"], 10000)
+            self.assertTrue(any(event["ph"] == "M" for event in events))
+
+            tracer.save_speedscope(os.path.join(temp_dir, "trace.speedscope.json"))
+            with open(os.path.join(temp_dir, "trace.speedscope.json")) as f:
+                speedscope = json.load(f)
+            frames = [frame["name"] for frame in speedscope["shared"]["frames"]]
+            events = speedscope["profiles"][0]["events"]
+            self.assertEqual([(event["type"], frames[event["frame"]]) for event in events],
+                             [("O", "agency:outer"), ("O", "tool:inner"), ("C", "tool:inner"), ("C", "agency:outer")])
+            self.assertEqual([event["at"] for event in events], sorted(event["at"] for event in events))
+        finally:
+            shutil.rmtree(temp_dir)
+
+
+class AgencyTracingTest(unittest.TestCase):
+    server = None
+    temp_dir = None
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = FakeOpenAIServer(run_delay=0.01).start()
+        set_openai_client(cls.server.client())
+        cls.temp_dir = tempfile.mkdtemp()
+
+    def setUp(self):
+        self.default_tracer = get_tracer()
+        self.tracer = Tracer(enabled=True)
+        set_tracer(self.tracer)
+
+    def tearDown(self):
+        set_tracer(self.default_tracer)
+
+    def create_agency(self, name, **kwargs):
+        ceo = Agent(name=f"{name}CEO")
+        dev = Agent(name=f"{name}Dev", tools=[SlowTool])
+        agency = Agency([ceo, [ceo, dev]], settings_path=os.path.join(self.temp_dir, f"{name}.json"), **kwargs)
+        return agency, ceo, dev
+
+    def get_parent(self, span):
+        return next(s for s in self.tracer.get_spans() if s.span_id == span.parent_id)
+
+    def test_call_tree(self):
+        """it should record the call tree from the agency through SendMessage down to the tools of other agents"""
+        agency, ceo, dev = self.create_agency("Trace")
+        self.server.set_script(ceo.id, [{"tool_calls": [send_message(dev.name)]}, {"message": "all done"}])
+        self.server.set_script(dev.id, [{"tool_calls": [("SlowTool", "{}")]}, {"message": "done"}])
+
+        self.assertEqual(agency.get_completion("hi", yield_messages=False), "all done")
+
+        spans = {span.name: span for span in self.tracer.get_spans()}
+        self.assertEqual(set(spans), {"Agency.get_completion", "user -> TraceCEO", "SendMessage",
+                                      "TraceCEO -> TraceDev", "SlowTool"})
+        chain = [spans["SlowTool"]]
+        while chain[-1].parent_id:
+            chain.append(self.get_parent(chain[-1]))
+        self.assertEqual([span.name for span in chain], ["SlowTool", "TraceCEO -> TraceDev", "SendMessage",
+                                                         "user -> TraceCEO", "Agency.get_completion"])
+        self.assertEqual(spans["SendMessage"].attributes["recipient"], "TraceDev")
+        self.assertGreaterEqual(spans["SlowTool"].duration, 0.02)
+
+    def test_aget_completion(self):
+        """it should keep the current span in the executor threads running sync tools of async threads"""
+        set_async_openai_client(None)
+        agency, ceo, dev = self.create_agency("AsyncLoop")
+        self.server.set_script(ceo.id, [{"tool_calls": [send_message(dev.name)]}, {"message": "all done"}])
+        self.server.set_script(dev.id, [{"tool_calls": [("SlowTool", "{}")]}, {"message": "done"}])
+
+        async def collect():
+            return [message async for message in agency.aget_completion("hi")]
+
+        self.assertEqual(asyncio.run(collect())[-1].content, "all done")
+
+        tool_span = next(span for span in self.tracer.get_spans() if span.name == "SlowTool")
+        self.assertEqual(self.get_parent(tool_span).name, "AsyncLoopCEO -> AsyncLoopDev")
+
+    def test_async_mode(self):
+        """it should continue the trace in the worker threads of async mode"""
+        agency, ceo, dev = self.create_agency("AsyncTrace", async_mode="threading")
+        self.server.set_script(ceo.id, [{"tool_calls": [send_message(dev.name)]}, {"message": "started"}])
+        completed = threading.Event()
+        agency.add_async_completion_callback(lambda *args: completed.set())
+
+        self.assertEqual(agency.get_completion("hi", yield_messages=False), "started")
+        self.assertTrue(completed.wait(5))
+
+        worker_span = next(span for span in self.tracer.get_spans() if span.name == "AsyncTraceCEO -> AsyncTraceDev")
+        parent = self.get_parent(worker_span)
+        self.assertEqual(parent.name, "SendMessage")
+        self.assertNotEqual(worker_span.thread_id, parent.thread_id)
+
+    def test_profile_tools(self):
+        """it should profile tool calls with cProfile when enabled"""
+        self.tracer.profile_tools = True
+        agency, ceo, dev = self.create_agency("Profile")
+        self.server.set_script(ceo.id, [{"tool_calls": [send_message(dev.name)]}, {"message": "all done"}])
+        self.server.set_script(dev.id, [{"tool_calls": [("SlowTool", "{}")]}, {"message": "done"}])
+        agency.get_completion("hi", yield_messages=False)
+
+        paths = self.tracer.save_tool_profiles(os.path.join(self.temp_dir, "profiles"))
+        # only the outermost tool call of a thread is profiled, it includes the nested ones
+        self.assertEqual(len(paths), 1)
+        self.assertTrue(os.path.basename(paths[0]).startswith("SendMessage-"))
+        stats = pstats.Stats(paths[0])
+        self.assertTrue(any(function == "run" and "test_tracing" in path
+                            for path, line, function in stats.stats))
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+        shutil.rmtree(cls.temp_dir)
+        oai.client = None
+        oai.async_client = None
+
+
+if __name__ == '__main__':
+    unittest.main()
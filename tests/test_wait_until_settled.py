@@ -0,0 +1,94 @@
+import importlib.util
+import json
+import time
+import unittest
+
+SELENIUM_INSTALLED = importlib.util.find_spec("selenium") is not None
+
+
+class FakePage:
+    """
+    Driver of a page that loads for `load_time` seconds, changes its DOM until `mutation_time` (defaults to
+    `load_time`) and keeps one request pending until `network_time`. Its performance log entries are only returned
+    after `log_delay` seconds.
+    """
+
+    def __init__(self, load_time=0.0, network_time=0.0, performance_log=True, log_delay=0.0, mutation_time=None):
+        self.start = time.perf_counter()
+        self.start_time = time.time()
+        self.load_time = load_time
+        self.mutation_time = load_time if mutation_time is None else mutation_time
+        self.network_time = network_time
+        self.performance_log = performance_log
+        self.log_delay = log_delay
+        self.sent = False
+        self.finished = False
+
+    def elapsed(self):
+        return time.perf_counter() - self.start
+
+    def get_log(self, log_type):
+        if not self.performance_log:
+            raise Exception("log type 'performance' not found")
+        entries = []
+        if self.elapsed() < self.log_delay:
+            return entries
+        if not self.sent:
+            self.sent = True
+            entries.append(self._entry("Network.requestWillBeSent", 0))
+        if not self.finished and self.elapsed() >= self.network_time:
+            self.finished = True
+            entries.append(self._entry("Network.loadingFinished", self.network_time))
+        return entries
+
+    def execute_script(self, script):
+        if self.elapsed() < self.load_time:
+            return ["interactive", 0]
+        return ["complete", (self.elapsed() - self.mutation_time) * 1000]
+
+    def _entry(self, method, at):
+        return {"message": json.dumps({"message": {"method": method, "params": {"requestId": "1"}}}),
+                "timestamp": (self.start_time + at) * 1000}
+
+
+@unittest.skipUnless(SELENIUM_INSTALLED, "selenium is not installed")
+class WaitUntilSettledTest(unittest.TestCase):
+    def setUp(self):
+        from agency_swarm.agents.browsing.tools.util import wait_until_settled
+        self.wait_until_settled = wait_until_settled
+
+    def test_settles(self):
+        """it should wait for the document, the network and the DOM and report each wait"""
+        result = self.wait_until_settled(FakePage(load_time=0.2, network_time=0.3), timeout=5, idle_time=0.1,
+                                         max_inflight_requests=0, poll_interval=0.02)
+        self.assertFalse(result["timed_out"])
+        self.assertGreaterEqual(result["ready_state"], 0.2)
+        self.assertGreaterEqual(result["network_idle"], 0.4)
+        self.assertGreaterEqual(result["dom_quiet"], 0.3)
+        self.assertLess(result["seconds"], 1)
+
+    def test_buffered_log_entries(self):
+        """it should time the network activity by the timestamps of the log entries, not by when they are read"""
+        result = self.wait_until_settled(FakePage(load_time=0.3, log_delay=0.3, mutation_time=0), timeout=5, idle_time=0.2,
+                                         max_inflight_requests=0, poll_interval=0.02)
+        self.assertFalse(result["timed_out"])
+        self.assertLess(result["seconds"], 0.45)
+
+    def test_timeout(self):
+        """it should give up after the timeout"""
+        result = self.wait_until_settled(FakePage(load_time=10), timeout=0.2, idle_time=0.1, poll_interval=0.02)
+        self.assertTrue(result["timed_out"])
+        self.assertIsNone(result["ready_state"])
+        self.assertLess(result["seconds"], 0.5)
+
+    def test_without_performance_log(self):
+        """it should only wait for the document and the DOM without a performance log"""
+        result = self.wait_until_settled(FakePage(performance_log=False), timeout=5, idle_time=0.1,
+                                         poll_interval=0.02)
+        self.assertFalse(result["timed_out"])
+        self.assertIsNone(result["network_idle"])
+        self.assertLess(result["seconds"], 0.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
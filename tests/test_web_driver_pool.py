@@ -0,0 +1,126 @@
+import importlib.util
+import threading
+import time
+import unittest
+
+SELENIUM_INSTALLED = importlib.util.find_spec("selenium") is not None
+
+
+class FakeWebDriver:
+    def __init__(self, number):
+        self.number = number
+        self.crashed = False
+        self.closed = False
+
+    @property
+    def window_handles(self):
+        if self.crashed or self.closed:
+            raise ConnectionError("browser is gone")
+        return ["window"]
+
+    def quit(self):
+        self.closed = True
+
+
+@unittest.skipUnless(SELENIUM_INSTALLED, "selenium is not installed")
+class WebDriverPoolTest(unittest.TestCase):
+    def setUp(self):
+        from agency_swarm.agents.browsing.tools.util import WebDriverPool
+        self.started = []
+
+        def factory():
+            driver = FakeWebDriver(len(self.started))
+            self.started.append(driver)
+            return driver
+
+        self.pool = WebDriverPool(max_size=2, idle_timeout=60, acquire_timeout=0.2, factory=factory)
+
+    def test_sessions(self):
+        """it should keep one browser per session between leases"""
+        first = self.pool.acquire("a")
+        self.pool.release("a", first)
+        self.assertIs(self.pool.acquire("a"), first)
+        second = self.pool.acquire("b")
+        self.assertIsNot(second, first)
+        self.assertEqual(self.pool.get_metrics()["open"], 2)
+
+    def test_max_size(self):
+        """it should evict the least recently used idle browser when full and wait when all are leased"""
+        a = self.pool.acquire("a")
+        b = self.pool.acquire("b")
+        with self.assertRaises(Exception):
+            self.pool.acquire("c")
+
+        self.pool.release("a", a)
+        self.pool.release("b", b)
+        self.pool.acquire("c")
+        self.assertTrue(a.closed)
+        self.assertFalse(b.closed)
+
+        # a lease released by another thread unblocks the waiting session
+        self.pool.acquire_timeout = 5
+        threading.Timer(0.05, self.pool.release, args=("c",)).start()
+        self.pool.acquire("b")
+        self.pool.acquire("d")
+        self.assertEqual(self.pool.get_metrics()["evicted"], 2)
+
+    def test_recovery(self):
+        """it should replace crashed browsers and close idle ones"""
+        first = self.pool.acquire("a")
+        first.crashed = True
+        replacement = self.pool.acquire("a")
+        self.assertIsNot(replacement, first)
+        self.assertEqual(self.pool.get_metrics()["recovered"], 1)
+
+        self.pool.idle_timeout = 0.01
+        leased = self.pool.acquire("c")
+        self.pool.release("a", replacement)
+        time.sleep(0.02)
+        self.pool.acquire("b")
+        self.assertTrue(replacement.closed)
+        # leased browsers are never closed as idle
+        self.assertFalse(leased.closed)
+
+    def test_browsing_session(self):
+        """it should lease separate browsers to the same agent in different browsing sessions"""
+        from agency_swarm.agents.browsing.tools.util import selenium
+
+        class Agent:
+            name = "BrowsingAgent"
+
+        default_pool = selenium.get_web_driver_pool()
+        selenium.set_web_driver_pool(self.pool)
+        try:
+            with selenium.browsing_session("user-1"):
+                first = selenium.get_web_driver(Agent())
+            with selenium.browsing_session("user-2"):
+                second = selenium.get_web_driver(Agent())
+            self.assertIsNot(first, second)
+        finally:
+            selenium.set_web_driver_pool(default_pool)
+
+    def test_tool_error_releases_browser(self):
+        """it should release the browser of a tool that fails"""
+        from agency_swarm.agents.browsing.tools import GoBack
+        from agency_swarm.agents.browsing.tools.util import selenium
+
+        class Agent:
+            name = "BrowsingAgent"
+
+        default_pool = selenium.get_web_driver_pool()
+        selenium.set_web_driver_pool(self.pool)
+        try:
+            tool = GoBack(caller_agent=Agent())
+            with self.assertRaises(AttributeError):
+                # the fake browser cannot go back
+                tool.run()
+            self.assertEqual(self.pool.get_metrics()["leased"], 0)
+        finally:
+            selenium.set_web_driver_pool(default_pool)
+
+    def tearDown(self):
+        self.pool.close()
+
+
+if __name__ == '__main__':
+    unittest.main()